@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+🕸️ ANÁLISE DA REDE - SISTEMA VERMELINHO
+Busync - Centralidade de intermediação (betweenness) de pontos e trechos
+
+Mostra quais pontos e trechos carregam mais menores caminhos, ou seja,
+onde uma interdição ou um atraso afeta mais viagens. O algoritmo de Brandes roda sobre o grafo compilado (CSR), com os
+tempos das conexões como pesos, e dá os mesmos valores normalizados de
+nx.betweenness_centrality e nx.edge_betweenness_centrality.
+
+Modo exato: uma busca por ponto de origem, O(n·m·log n), bom para redes
+pequenas como a de Maricá. Em redes grandes isso leva horas, então o modo
+amostrado usa k origens sorteadas e escala o resultado por n/k. Pela
+desigualdade de Hoeffding (com união sobre todos os pontos), o erro
+absoluto de todos os valores fica abaixo de ``erro`` com probabilidade
+``confianca``; k é escolhido a partir desses dois parâmetros. As origens
+são divididas entre processos que se anexam ao grafo em memória
+compartilhada.
+
+Os resultados ficam em cache por grafo compilado: quando a rede muda, a
+nova compilação começa sem cache.
+
+Exemplos:
+    python analise_rede.py
+    python analise_rede.py --sintetica 50000 --erro 0.05 --workers 4
+
+Salve como: analise_rede.py
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from grafo_compilado import GrafoCompilado
+
+# Até este número de pontos o modo automático calcula o valor exato
+LIMITE_EXATO = 2000
+
+# Erro absoluto máximo e confiança padrão do modo amostrado
+ERRO_PADRAO = 0.05
+CONFIANCA_PADRAO = 0.95
+
+# Tarefas por worker (origens divididas em blocos para equilibrar a carga)
+BLOCOS_POR_WORKER = 4
+
+# Resultados por grafo compilado (somem junto com a compilação)
+_cache: 'weakref.WeakKeyDictionary[GrafoCompilado, Dict[tuple, ResultadoCentralidade]]' = \
+    weakref.WeakKeyDictionary()
+
+
+@dataclass
+class ResultadoCentralidade:
+    """Centralidade normalizada de cada ponto e de cada trecho (par de pontos)"""
+    pontos: np.ndarray
+    # Trecho i liga trecho_origem[i] a trecho_destino[i] (índices, origem < destino)
+    trecho_origem: np.ndarray
+    trecho_destino: np.ndarray
+    trechos: np.ndarray
+    modo: str
+    fontes: int
+    versao: int
+    duracao_s: float
+    # Erro absoluto máximo (com a confiança abaixo); 0 no modo exato
+    erro_pontos: float = 0.0
+    erro_trechos: float = 0.0
+    confianca: float = 1.0
+    semente: Optional[int] = field(default=None)
+
+    def pontos_criticos(self, grafo: GrafoCompilado, quantidade: int = 10) -> List[Tuple[str, float]]:
+        """Pontos com maior centralidade: [(ID, valor)]"""
+        ordem = np.argsort(-self.pontos, kind='stable')[:quantidade]
+        return [(grafo.id_do_indice(int(indice)), float(self.pontos[indice])) for indice in ordem]
+
+    def trechos_criticos(self, grafo: GrafoCompilado, quantidade: int = 10) -> List[Tuple[str, str, float]]:
+        """Trechos com maior centralidade: [(ID, ID, valor)]"""
+        ordem = np.argsort(-self.trechos, kind='stable')[:quantidade]
+        return [(grafo.id_do_indice(int(self.trecho_origem[i])), grafo.id_do_indice(int(self.trecho_destino[i])),
+                 float(self.trechos[i])) for i in ordem]
+
+    def para_dict(self, grafo: GrafoCompilado, quantidade: int = 10) -> Dict:
+        """Resumo serializável com os ``quantidade`` pontos e trechos mais críticos"""
+        return {
+            'modo': self.modo, 'fontes': self.fontes, 'versao': self.versao,
+            'duracao_s': round(self.duracao_s, 3), 'semente': self.semente,
+            'erro_pontos': round(self.erro_pontos, 6), 'erro_trechos': round(self.erro_trechos, 6),
+            'confianca': self.confianca,
+            'pontos_criticos': [{'ponto': ponto, 'centralidade': round(valor, 6)}
+                                for ponto, valor in self.pontos_criticos(grafo, quantidade)],
+            'trechos_criticos': [{'de': origem, 'para': destino, 'centralidade': round(valor, 6)}
+                                 for origem, destino, valor in self.trechos_criticos(grafo, quantidade)],
+        }
+
+
+def fontes_necessarias(pontos: int, trechos: int, erro: float, confianca: float) -> int:
+    """
+    Origens sorteadas para que todos os valores fiquem a menos de ``erro``
+    do exato com probabilidade ``confianca`` (Hoeffding + união)
+    """
+    falha = 1 - confianca
+    # Valores de pontos são médias de variáveis em [0, n/(n-1)]; de trechos, em [0, 1]
+    escala = pontos / (pontos - 1) if pontos > 1 else 1.0
+    k_pontos = math.log(2 * max(pontos, 1) / falha) * escala ** 2 / (2 * erro ** 2)
+    k_trechos = math.log(2 * max(trechos, 1) / falha) / (2 * erro ** 2)
+    return math.ceil(max(k_pontos, k_trechos))
+
+
+def erro_amostragem(pontos: int, trechos: int, fontes: int, confianca: float) -> Tuple[float, float]:
+    """Erro absoluto máximo (pontos, trechos) com ``fontes`` origens sorteadas"""
+    falha = 1 - confianca
+    escala = pontos / (pontos - 1) if pontos > 1 else 1.0
+    return (escala * math.sqrt(math.log(2 * max(pontos, 1) / falha) / (2 * fontes)),
+            math.sqrt(math.log(2 * max(trechos, 1) / falha) / (2 * fontes)))
+
+
+def dependencias(grafo: GrafoCompilado, fontes: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Soma das dependências de Brandes das ``fontes`` (sem normalizar)
+
+    Returns:
+        (acúmulo por ponto, acúmulo por aresta do CSR, nos dois sentidos)
+    """
+    indptr, vizinhos, pesos = grafo._mv_indptr, grafo._mv_vizinhos, grafo._mv_pesos
+    acumulo_pontos = [0.0] * len(grafo)
+    acumulo_arestas = [0.0] * len(grafo.vizinhos)
+
+    for fonte in fontes:
+        distancias = {fonte: 0.0}
+        caminhos = {fonte: 1}
+        # Predecessores de cada ponto nos menores caminhos: (ponto, posição da aresta)
+        predecessores: Dict[int, list] = {fonte: []}
+        ordem = []
+        finalizados = set()
+        fila = [(0.0, fonte)]
+
+        while fila:
+            distancia, atual = heapq.heappop(fila)
+            if atual in finalizados:
+                continue
+            finalizados.add(atual)
+            ordem.append(atual)
+            caminhos_atual = caminhos[atual]
+            for posicao in range(indptr[atual], indptr[atual + 1]):
+                vizinho = vizinhos[posicao]
+                if vizinho in finalizados:
+                    continue
+                nova = distancia + pesos[posicao]
+                anterior = distancias.get(vizinho)
+                if anterior is None or nova < anterior:
+                    distancias[vizinho] = nova
+                    caminhos[vizinho] = caminhos_atual
+                    predecessores[vizinho] = [(atual, posicao)]
+                    heapq.heappush(fila, (nova, vizinho))
+                elif nova == anterior:
+                    caminhos[vizinho] += caminhos_atual
+                    predecessores[vizinho].append((atual, posicao))
+
+        # Acúmulo das dependências do mais distante para o mais próximo
+        dependencia = dict.fromkeys(ordem, 0.0)
+        for ponto in reversed(ordem):
+            coeficiente = (1.0 + dependencia[ponto]) / caminhos[ponto]
+            for predecessor, posicao in predecessores[ponto]:
+                parcela = caminhos[predecessor] * coeficiente
+                acumulo_arestas[posicao] += parcela
+                dependencia[predecessor] += parcela
+            if ponto != fonte:
+                acumulo_pontos[ponto] += dependencia[ponto]
+
+    return np.array(acumulo_pontos), np.array(acumulo_arestas)
+
+
+def _dependencias_no_worker(fontes: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Tarefa do Pool: dependências das fontes no grafo anexado ao worker"""
+    from memoria_compartilhada import grafo_do_worker
+    return dependencias(grafo_do_worker(), fontes)
+
+
+def _dependencias_paralelas(grafo: GrafoCompilado, fontes: List[int], workers: int
+                            ) -> Tuple[np.ndarray, np.ndarray]:
+    """Divide as fontes entre workers anexados à memória compartilhada e soma os acúmulos"""
+    from multiprocessing import Pool
+
+    from memoria_compartilhada import RedeCompartilhada, inicializar_worker
+
+    tamanho = max(1, math.ceil(len(fontes) / (workers * BLOCOS_POR_WORKER)))
+    blocos = [fontes[i:i + tamanho] for i in range(0, len(fontes), tamanho)]
+    acumulo_pontos = np.zeros(len(grafo))
+    acumulo_arestas = np.zeros(len(grafo.vizinhos))
+    with RedeCompartilhada(grafo) as rede:
+        with Pool(workers, initializer=inicializar_worker, initargs=(rede.descritor,)) as pool:
+            for pontos, arestas in pool.imap_unordered(_dependencias_no_worker, blocos):
+                acumulo_pontos += pontos
+                acumulo_arestas += arestas
+    return acumulo_pontos, acumulo_arestas
+
+
+def _agrupar_trechos(grafo: GrafoCompilado, acumulo_arestas: np.ndarray
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Soma os dois sentidos de cada aresta: (origem, destino, acúmulo) por trecho"""
+    origens = np.repeat(np.arange(len(grafo), dtype=np.int64), np.diff(grafo.indptr))
+    menores = np.minimum(origens, grafo.vizinhos)
+    maiores = np.maximum(origens, grafo.vizinhos)
+    chaves, inverso = np.unique(menores * len(grafo) + maiores, return_inverse=True)
+    return chaves // len(grafo), chaves % len(grafo), np.bincount(inverso, weights=acumulo_arestas)
+
+
+def centralidade(grafo: GrafoCompilado, modo: str = 'auto', erro: float = ERRO_PADRAO,
+                 confianca: float = CONFIANCA_PADRAO, fontes: Optional[int] = None,
+                 workers: int = 0, semente: int = 0) -> ResultadoCentralidade:
+    """
+    Centralidade de intermediação normalizada de pontos e trechos
+
+    Args:
+        grafo: Grafo compilado (ver SistemaVermelhinho.compilar)
+        modo: 'exato', 'amostrado' ou 'auto' (exato até LIMITE_EXATO pontos
+            ou quando a amostra necessária não for menor que a rede)
+        erro: Erro absoluto máximo do modo amostrado
+        confianca: Probabilidade de todos os valores respeitarem ``erro``
+        fontes: Origens sorteadas (substitui o cálculo a partir de ``erro``)
+        workers: Processos (0 = processo atual)
+        semente: Semente do sorteio das origens
+
+    Returns:
+        ResultadoCentralidade (em cache para o mesmo grafo e parâmetros)
+    """
+    if modo not in ('auto', 'exato', 'amostrado'):
+        raise ValueError(f"Modo desconhecido: {modo}")
+    total = len(grafo)
+    total_trechos = grafo.total_arestas
+    k = fontes or fontes_necessarias(total, total_trechos, erro, confianca)
+    if modo == 'auto':
+        modo = 'exato' if total <= LIMITE_EXATO or k >= total else 'amostrado'
+    k = total if modo == 'exato' else min(k, total)
+
+    resultados = _cache.setdefault(grafo, {})
+    exato = resultados.get(('exato',))
+    if exato is not None:
+        return exato
+    chave = ('exato',) if modo == 'exato' else ('amostrado', k, confianca, semente)
+    if chave in resultados:
+        return resultados[chave]
+
+    inicio = time.perf_counter()
+    if modo == 'exato':
+        origens = list(range(total))
+    else:
+        origens = random.Random(semente).sample(range(total), k)
+    if workers > 0 and len(origens) > 1:
+        acumulo_pontos, acumulo_arestas = _dependencias_paralelas(grafo, origens, workers)
+    else:
+        acumulo_pontos, acumulo_arestas = dependencias(grafo, origens)
+    trecho_origem, trecho_destino, acumulo_trechos = _agrupar_trechos(grafo, acumulo_arestas)
+
+    # Mesma normalização de nx.betweenness_centrality / edge_betweenness_centrality (com k)
+    extrapolacao = total / k if k else 0.0
+    escala_pontos = extrapolacao / ((total - 1) * (total - 2)) if total > 2 else 0.0
+    escala_trechos = extrapolacao / (total * (total - 1)) if total > 1 else 0.0
+    erro_pontos, erro_trechos = (0.0, 0.0) if modo == 'exato' else \
+        erro_amostragem(total, total_trechos, k, confianca)
+
+    resultado = ResultadoCentralidade(
+        pontos=acumulo_pontos * escala_pontos,
+        trecho_origem=trecho_origem,
+        trecho_destino=trecho_destino,
+        trechos=acumulo_trechos * escala_trechos,
+        modo=modo,
+        fontes=k,
+        versao=grafo.versao,
+        duracao_s=time.perf_counter() - inicio,
+        erro_pontos=erro_pontos,
+        erro_trechos=erro_trechos,
+        confianca=1.0 if modo == 'exato' else confianca,
+        semente=None if modo == 'exato' else semente,
+    )
+    resultados[chave] = resultado
+    return resultado
+
+
+def main() -> int:
+    """Executa a análise pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Pontos e trechos críticos da rede (betweenness)")
+    parser.add_argument('--modo', choices=('auto', 'exato', 'amostrado'), default='auto')
+    parser.add_argument('--erro', type=float, default=ERRO_PADRAO, help="Erro absoluto máximo (modo amostrado)")
+    parser.add_argument('--confianca', type=float, default=CONFIANCA_PADRAO)
+    parser.add_argument('--fontes', type=int, help="Origens sorteadas (ignora --erro)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processos (0 = processo atual)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--top', type=int, default=10, help="Pontos e trechos listados")
+    parser.add_argument('--gtfs', help="Carrega a rede de um feed GTFS (diretório ou .zip)")
+    parser.add_argument('--sintetica', type=int, help="Usa uma rede sintética com N pontos")
+    parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    # Mensagens de carga vão para stderr para não misturar com o JSON
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    if args.gtfs:
+        from importador_gtfs import importar_gtfs
+        sistema = importar_gtfs(args.gtfs)
+    elif args.sintetica:
+        from gerador_rede import gerar_rede_sintetica
+        sistema = gerar_rede_sintetica(args.sintetica)
+    else:
+        from sistema_backend import SistemaVermelhinho
+        sistema = SistemaVermelhinho()
+    sys.stdout = stdout
+
+    grafo = sistema.compilar()
+    resultado = centralidade(grafo, args.modo, args.erro, args.confianca, args.fontes,
+                             args.workers if args.workers > 1 else 0, args.semente)
+
+    if args.json:
+        print(json.dumps(resultado.para_dict(grafo, args.top), ensure_ascii=False, indent=2))
+        return 0
+
+    margem = (f"±{resultado.erro_pontos:.4f} (pontos) / ±{resultado.erro_trechos:.4f} (trechos) "
+              f"com {resultado.confianca:.0%} de confiança" if resultado.modo == 'amostrado' else "exato")
+    print(f"🕸️ Centralidade de {len(grafo):,} pontos: {resultado.fontes:,} origens, "
+          f"{resultado.duracao_s:.2f}s ({margem})")
+    print("   Pontos críticos:")
+    for ponto, valor in resultado.pontos_criticos(grafo, args.top):
+        print(f"   • {sistema.pontos[ponto].nome:<40} {valor:.4f}")
+    print("   Trechos críticos:")
+    for origem, destino, valor in resultado.trechos_criticos(grafo, args.top):
+        print(f"   • {sistema.pontos[origem].nome} ↔ {sistema.pontos[destino].nome}: {valor:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+⏱️ BENCHMARK DE IMPORTAÇÃO - SISTEMA VERMELINHO
+Busync - Garante que o backend headless importe rápido e sem GUI
+
+Cada módulo é importado em um interpretador novo com ``-X importtime``;
+o benchmark falha se alguma dependência de visualização for carregada ou
+se o tempo acumulado passar do orçamento.
+
+Salve como: benchmark_importacao.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# Módulos que devem poder ser importados em servidores headless
+MODULOS_HEADLESS = [
+    'sistema_backend',
+    'importador_gtfs',
+    'exportador_gtfs',
+    'visualizador_grafo',
+    'sistema_transporte',
+    'servidor_http',
+    'servidor_prefork',
+    'roteamento_lote',
+]
+
+# Dependências que nenhum dos módulos acima pode carregar na importação
+MODULOS_PROIBIDOS = ['tkinter', '_tkinter', 'matplotlib', 'folium']
+
+# Orçamento padrão de tempo de importação acumulado (ms)
+ORCAMENTO_PADRAO_MS = 1500.0
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+
+def medir_importacao(modulo: str) -> Dict:
+    """
+    Importa um módulo em um subprocesso e mede o tempo
+
+    Returns:
+        Dicionário com tempo acumulado (ms), módulos proibidos carregados e
+        os cinco imports mais caros
+    """
+    codigo = (
+        f"import sys, json; import {modulo}; "
+        f"print(json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in {MODULOS_PROIBIDOS!r})))"
+    )
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        capture_output=True, text=True, cwd=DIRETORIO_PROJETO
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}: {processo.stderr.strip().splitlines()[-1]}")
+
+    # Formato: "import time:  self [us] | cumulative | imported package"
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, proprio, acumulado, nome = [campo.strip() for campo in linha.replace('import time:', '|', 1).split('|')]
+        tempos[nome.strip()] = int(acumulado) / 1000
+
+    return {
+        'tempo_ms': tempos.get(modulo, 0.0),
+        'proibidos': json.loads(processo.stdout.strip().splitlines()[-1]),
+        'mais_caros': sorted(((n, t) for n, t in tempos.items() if n != modulo),
+                             key=lambda item: item[1], reverse=True)[:5]
+    }
+
+
+def executar_benchmark(modulos: List[str], repeticoes: int, orcamento_ms: float) -> Dict:
+    """
+    Mede todos os módulos e verifica orçamento e dependências proibidas
+
+    Returns:
+        Relatório com a mediana de cada módulo e a lista de falhas
+    """
+    relatorio = {'orcamento_ms': orcamento_ms, 'modulos': {}, 'falhas': []}
+
+    for modulo in modulos:
+        medicoes = [medir_importacao(modulo) for _ in range(repeticoes)]
+        mediana = statistics.median(m['tempo_ms'] for m in medicoes)
+        proibidos = medicoes[0]['proibidos']
+
+        relatorio['modulos'][modulo] = {
+            'mediana_ms': round(mediana, 2),
+            'proibidos': proibidos,
+            'mais_caros': medicoes[0]['mais_caros']
+        }
+
+        if proibidos:
+            relatorio['falhas'].append(f"{modulo} carregou {', '.join(proibidos)}")
+        if mediana > orcamento_ms:
+            relatorio['falhas'].append(f"{modulo} levou {mediana:.1f} ms (orçamento {orcamento_ms:.0f} ms)")
+
+    return relatorio
+
+
+def main() -> int:
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de importação do backend headless")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Importações por módulo (usa a mediana)")
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_PADRAO_MS,
+                        help="Tempo máximo de importação por módulo")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    parser.add_argument('modulos', nargs='*', default=MODULOS_HEADLESS)
+    args = parser.parse_args()
+
+    relatorio = executar_benchmark(args.modulos, args.repeticoes, args.orcamento_ms)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        print("⏱️ Tempo de importação (mediana):")
+        for modulo, dados in relatorio['modulos'].items():
+            print(f"   • {modulo:<22} {dados['mediana_ms']:>8.1f} ms")
+        for falha in relatorio['falhas']:
+            print(f"❌ {falha}")
+        if not relatorio['falhas']:
+            print("✅ Nenhuma regressão de importação")
+
+    return 1 if relatorio['falhas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
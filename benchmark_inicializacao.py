@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+🚀 BENCHMARK DE INICIALIZAÇÃO - SISTEMA VERMELINHO
+Busync - Partida a frio com orçamento de tempo
+
+Cada repetição abre um interpretador novo (nenhum módulo carregado) que
+executa a abertura com um RastreadorInicializacao: no modo 'interface', as
+importações, a InterfaceProfissionalMelhorada e o primeiro ciclo ocioso do
+Tk; no modo 'nucleo' (máquinas sem display), as importações, a montagem da
+rede e as posições do visualizador. O processo pai mede o tempo de parede
+de cada partida, incluindo a subida do interpretador, e reporta a mediana
+por etapa e os imports mais lentos.
+
+Se a mediana do tempo de parede passar do orçamento, o programa termina
+com código 1 (para uso em CI).
+
+Exemplos:
+    python benchmark_inicializacao.py --repeticoes 5 --orcamento 2.5
+    python benchmark_inicializacao.py --modo nucleo --json
+
+Salve como: benchmark_inicializacao.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from rastreador_inicializacao import RastreadorInicializacao
+
+# Tempo de parede máximo (mediana) de uma partida a frio (s)
+ORCAMENTO_PADRAO = 3.0
+
+REPETICOES_PADRAO = 5
+
+MODOS = ('interface', 'nucleo')
+
+
+def modo_padrao() -> str:
+    """'interface' se houver display para o Tk, 'nucleo' caso contrário"""
+    if sys.platform in ('win32', 'darwin') or os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'):
+        return 'interface'
+    return 'nucleo'
+
+
+def partida(modo: str) -> Dict:
+    """
+    Executa a abertura neste processo (deve ser um interpretador novo)
+
+    Returns:
+        Relatório do RastreadorInicializacao
+    """
+    rastreador = RastreadorInicializacao()
+    if modo == 'interface':
+        with rastreador.importacoes():
+            from sistema_completo_integrado_CORRIGIDO import InterfaceProfissionalMelhorada
+        interface = InterfaceProfissionalMelhorada(rastreador)
+        # Processa o desenho da janela e o after_idle que marca o pronto
+        interface.root.update()
+        rastreador.marcar_pronto()
+        interface.fechar()
+    else:
+        with rastreador.importacoes():
+            from sistema_backend import SistemaVermelhinho
+            from visualizador_grafo import VisualizadorGrafo
+        with rastreador.etapa('backend'):
+            sistema = SistemaVermelhinho()
+        with rastreador.etapa('visualizador'):
+            VisualizadorGrafo(sistema)
+        rastreador.marcar_pronto()
+    return rastreador.relatorio()
+
+
+def medir_partida(modo: str, tempo_limite: float = 120.0) -> Dict:
+    """
+    Uma partida a frio em um subprocesso
+
+    Returns:
+        Relatório da partida com 'parede_ms' (da criação do processo até o
+        relatório) e 'interpretador_ms' (subida do Python e do script)
+
+    Raises:
+        RuntimeError: Se a partida falhar
+    """
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, os.path.abspath(__file__), '--filho', '--modo', modo],
+                              capture_output=True, text=True, encoding='utf-8', timeout=tempo_limite,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+    parede = (time.perf_counter() - inicio) * 1000
+    if processo.returncode != 0:
+        raise RuntimeError(f"Partida '{modo}' falhou:\n{processo.stderr.strip()[-2000:]}")
+    relatorio = json.loads(processo.stdout.strip().splitlines()[-1])
+    relatorio['parede_ms'] = round(parede, 2)
+    relatorio['interpretador_ms'] = round(parede - relatorio['pronto_ms'], 2)
+    return relatorio
+
+
+def _mediana(valores: List[float]) -> float:
+    return round(statistics.median(valores), 2)
+
+
+def executar_benchmark(modo: str, repeticoes: int = REPETICOES_PADRAO, orcamento: float = ORCAMENTO_PADRAO,
+                       modulos: int = 10) -> Dict:
+    """
+    Repete a partida a frio e resume as medianas
+
+    Args:
+        modo: 'interface' ou 'nucleo'
+        repeticoes: Partidas (cada uma em um processo novo)
+        orcamento: Tempo de parede máximo da mediana (s)
+        modulos: Imports mais lentos incluídos no relatório
+
+    Returns:
+        Relatório com parede, pronto e etapas (medianas), imports mais
+        lentos e se o orçamento foi respeitado
+    """
+    partidas = [medir_partida(modo) for _ in range(repeticoes)]
+
+    etapas: Dict[str, List[float]] = {}
+    for relatorio in partidas:
+        for etapa in relatorio['etapas']:
+            if not etapa['adiada']:
+                etapas.setdefault(etapa['nome'], []).append(etapa['duracao_ms'])
+    importacoes: Dict[str, List[float]] = {}
+    for relatorio in partidas:
+        for modulo, tempos in relatorio['importacoes'].items():
+            importacoes.setdefault(modulo, []).append(tempos['proprio_ms'])
+
+    parede = _mediana([relatorio['parede_ms'] for relatorio in partidas])
+    return {
+        'modo': modo,
+        'repeticoes': repeticoes,
+        'orcamento_ms': orcamento * 1000,
+        'dentro_do_orcamento': parede <= orcamento * 1000,
+        'parede_ms': parede,
+        'parede_max_ms': max(relatorio['parede_ms'] for relatorio in partidas),
+        'interpretador_ms': _mediana([relatorio['interpretador_ms'] for relatorio in partidas]),
+        'pronto_ms': _mediana([relatorio['pronto_ms'] for relatorio in partidas]),
+        'etapas_ms': {nome: _mediana(valores) for nome, valores in etapas.items()},
+        # Tempo próprio: o custo do módulo em si, sem as dependências
+        'importacoes_proprio_ms': dict(sorted(
+            ((modulo, _mediana(valores)) for modulo, valores in importacoes.items()),
+            key=lambda item: -item[1])[:modulos]),
+    }
+
+
+def main() -> int:
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark de partida a frio do Sistema Vermelinho")
+    parser.add_argument('--modo', choices=MODOS, default=None,
+                        help="'interface' (Tk) ou 'nucleo' (sem display); padrão: conforme o display")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO)
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO_PADRAO,
+                        help="Tempo de parede máximo da mediana (s)")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    modo = args.modo or modo_padrao()
+
+    if args.filho:
+        # Mensagens da abertura vão para stderr; stdout leva só o relatório
+        stdout = sys.stdout
+        sys.stdout = sys.stderr
+        relatorio = partida(modo)
+        sys.stdout = stdout
+        print(json.dumps(relatorio, ensure_ascii=False))
+        return 0
+
+    try:
+        relatorio = executar_benchmark(modo, args.repeticoes, args.orcamento)
+    except RuntimeError as erro:
+        print(f"❌ {erro}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        print(f"🚀 Partida a frio ({relatorio['modo']}, mediana de {relatorio['repeticoes']})")
+        print(f"   • Parede: {relatorio['parede_ms']:.0f} ms (máx {relatorio['parede_max_ms']:.0f} ms) | "
+              f"interpretador {relatorio['interpretador_ms']:.0f} ms | pronto {relatorio['pronto_ms']:.0f} ms")
+        for nome, duracao in relatorio['etapas_ms'].items():
+            print(f"   • {nome:<22} {duracao:9.1f} ms")
+        print("   Imports mais lentos (tempo próprio):")
+        for modulo, duracao in relatorio['importacoes_proprio_ms'].items():
+            print(f"   • {modulo:<30} {duracao:7.1f} ms")
+        simbolo = '✅' if relatorio['dentro_do_orcamento'] else '❌'
+        print(f"{simbolo} Orçamento: {relatorio['orcamento_ms']:.0f} ms")
+
+    return 0 if relatorio['dentro_do_orcamento'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
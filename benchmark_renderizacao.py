@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+🖼️ BENCHMARK DE RENDERIZAÇÃO - SISTEMA VERMELINHO
+Busync - Tempo para desenhar a rede inteira no VisualizadorGrafo
+
+Para cada tamanho, gera uma rede sintética, monta a figura
+(criar_visualizacao) e a rasteriza com o backend Agg, sem janela. Mede
+também a troca da rota destacada, que deve ficar barata mesmo em redes
+grandes. Com o nível de detalhe, o desenho depende do que está na vista,
+não do tamanho da rede. O benchmark falha se a renderização completa
+passar do orçamento.
+
+Salve como: benchmark_renderizacao.py
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Tamanhos padrão de rede (pontos)
+TAMANHOS_PADRAO = [1_000, 20_000, 100_000]
+
+# Orçamento padrão da renderização completa da maior rede (ms)
+ORCAMENTO_PADRAO_MS = 5000.0
+
+
+def medir_renderizacao(total_pontos: int, repeticoes: int) -> Dict:
+    """
+    Mede a renderização completa e a troca de rota em uma rede sintética
+
+    Returns:
+        Dicionário com pontos, arestas, mediana da montagem da figura, do
+        desenho completo e da troca de rota (ms)
+    """
+    from gerador_rede import gerar_rede_sintetica
+    from visualizador_grafo import VisualizadorGrafo, plt
+
+    sistema = gerar_rede_sintetica(total_pontos, semente=total_pontos)
+    visualizador = VisualizadorGrafo(sistema)
+    ids = list(sistema.pontos.keys())
+    rota = sistema.calcular_rota(ids[0], ids[-1])
+
+    montagem, desenho, destaque = [], [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        visualizador.criar_visualizacao()
+        meio = time.perf_counter()
+        visualizador.fig.canvas.draw()
+        fim = time.perf_counter()
+        montagem.append((meio - inicio) * 1000)
+        desenho.append((fim - meio) * 1000)
+
+        if rota['encontrada']:
+            inicio = time.perf_counter()
+            visualizador.destacar_rota(rota['pontos'])
+            destaque.append((time.perf_counter() - inicio) * 1000)
+
+    plt.close('all')
+    return {
+        'pontos': len(sistema.pontos),
+        'arestas': sistema.grafo.number_of_edges(),
+        'montagem_ms': round(statistics.median(montagem), 1),
+        'desenho_ms': round(statistics.median(desenho), 1),
+        'total_ms': round(statistics.median(m + d for m, d in zip(montagem, desenho)), 1),
+        'destaque_ms': round(statistics.median(destaque), 1) if destaque else None,
+    }
+
+
+def executar_benchmark(tamanhos: List[int], repeticoes: int, orcamento_ms: float) -> Dict:
+    """
+    Mede todos os tamanhos e verifica o orçamento
+
+    Returns:
+        Relatório com as medições de cada tamanho e a lista de falhas
+    """
+    relatorio = {'orcamento_ms': orcamento_ms, 'redes': [], 'falhas': []}
+
+    for total_pontos in tamanhos:
+        medicao = medir_renderizacao(total_pontos, repeticoes)
+        relatorio['redes'].append(medicao)
+        if medicao['total_ms'] > orcamento_ms:
+            relatorio['falhas'].append(f"{medicao['pontos']} pontos levaram {medicao['total_ms']:.0f} ms "
+                                       f"(orçamento {orcamento_ms:.0f} ms)")
+
+    return relatorio
+
+
+def main() -> int:
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark de renderização da rede no VisualizadorGrafo")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Renderizações por tamanho (usa a mediana)")
+    parser.add_argument('--orcamento-ms', type=float, default=ORCAMENTO_PADRAO_MS,
+                        help="Tempo máximo da renderização completa")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    parser.add_argument('tamanhos', nargs='*', type=int, default=TAMANHOS_PADRAO)
+    args = parser.parse_args()
+
+    # Sem janela: rasterização pura com Agg
+    import matplotlib
+    matplotlib.use('Agg')
+
+    relatorio = executar_benchmark(args.tamanhos, args.repeticoes, args.orcamento_ms)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        print("🖼️ Renderização da rede (mediana):")
+        print(f"   {'pontos':>8} {'arestas':>8} {'montagem':>10} {'desenho':>10} {'total':>10} {'rota':>8}")
+        for medicao in relatorio['redes']:
+            destaque = f"{medicao['destaque_ms']:.1f}" if medicao['destaque_ms'] is not None else '-'
+            print(f"   {medicao['pontos']:>8} {medicao['arestas']:>8} {medicao['montagem_ms']:>8.1f}ms "
+                  f"{medicao['desenho_ms']:>8.1f}ms {medicao['total_ms']:>8.1f}ms {destaque:>6}ms")
+        for falha in relatorio['falhas']:
+            print(f"❌ {falha}")
+        if not relatorio['falhas']:
+            print("✅ Renderização dentro do orçamento")
+
+    return 1 if relatorio['falhas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
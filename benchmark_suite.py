@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+📏 SUÍTE DE BENCHMARKS - SISTEMA VERMELINHO
+Busync - Medições repetíveis do backend, com percentis e comparação com baseline
+
+Cada caso roda um aquecimento, depois repete a operação medindo com
+time.perf_counter_ns e resume as amostras em mínimo, média, p50, p90, p99
+e máximo. Os casos cobrem a montagem da rede, a carga do snapshot
+compilado, consultas simples e acessíveis (pares origem-destino sorteados
+com semente fixa), roteamento em lote e a renderização do grafo, na rede
+real de Maricá e em redes sintéticas.
+
+O relatório sai em JSON (com dados da máquina) e pode ser comparado com um
+baseline gravado antes: um caso cujo p50 piore além da tolerância é
+apontado como regressão e o programa termina com código 1.
+
+Salve como: benchmark_suite.py
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from importacao_preguicosa import modulo_disponivel
+
+# Relatório padrão (lido também pelo dashboard da interface)
+ARQUIVO_RELATORIO = 'benchmark_resultados.json'
+
+# Piora relativa do p50 tolerada antes de acusar regressão
+TOLERANCIA_PADRAO = 0.25
+
+PERCENTIS = (50, 90, 99)
+
+# Tamanho padrão das redes sintéticas (pontos)
+SINTETICAS_PADRAO = [20_000]
+
+
+@dataclass
+class ConfiguracaoSuite:
+    """Parâmetros de execução, gravados junto com o relatório"""
+    consultas: int = 200
+    aquecimento: int = 20
+    repeticoes: int = 10
+    repeticoes_pesadas: int = 3
+    tamanho_lote: int = 200
+    semente: int = 0
+
+
+def resumir(amostras_ns: Sequence[int], operacoes: int = 1) -> Dict[str, float]:
+    """
+    Resume amostras de tempo em milissegundos
+
+    Args:
+        amostras_ns: Duração de cada repetição (ns)
+        operacoes: Operações feitas em cada repetição (para a vazão)
+
+    Returns:
+        n, min, média, percentis e máximo em ms (e ops/s se operacoes > 1)
+    """
+    amostras = np.asarray(amostras_ns, dtype=np.float64) / 1e6
+    resumo = {
+        'n': int(len(amostras)),
+        'min_ms': round(float(amostras.min()), 4),
+        'media_ms': round(float(amostras.mean()), 4),
+    }
+    for p in PERCENTIS:
+        resumo[f'p{p}_ms'] = round(float(np.percentile(amostras, p)), 4)
+    resumo['max_ms'] = round(float(amostras.max()), 4)
+    if operacoes > 1:
+        resumo['operacoes'] = operacoes
+        resumo['ops_por_s'] = round(operacoes / (float(np.median(amostras)) / 1000), 1)
+    return resumo
+
+
+def medir(funcao: Callable, argumentos: Sequence[tuple], aquecimento: int = 0) -> List[int]:
+    """
+    Mede cada chamada de ``funcao(*args)`` após o aquecimento
+
+    Args:
+        funcao: Operação medida
+        argumentos: Argumentos de cada repetição
+        aquecimento: Chamadas iniciais descartadas (caches, JIT do SO)
+
+    Returns:
+        Duração de cada repetição em ns
+    """
+    for args in argumentos[:aquecimento]:
+        funcao(*args)
+    amostras = []
+    for args in argumentos:
+        inicio = time.perf_counter_ns()
+        funcao(*args)
+        amostras.append(time.perf_counter_ns() - inicio)
+    return amostras
+
+
+def pares_od(sistema, quantidade: int, semente: int, apenas_acessivel: bool = False) -> List[tuple]:
+    """Pares origem-destino distintos sorteados com semente fixa"""
+    ids = list(sistema.pontos.keys())
+    if apenas_acessivel:
+        acessivel = sistema.compilar().acessivel
+        ids = [ponto_id for indice, ponto_id in enumerate(ids) if acessivel[indice]]
+    gerador = random.Random(semente)
+    return [tuple(gerador.sample(ids, 2)) for _ in range(quantidade)] if len(ids) > 1 else []
+
+
+# ---------------------------------------------------------------- casos
+
+def caso_construcao(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Dict:
+    """Montagem da rede (NetworkX + tabela de pontos) e compilação CSR"""
+    return resumir(medir(lambda: fabrica().compilar(), [()] * config.repeticoes_pesadas, aquecimento=1))
+
+
+def caso_snapshot(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Dict:
+    """Carga do snapshot .npz do grafo compilado"""
+    from grafo_compilado import GrafoCompilado
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'rede.npz')
+        sistema.compilar().salvar(caminho)
+        return resumir(medir(GrafoCompilado.carregar, [(caminho,)] * config.repeticoes, aquecimento=1))
+
+
+def caso_consulta(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Dict:
+    """Consultas calcular_rota entre pares sorteados"""
+    pares = pares_od(sistema, config.consultas, config.semente)
+    sistema.compilar()
+    return resumir(medir(sistema.calcular_rota, pares, config.aquecimento))
+
+
+def caso_consulta_acessivel(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Dict:
+    """Consultas com filtro de acessibilidade entre pontos acessíveis"""
+    pares = [par + (True,) for par in pares_od(sistema, config.consultas, config.semente + 1, True)]
+    return resumir(medir(sistema.calcular_rota, pares, config.aquecimento))
+
+
+def caso_lote_od(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Dict:
+    """Matriz origem-destino pelo roteamento em lote (processo atual)"""
+    from roteamento_lote import Consulta, RoteadorLote
+
+    grafo = sistema.compilar()
+    consultas = [Consulta(f"{origem},{destino}", grafo.indice(origem), grafo.indice(destino), False)
+                 for origem, destino in pares_od(sistema, config.tamanho_lote, config.semente + 2)]
+
+    def rotear():
+        RoteadorLote(sistema, io.StringIO(), tamanho_lote=len(consultas)).executar(iter(consultas))
+
+    return resumir(medir(rotear, [()] * config.repeticoes_pesadas, aquecimento=1), operacoes=len(consultas))
+
+
+def caso_renderizacao(fabrica: Callable, sistema, config: ConfiguracaoSuite) -> Optional[Dict]:
+    """Desenho completo do grafo no VisualizadorGrafo (Agg, sem janela)"""
+    if not modulo_disponivel('matplotlib'):
+        return None
+    import matplotlib
+    matplotlib.use('Agg')
+    from visualizador_grafo import VisualizadorGrafo, plt
+
+    visualizador = VisualizadorGrafo(sistema)
+
+    def desenhar():
+        visualizador.criar_visualizacao()
+        visualizador.fig.canvas.draw()
+
+    try:
+        return resumir(medir(desenhar, [()] * config.repeticoes_pesadas, aquecimento=1))
+    finally:
+        plt.close('all')
+
+
+CASOS = {
+    'construcao': caso_construcao,
+    'snapshot': caso_snapshot,
+    'consulta': caso_consulta,
+    'consulta_acessivel': caso_consulta_acessivel,
+    'lote_od': caso_lote_od,
+    'renderizacao': caso_renderizacao,
+}
+
+
+def redes_padrao(sinteticas: Sequence[int], incluir_real: bool = True) -> Dict[str, Callable]:
+    """Fábricas das redes medidas: a real de Maricá e as sintéticas"""
+    redes = {}
+    if incluir_real:
+        from sistema_backend import SistemaVermelhinho
+        redes['real'] = SistemaVermelhinho
+    for total in sinteticas:
+        from gerador_rede import gerar_rede_sintetica
+        redes[f'sintetica_{total}'] = lambda total=total: gerar_rede_sintetica(total, semente=total)
+    return redes
+
+
+# ------------------------------------------------------------ execução
+
+def executar_suite(redes: Dict[str, Callable], casos: Sequence[str],
+                   config: ConfiguracaoSuite, progresso: Callable[[str], None] = None) -> Dict:
+    """
+    Executa os casos em cada rede
+
+    Returns:
+        Relatório com máquina, configuração e resumo de cada (rede, caso)
+    """
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'maquina': {
+            'plataforma': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'cpus': os.cpu_count(),
+        },
+        'configuracao': asdict(config),
+        'resultados': {},
+    }
+
+    for nome_rede, fabrica in redes.items():
+        sistema = fabrica()
+        resultados = relatorio['resultados'][nome_rede] = {
+            '_rede': {'pontos': len(sistema.pontos), 'conexoes': sistema.grafo.number_of_edges()}
+        }
+        for nome_caso in casos:
+            if progresso:
+                progresso(f"{nome_rede}/{nome_caso}")
+            resumo = CASOS[nome_caso](fabrica, sistema, config)
+            if resumo is not None:
+                resultados[nome_caso] = resumo
+
+    return relatorio
+
+
+def comparar(relatorio: Dict, baseline: Dict, tolerancia: float = TOLERANCIA_PADRAO) -> List[str]:
+    """
+    Compara o p50 de cada caso com o baseline
+
+    Returns:
+        Descrição das regressões (vazia se nenhuma)
+    """
+    regressoes = []
+    for nome_rede, casos in relatorio['resultados'].items():
+        for nome_caso, resumo in casos.items():
+            anterior = baseline.get('resultados', {}).get(nome_rede, {}).get(nome_caso)
+            if nome_caso.startswith('_') or not anterior:
+                continue
+            if resumo['p50_ms'] > anterior['p50_ms'] * (1 + tolerancia):
+                regressoes.append(f"{nome_rede}/{nome_caso}: p50 {resumo['p50_ms']:.3f} ms "
+                                  f"(baseline {anterior['p50_ms']:.3f} ms, "
+                                  f"+{(resumo['p50_ms'] / anterior['p50_ms'] - 1) * 100:.0f}%)")
+    return regressoes
+
+
+def carregar_relatorio(caminho: str = ARQUIVO_RELATORIO) -> Optional[Dict]:
+    """Lê um relatório gravado (None se não existir ou estiver inválido)"""
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> int:
+    """Executa a suíte pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do Sistema Vermelinho")
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), default=list(CASOS))
+    parser.add_argument('--sintetica', type=int, nargs='*', default=SINTETICAS_PADRAO,
+                        help="Tamanhos das redes sintéticas (pontos)")
+    parser.add_argument('--sem-real', action='store_true', help="Não mede a rede real de Maricá")
+    parser.add_argument('--consultas', type=int, default=ConfiguracaoSuite.consultas)
+    parser.add_argument('--repeticoes', type=int, default=ConfiguracaoSuite.repeticoes)
+    parser.add_argument('--semente', type=int, default=ConfiguracaoSuite.semente)
+    parser.add_argument('--saida', default=ARQUIVO_RELATORIO, help="Arquivo JSON do relatório")
+    parser.add_argument('--baseline', help="Relatório anterior para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help="Piora relativa do p50 tolerada (0.25 = 25%%)")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    config = ConfiguracaoSuite(consultas=args.consultas, repeticoes=args.repeticoes, semente=args.semente)
+    redes = redes_padrao(args.sintetica, incluir_real=not args.sem_real)
+    # As redes são construídas (e reconstruídas) durante a suíte; as
+    # mensagens de carga vão para stderr para não misturar com o JSON
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    relatorio = executar_suite(redes, args.casos, config,
+                               progresso=lambda etapa: print(f"⏳ {etapa}", file=sys.stderr))
+    sys.stdout = stdout
+
+    regressoes = []
+    if args.baseline:
+        baseline = carregar_relatorio(args.baseline)
+        if baseline is None:
+            print(f"❌ Baseline não encontrado: {args.baseline}", file=sys.stderr)
+            return 2
+        regressoes = comparar(relatorio, baseline, args.tolerancia)
+        relatorio['regressoes'] = regressoes
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        print(f"📏 Benchmarks ({relatorio['maquina']['python']}, {relatorio['maquina']['cpus']} CPUs)")
+        for nome_rede, casos in relatorio['resultados'].items():
+            rede = casos['_rede']
+            print(f"\n🗺️ {nome_rede}: {rede['pontos']:,} pontos, {rede['conexoes']:,} conexões")
+            print(f"   {'caso':<20} {'n':>4} {'p50':>10} {'p90':>10} {'p99':>10} {'vazão':>12}")
+            for nome_caso, resumo in casos.items():
+                if nome_caso.startswith('_'):
+                    continue
+                vazao = f"{resumo['ops_por_s']:,.0f}/s" if 'ops_por_s' in resumo else ''
+                print(f"   {nome_caso:<20} {resumo['n']:>4} {resumo['p50_ms']:>8.3f}ms "
+                      f"{resumo['p90_ms']:>8.3f}ms {resumo['p99_ms']:>8.3f}ms {vazao:>12}")
+        if args.saida:
+            print(f"\n💾 Relatório: {args.saida}")
+        for regressao in regressoes:
+            print(f"❌ Regressão: {regressao}")
+        if args.baseline and not regressoes:
+            print("✅ Nenhuma regressão em relação ao baseline")
+
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
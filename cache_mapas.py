@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+🗺️ CACHE DE MAPAS - SISTEMA VERMELINHO
+Busync - Mapa base Folium gerado uma vez por versão da rede
+
+Montar o mapa Folium (marcadores, popups, camadas de tiles e plugins) é a
+parte cara; a rota é só uma linha e dois pontos. O cache guarda o HTML do
+mapa base de cada versão da rede e, para cada rota, grava uma cópia com
+uma pequena camada GeoJSON injetada no final da página. Os arquivos de
+rota ficam em ``mapa/`` com nome derivado do caminho e são reaproveitados;
+acima do limite, os usados há mais tempo são apagados (LRU).
+
+A versão da rede é um contador do processo (recomeça a cada execução),
+então os arquivos levam no nome a impressão digital do HTML do mapa base
+montado por esta instância: arquivos de outra execução ou de outra rede
+no mesmo diretório nunca contam como acerto.
+
+Este módulo não importa o Folium: quem monta o mapa base é o chamador.
+
+Salve como: cache_mapas.py
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from metricas import METRICAS, MetricasRotas
+
+# Diretório dos mapas gerados (relativo ao diretório de trabalho)
+DIRETORIO_PADRAO = 'mapa'
+
+# Arquivos de rota mantidos em disco
+MAX_ROTAS = 64
+
+# Camada da rota: desenhada sobre o mapa base já carregado na página
+MODELO_CAMADA_ROTA = """
+<script>
+(function () {
+    var rota = %(geojson)s;
+    var camada = L.geoJSON(rota, {
+        style: function () { return {color: 'red', weight: 6, opacity: 0.9}; },
+        pointToLayer: function (ponto, coordenada) {
+            return L.circleMarker(coordenada, {radius: 9, color: ponto.properties.cor,
+                                               fillColor: ponto.properties.cor, fillOpacity: 0.9});
+        },
+        onEachFeature: function (elemento, camada) { camada.bindPopup(elemento.properties.popup); }
+    }).addTo(%(mapa)s);
+    %(mapa)s.fitBounds(camada.getBounds(), {padding: [30, 30]});
+})();
+</script>
+"""
+
+
+def geojson_rota(pontos: Sequence[Tuple[float, float, str]]) -> Dict:
+    """
+    Camada GeoJSON de uma rota: a linha do percurso, a origem e o destino
+
+    Args:
+        pontos: (latitude, longitude, nome) de cada ponto do caminho
+
+    Returns:
+        FeatureCollection (coordenadas em longitude, latitude)
+    """
+    coordenadas = [[longitude, latitude] for latitude, longitude, _ in pontos]
+    elementos = [{
+        'type': 'Feature',
+        'geometry': {'type': 'LineString', 'coordinates': coordenadas},
+        'properties': {'popup': '🚌 Rota Mais Rápida do Vermelinho'}
+    }]
+    for (latitude, longitude, nome), rotulo, cor in ((pontos[0], '🏁 ORIGEM', 'green'),
+                                                      (pontos[-1], '🎯 DESTINO', 'red')):
+        elementos.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+            'properties': {'popup': f"{rotulo}: {nome}", 'cor': cor}
+        })
+    return {'type': 'FeatureCollection', 'features': elementos}
+
+
+class CacheMapas:
+    """Mapa base por versão da rede e arquivos de rota com limpeza LRU"""
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, max_rotas: int = MAX_ROTAS,
+                 metricas: Optional[MetricasRotas] = METRICAS):
+        """
+        Args:
+            diretorio: Onde gravar o mapa base e os mapas de rota
+            max_rotas: Quantos arquivos de rota manter em disco
+            metricas: Onde contar acertos e falhas (None desliga)
+        """
+        self.diretorio = os.path.abspath(diretorio)
+        self.max_rotas = max_rotas
+        self.metricas = metricas
+        # (versão, HTML do mapa base, nome da variável JS do mapa, impressão digital)
+        self._base: Optional[Tuple[int, str, str, str]] = None
+        self._trava = threading.Lock()
+
+    def _garantir_base(self, versao: int, construir: Callable[[], Tuple[str, str]]) -> Tuple[str, str, str]:
+        """HTML, variável e impressão digital do mapa base da versão, montando só na primeira vez"""
+        acerto = self._base is not None and self._base[0] == versao
+        if self.metricas is not None:
+            self.metricas.registrar_cache('mapa_base', acerto)
+        if not acerto:
+            html, nome_mapa = construir()
+            impressao = hashlib.sha1(html.encode('utf-8')).hexdigest()[:16]
+            self._base = (versao, html, nome_mapa, impressao)
+            self._remover_bases_antigas(impressao)
+        return self._base[1], self._base[2], self._base[3]
+
+    def _caminho_base(self, impressao: str) -> str:
+        return os.path.join(self.diretorio, f"mapa_base_{impressao}.html")
+
+    def mapa_base(self, versao: int, construir: Callable[[], Tuple[str, str]]) -> str:
+        """
+        Arquivo do mapa base da versão (sem rota)
+
+        Args:
+            versao: Versão da rede (muda quando a rede é alterada)
+            construir: Monta o mapa; devolve (HTML, nome da variável JS do mapa)
+
+        Returns:
+            Caminho absoluto do arquivo HTML
+        """
+        with self._trava:
+            html, _, impressao = self._garantir_base(versao, construir)
+            caminho = self._caminho_base(impressao)
+            if not os.path.exists(caminho):
+                os.makedirs(self.diretorio, exist_ok=True)
+                self._gravar(caminho, html)
+            return caminho
+
+    def mapa_rota(self, versao: int, construir: Callable[[], Tuple[str, str]],
+                  caminho_rota: List[str], camada: Dict) -> str:
+        """
+        Arquivo do mapa com a rota destacada
+
+        Args:
+            versao: Versão da rede
+            construir: Monta o mapa base se ainda não estiver em cache
+            caminho_rota: IDs dos pontos da rota (chave do arquivo)
+            camada: GeoJSON da rota (ver geojson_rota)
+
+        Returns:
+            Caminho absoluto do arquivo HTML
+        """
+        chave = hashlib.sha1('\x1f'.join(caminho_rota).encode('utf-8')).hexdigest()[:16]
+
+        with self._trava:
+            # Só arquivos derivados do mapa base desta instância são válidos
+            html, nome_mapa, impressao = self._garantir_base(versao, construir)
+            caminho = os.path.join(self.diretorio, f"rota_{impressao}_{chave}.html")
+            acerto = os.path.exists(caminho)
+            if self.metricas is not None:
+                self.metricas.registrar_cache('mapa_rota', acerto)
+            if acerto:
+                os.utime(caminho)  # Marca como usado recentemente
+                return caminho
+
+            script = MODELO_CAMADA_ROTA % {'geojson': json.dumps(camada, ensure_ascii=False), 'mapa': nome_mapa}
+            # Depois do script do Folium, que cria a variável do mapa
+            posicao = html.rfind('</html>')
+            if posicao < 0:
+                posicao = len(html)
+            os.makedirs(self.diretorio, exist_ok=True)
+            self._gravar(caminho, html[:posicao] + script + html[posicao:])
+            self._limpar_rotas()
+            return caminho
+
+    @staticmethod
+    def _gravar(caminho: str, html: str):
+        """Grava de forma atômica (o navegador nunca vê um arquivo pela metade)"""
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(html)
+        os.replace(temporario, caminho)
+
+    def _arquivos(self, prefixo: str) -> List[str]:
+        try:
+            nomes = os.listdir(self.diretorio)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.diretorio, nome) for nome in nomes
+                if nome.startswith(prefixo) and nome.endswith('.html')]
+
+    def _limpar_rotas(self):
+        """Apaga os mapas de rota usados há mais tempo acima do limite"""
+        rotas = self._arquivos('rota_')
+        if len(rotas) <= self.max_rotas:
+            return
+        rotas.sort(key=lambda caminho: os.path.getmtime(caminho))
+        for caminho in rotas[:len(rotas) - self.max_rotas]:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+    def _remover_bases_antigas(self, impressao: str):
+        """Apaga mapas base e de rota de outros mapas base (versões anteriores ou outras execuções)"""
+        atual = self._caminho_base(impressao)
+        prefixo_atual = f"rota_{impressao}_"
+        for caminho in self._arquivos('mapa_base_') + self._arquivos('rota_'):
+            nome = os.path.basename(caminho)
+            if caminho != atual and not nome.startswith(prefixo_atual):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+
+    def limpar(self):
+        """Remove todos os mapas gerados e esquece o mapa base"""
+        with self._trava:
+            self._base = None
+            for caminho in self._arquivos('mapa_base_') + self._arquivos('rota_'):
+                os.remove(caminho)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    def construir_falso():
+        """Mapa base de mentira (sem Folium), só para exercitar o cache"""
+        time.sleep(0.2)
+        return "<!DOCTYPE html><html><body></body><script>var map_teste = L.map('m');</script></html>", 'map_teste'
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache = CacheMapas(diretorio, max_rotas=3)
+        inicio = time.perf_counter()
+        cache.mapa_base(1, construir_falso)
+        primeira = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for i in range(5):
+            camada = geojson_rota([(-22.91, -42.82, 'A'), (-22.92 - i / 100, -42.83, 'B')])
+            arquivo = cache.mapa_rota(1, construir_falso, ['A', f'B{i}'], camada)
+        demais = (time.perf_counter() - inicio) / 5
+
+        print(f"🗺️ Mapa base: {primeira * 1000:.0f} ms | rota: {demais * 1000:.1f} ms")
+        print(f"   • Rotas em disco: {len(cache._arquivos('rota_'))} (limite 3) | "
+              f"camada injetada: {'✅' if 'L.geoJSON' in open(arquivo, encoding='utf-8').read() else '❌'}")
+
+        # Outra instância (outra execução, versão de novo 1) com outra rede no
+        # mesmo diretório: os arquivos da anterior não podem ser reaproveitados
+        def construir_outro():
+            return construir_falso()[0].replace('map_teste', 'map_outro'), 'map_outro'
+
+        outra = CacheMapas(diretorio, max_rotas=3)
+        arquivo_outro = outra.mapa_rota(1, construir_outro, ['A', 'B4'], camada)
+        assert arquivo_outro != arquivo and not os.path.exists(arquivo), "Mapa de outra rede reaproveitado"
+        print("   • Outra rede no mesmo diretório: arquivos antigos descartados ✅")
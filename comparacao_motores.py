@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+🏁 COMPARAÇÃO DE MOTORES DE ROTA - SISTEMA VERMELINHO
+Busync - Todos os motores de menor caminho na mesma carga de consultas
+
+Cada motor recebe exatamente os mesmos pares origem-destino (sorteados com
+semente fixa, uma fração com filtro de acessibilidade) e a comparação
+verifica que todos chegam ao mesmo custo em cada consulta. Lado a lado
+saem vazão, latência p50/p99, pontos finalizados por busca e pico de
+memória alocada durante as consultas (tracemalloc, em uma passada separada
+para não distorcer os tempos).
+
+Motores atuais:
+    networkx - nx.single_source_dijkstra sobre o grafo do sistema
+    heapq    - SistemaVermelhinho.dijkstra_mais_rapido (sistema_transporte.py),
+               o código original rodando sobre uma cópia do grafo do backend
+    csr      - GrafoCompilado, usado por calcular_rota
+
+Para incluir um motor novo (A*, contraction hierarchies...), basta
+registrar em MOTORES uma função que recebe o sistema e devolve a função de
+consulta.
+
+Salve como: comparacao_motores.py
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+
+from benchmark_suite import pares_od, resumir
+
+# Relatório padrão (lido também pelo dashboard da interface)
+ARQUIVO_COMPARACAO = 'comparacao_motores.json'
+
+# Fração das consultas feitas com filtro de acessibilidade
+FRACAO_ACESSIVEL = 0.25
+
+# Resultado de uma consulta: (custo ou None se não houver caminho,
+# pontos finalizados ou None se o motor não expõe a contagem)
+Busca = Tuple[Optional[float], Optional[int]]
+Consultar = Callable[[str, str, bool], Busca]
+
+
+def _acessibilidade(sistema) -> Callable[[str], bool]:
+    """Função ID -> acessível, a partir da tabela compilada"""
+    grafo = sistema.compilar()
+    acessiveis = frozenset(grafo.id_do_indice(int(indice)) for indice in grafo.acessivel.nonzero()[0])
+    return acessiveis.__contains__
+
+
+# ------------------------------------------------------------- motores
+
+def motor_networkx(sistema) -> Consultar:
+    """nx.single_source_dijkstra (não expõe pontos finalizados)"""
+    grafo = sistema.grafo
+    acessivel = _acessibilidade(sistema)
+
+    def peso_acessivel(_, vizinho, dados):
+        return dados['weight'] if acessivel(vizinho) else None
+
+    def consultar(origem: str, destino: str, apenas_acessivel: bool) -> Busca:
+        try:
+            custo, _ = nx.single_source_dijkstra(grafo, origem, destino,
+                                                 weight=peso_acessivel if apenas_acessivel else 'weight')
+        except nx.NetworkXNoPath:
+            return None, None
+        return custo, None
+
+    return consultar
+
+
+def motor_heapq(sistema) -> Consultar:
+    """
+    SistemaVermelhinho.dijkstra_mais_rapido (sistema_transporte.py), sem mudanças
+
+    O método lê 'tempo' e 'acessivel' das arestas de self.grafo; o preparo
+    monta essa cópia do grafo do backend (aresta acessível quando os dois
+    pontos são, o que equivale ao filtro por ponto dos outros motores) e a
+    busca roda o código original, inicialização O(V) incluída. O método não
+    expõe os pontos finalizados.
+    """
+    from sistema_transporte import SistemaVermelhinho as SistemaTransporte
+
+    acessivel = _acessibilidade(sistema)
+    grafo = nx.Graph()
+    grafo.add_nodes_from(sistema.grafo.nodes)
+    grafo.add_edges_from((origem, destino, {'tempo': dados['weight'],
+                                            'acessivel': acessivel(origem) and acessivel(destino)})
+                         for origem, destino, dados in sistema.grafo.edges(data=True))
+    # Só o atributo grafo é usado pelo método; o construtor não é chamado
+    adaptado = SistemaTransporte.__new__(SistemaTransporte)
+    adaptado.grafo = grafo
+
+    def consultar(origem: str, destino: str, apenas_acessivel: bool) -> Busca:
+        caminho, custo = adaptado.dijkstra_mais_rapido(origem, destino, apenas_acessivel)
+        return (custo if caminho else None), None
+
+    return consultar
+
+
+def motor_csr(sistema) -> Consultar:
+    """GrafoCompilado (arrays CSR), o motor de calcular_rota"""
+    grafo = sistema.compilar()
+
+    def consultar(origem: str, destino: str, apenas_acessivel: bool) -> Busca:
+        contadores = {}
+        busca = grafo.menor_caminho(grafo.indice(origem), grafo.indice(destino), apenas_acessivel,
+                                    contadores=contadores)
+        return (busca[1] if busca is not None else None), contadores['pontos_finalizados']
+
+    return consultar
+
+
+MOTORES: Dict[str, Callable[[object], Consultar]] = {
+    'networkx': motor_networkx,
+    'heapq': motor_heapq,
+    'csr': motor_csr,
+}
+
+
+# ------------------------------------------------------------ comparação
+
+def gerar_carga(sistema, quantidade: int, semente: int,
+                fracao_acessivel: float = FRACAO_ACESSIVEL) -> List[Tuple[str, str, bool]]:
+    """
+    Consultas (origem, destino, apenas_acessivel) com semente fixa
+
+    As consultas acessíveis usam pares de pontos acessíveis, intercaladas
+    de forma determinística com as demais.
+    """
+    acessiveis = round(quantidade * fracao_acessivel)
+    carga = [par + (False,) for par in pares_od(sistema, quantidade - acessiveis, semente)]
+    carga += [par + (True,) for par in pares_od(sistema, acessiveis, semente + 1, apenas_acessivel=True)]
+    random.Random(semente).shuffle(carga)
+    return carga
+
+
+def medir_motor(consultar: Consultar, carga: Sequence[Tuple[str, str, bool]], aquecimento: int) -> Dict:
+    """
+    Mede um motor na carga inteira
+
+    Returns:
+        Resumo da latência, vazão, média de pontos finalizados, pico de
+        memória das consultas e os custos obtidos (na ordem da carga)
+    """
+    for consulta in carga[:aquecimento]:
+        consultar(*consulta)
+
+    amostras, custos, finalizados = [], [], []
+    for consulta in carga:
+        inicio = time.perf_counter_ns()
+        custo, total = consultar(*consulta)
+        amostras.append(time.perf_counter_ns() - inicio)
+        custos.append(custo)
+        if total is not None:
+            finalizados.append(total)
+
+    tracemalloc.start()
+    try:
+        for consulta in carga:
+            consultar(*consulta)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    resumo = resumir(amostras)
+    resumo['consultas_por_s'] = round(len(carga) / (sum(amostras) / 1e9), 1)
+    resumo['finalizados_medio'] = round(sum(finalizados) / len(finalizados), 1) if finalizados else None
+    resumo['pico_memoria_kb'] = round(pico / 1024, 1)
+    return {'resumo': resumo, 'custos': custos}
+
+
+def comparar_motores(sistema, motores: Sequence[str], consultas: int = 200,
+                     semente: int = 0, aquecimento: int = 20) -> Dict:
+    """
+    Roda todos os motores na mesma carga e confere os custos
+
+    Returns:
+        Relatório com o resumo de cada motor e as divergências de custo
+        (vazia quando todos concordam)
+    """
+    carga = gerar_carga(sistema, consultas, semente)
+    relatorio = {
+        'rede': {'pontos': len(sistema.pontos), 'conexoes': sistema.grafo.number_of_edges()},
+        'consultas': len(carga),
+        'semente': semente,
+        'motores': {},
+        'divergencias': [],
+    }
+
+    referencia = None
+    for nome in motores:
+        inicio = time.perf_counter_ns()
+        consultar = MOTORES[nome](sistema)
+        preparo_ms = (time.perf_counter_ns() - inicio) / 1e6
+        medicao = medir_motor(consultar, carga, aquecimento)
+        medicao['resumo']['preparo_ms'] = round(preparo_ms, 3)
+        relatorio['motores'][nome] = medicao['resumo']
+
+        if referencia is None:
+            referencia = (nome, medicao['custos'])
+            continue
+        for (origem, destino, acessivel), esperado, obtido in zip(carga, referencia[1], medicao['custos']):
+            iguais = (esperado is None and obtido is None) or (
+                esperado is not None and obtido is not None and math.isclose(esperado, obtido, rel_tol=1e-9))
+            if not iguais:
+                relatorio['divergencias'].append({
+                    'origem': origem, 'destino': destino, 'acessivel': acessivel,
+                    referencia[0]: esperado, nome: obtido,
+                })
+
+    return relatorio
+
+
+def main() -> int:
+    """Executa a comparação pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Comparação dos motores de menor caminho")
+    parser.add_argument('--motores', nargs='+', choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument('--sintetica', type=int, help="Usa uma rede sintética com N pontos em vez da real")
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=ARQUIVO_COMPARACAO, help="Arquivo JSON do relatório")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    # Mensagens de carga vão para stderr para não misturar com o JSON
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    if args.sintetica:
+        from gerador_rede import gerar_rede_sintetica
+        sistema = gerar_rede_sintetica(args.sintetica, semente=args.sintetica)
+    else:
+        from sistema_backend import SistemaVermelhinho
+        sistema = SistemaVermelhinho()
+    sys.stdout = stdout
+
+    relatorio = comparar_motores(sistema, args.motores, args.consultas, args.semente)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        rede = relatorio['rede']
+        print(f"🏁 {relatorio['consultas']} consultas em {rede['pontos']:,} pontos / {rede['conexoes']:,} conexões")
+        print(f"   {'motor':<10} {'consultas/s':>12} {'p50':>10} {'p99':>10} {'finalizados':>12} {'pico mem':>10}")
+        for nome, resumo in relatorio['motores'].items():
+            finalizados = f"{resumo['finalizados_medio']:,.0f}" if resumo['finalizados_medio'] is not None else '-'
+            print(f"   {nome:<10} {resumo['consultas_por_s']:>12,.0f} {resumo['p50_ms']:>8.3f}ms "
+                  f"{resumo['p99_ms']:>8.3f}ms {finalizados:>12} {resumo['pico_memoria_kb']:>8.0f}KB")
+        if relatorio['divergencias']:
+            print(f"❌ {len(relatorio['divergencias'])} consulta(s) com custos diferentes entre os motores")
+        else:
+            print("✅ Todos os motores chegaram aos mesmos custos")
+
+    return 1 if relatorio['divergencias'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
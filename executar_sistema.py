@@ -15,25 +15,38 @@ def main():
     print("=" * 50)
     print("🔧 Iniciando sistema...")
     
+    # Tempo de cada import e etapa da abertura (ver rastreador_inicializacao.py)
+    from rastreador_inicializacao import RastreadorInicializacao
+    rastreador = RastreadorInicializacao()
+    
     try:
         # Importar e testar sistema backend
         print("📦 Importando sistema backend...")
-        from sistema_backend import SistemaVermelhinho
+        with rastreador.importacoes('importacoes_backend'):
+            from sistema_backend import SistemaVermelhinho
         
-        sistema = SistemaVermelhinho()
+        with rastreador.etapa('backend'):
+            sistema = SistemaVermelhinho()
         print(f"✅ Backend carregado: {len(sistema.pontos)} pontos")
         
         # Importar interface
         print("🖥️ Carregando interface...")
-        import tkinter as tk
-        from tkinter import ttk, messagebox
+        with rastreador.importacoes('importacoes_interface'):
+            import tkinter as tk
+            from tkinter import ttk, messagebox
+            from executor_gui import ExecutorGUI
+            from perfilador import botao_perfil
         
         # Criar interface simplificada para teste
-        root = tk.Tk()
+        with rastreador.etapa('janela'):
+            root = tk.Tk()
         root.title("🚌 Sistema Vermelinho - Maricá Transport")
         root.geometry("1400x900")
         root.configure(bg='#f0f0f0')
         
+        # Cálculos em um worker persistente; a janela nunca espera a busca
+        executor = ExecutorGUI(root)
+        
         # Header
         header = tk.Frame(root, bg='#2C3E50', height=80)
         header.pack(fill=tk.X)
@@ -79,8 +92,6 @@ def main():
         
         def calcular_rota():
             """Calcula rota usando Dijkstra"""
-            nonlocal ultima_rota, pontos_rota
-            
             origem = combo_origem.get()
             destino = combo_destino.get()
             
@@ -103,14 +114,22 @@ def main():
                     id_destino = id_ponto
             
             if id_origem and id_destino:
-                resultado = sistema.calcular_rota(id_origem, id_destino)
+                # Um clique novo cancela a busca anterior e descarta o resultado dela
+                executor.enviar('rota',
+                                lambda cancelado: sistema.calcular_rota(id_origem, id_destino, cancelado=cancelado),
+                                exibir_rota,
+                                lambda erro: messagebox.showerror("Erro", f"Erro no cálculo:\n{erro}"))
+        
+        def exibir_rota(resultado):
+            """Mostra a rota calculada pelo worker (thread do Tk)"""
+            nonlocal ultima_rota, pontos_rota
+            
+            if resultado['encontrada']:
+                ultima_rota = resultado
+                pontos_rota = resultado['pontos']
                 
-                if resultado['encontrada']:
-                    ultima_rota = resultado
-                    pontos_rota = resultado['pontos']
-                    
-                    # Mostrar resultado
-                    texto_resultado = f"""🚌 ROTA CALCULADA COM SUCESSO!
+                # Mostrar resultado
+                texto_resultado = f"""🚌 ROTA CALCULADA COM SUCESSO!
                     
 📍 ORIGEM: {resultado['origem']}
 🎯 DESTINO: {resultado['destino']}
@@ -119,28 +138,28 @@ def main():
 ✅ STATUS: {resultado['status']}
 
 🗺️ PERCURSO:"""
-                    
-                    for i, ponto_id in enumerate(resultado['pontos']):
-                        ponto = sistema.pontos[ponto_id]
-                        if i == 0:
-                            texto_resultado += f"\n🏁 PARTIDA: {ponto.nome}"
-                        elif i == len(resultado['pontos']) - 1:
-                            texto_resultado += f"\n🎯 CHEGADA: {ponto.nome}"
-                        else:
-                            texto_resultado += f"\n🚏 PARADA {i}: {ponto.nome}"
-                    
-                    texto_resultado += "\n\n🌐 Clique em 'Ver no Google Maps' para visualizar!"
-                    
-                    # Mostrar no painel direito
-                    resultado_text.delete('1.0', tk.END)
-                    resultado_text.insert('1.0', texto_resultado)
-                    
-                    # Habilitar botão Google Maps
-                    btn_google_maps.config(state=tk.NORMAL, bg='#4285F4')
-                    
-                    messagebox.showinfo("Sucesso", "Rota calculada com sucesso!")
-                else:
-                    messagebox.showerror("Erro", "Não foi possível calcular a rota!")
+                
+                for i, ponto_id in enumerate(resultado['pontos']):
+                    ponto = sistema.pontos[ponto_id]
+                    if i == 0:
+                        texto_resultado += f"\n🏁 PARTIDA: {ponto.nome}"
+                    elif i == len(resultado['pontos']) - 1:
+                        texto_resultado += f"\n🎯 CHEGADA: {ponto.nome}"
+                    else:
+                        texto_resultado += f"\n🚏 PARADA {i}: {ponto.nome}"
+                
+                texto_resultado += "\n\n🌐 Clique em 'Ver no Google Maps' para visualizar!"
+                
+                # Mostrar no painel direito
+                resultado_text.delete('1.0', tk.END)
+                resultado_text.insert('1.0', texto_resultado)
+                
+                # Habilitar botão Google Maps
+                btn_google_maps.config(state=tk.NORMAL, bg='#4285F4')
+                
+                messagebox.showinfo("Sucesso", "Rota calculada com sucesso!")
+            else:
+                messagebox.showerror("Erro", "Não foi possível calcular a rota!")
         
         def abrir_google_maps():
             """Abre rota no Google Maps"""
@@ -269,10 +288,26 @@ Sistema pronto para uso!"""
                                fg='white', bg='#34495E')
         status_label.pack(side=tk.LEFT, padx=10, pady=5)
         
+        # Perfil das pilhas sob demanda (ver perfilador.py)
+        btn_perfil = botao_perfil(root, status_frame, status_label)
+        btn_perfil.pack(side=tk.RIGHT, padx=10)
+        
         print("✅ Interface carregada com sucesso!")
         print("🚀 Sistema pronto para uso!")
         
+        # Pronto quando o Tk ficar ocioso pela primeira vez (janela desenhada)
+        def inicializacao_concluida():
+            rastreador.marcar_pronto()
+            print(f"⏱️ {rastreador.resumo()}")
+        
+        root.after_idle(inicializacao_concluida)
+        
         # Executar interface
+        def fechar():
+            executor.encerrar()
+            root.destroy()
+        
+        root.protocol("WM_DELETE_WINDOW", fechar)
         root.mainloop()
         
     except ImportError as e:
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+🧵 EXECUTOR DA INTERFACE - SISTEMA VERMELINHO
+Busync - Worker único e persistente para tarefas pesadas das interfaces Tk
+
+As interfaces enviam cálculos (rotas, por exemplo) para um único thread de
+fundo que vive enquanto a janela existir. Cada envio recebe um número de
+sequência por canal: quando o resultado chega, só é entregue se ainda for
+o pedido mais recente daquele canal, então um clique lento antigo nunca
+sobrescreve um resultado novo. O pedido anterior do canal é cancelado por
+um threading.Event que a tarefa recebe (a busca de rotas o consulta
+periodicamente) e, se ainda estiver na fila, nem chega a rodar.
+
+O Tk não é thread-safe: o worker só coloca resultados em uma fila, e o
+thread principal a esvazia com root.after enquanto houver tarefas
+pendentes. O mainloop nunca espera pelo worker.
+
+Salve como: executor_gui.py
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Intervalo de verificação da fila de resultados enquanto há tarefas (ms)
+INTERVALO_VERIFICACAO_MS = 30
+
+# Espera padrão do debounce de mudanças rápidas nos controles (ms)
+ATRASO_DEBOUNCE_MS = 250
+
+
+class ExecutorGUI:
+    """Executor de um worker com sequência, cancelamento e debounce por canal"""
+
+    def __init__(self, root, intervalo_verificacao_ms: int = INTERVALO_VERIFICACAO_MS):
+        """
+        Args:
+            root: Janela Tk (ou qualquer widget) usada para root.after
+            intervalo_verificacao_ms: Intervalo de leitura da fila de resultados
+        """
+        self.root = root
+        self.intervalo_verificacao_ms = intervalo_verificacao_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='busync-gui')
+        self._resultados: queue.SimpleQueue = queue.SimpleQueue()
+        self._sequencias: Dict[str, int] = {}
+        self._cancelamentos: Dict[str, threading.Event] = {}
+        self._agendados: Dict[str, str] = {}
+        self._pendentes = 0
+        self._verificacao: Optional[str] = None
+        self._encerrado = False
+
+    # ------------------------------------------------------------- tarefas
+
+    def enviar(self, canal: str, funcao: Callable[[threading.Event], Any],
+               ao_concluir: Callable[[Any], None],
+               ao_falhar: Optional[Callable[[Exception], None]] = None) -> int:
+        """
+        Envia uma tarefa ao worker, substituindo a anterior do mesmo canal
+
+        Args:
+            canal: Nome do canal (ex.: 'rota'); só o último envio de cada
+                canal tem o resultado entregue
+            funcao: Executada no worker; recebe o Event de cancelamento
+            ao_concluir: Chamada no thread do Tk com o valor devolvido
+            ao_falhar: Chamada no thread do Tk com a exceção levantada
+
+        Returns:
+            Número de sequência do pedido no canal
+        """
+        if self._encerrado:
+            raise RuntimeError("Executor da interface já foi encerrado")
+
+        self.cancelar(canal)
+        sequencia = self._sequencias.get(canal, 0) + 1
+        self._sequencias[canal] = sequencia
+        cancelado = threading.Event()
+        self._cancelamentos[canal] = cancelado
+
+        self._executor.submit(self._executar, canal, sequencia, funcao, cancelado, ao_concluir, ao_falhar)
+        self._pendentes += 1
+        if self._verificacao is None:
+            self._verificacao = self.root.after(self.intervalo_verificacao_ms, self._verificar)
+        return sequencia
+
+    def cancelar(self, canal: str):
+        """Cancela o pedido em andamento do canal (o resultado será descartado)"""
+        cancelado = self._cancelamentos.pop(canal, None)
+        if cancelado is not None:
+            cancelado.set()
+
+    def _executar(self, canal: str, sequencia: int, funcao, cancelado: threading.Event,
+                  ao_concluir, ao_falhar):
+        """Roda no worker: nunca toca no Tk, só publica na fila"""
+        if cancelado.is_set():
+            self._resultados.put((canal, sequencia, None, None))
+            return
+        try:
+            valor = funcao(cancelado)
+        except Exception as erro:
+            # Falha de um pedido cancelado é só a interrupção da busca
+            retorno = None if cancelado.is_set() else ao_falhar
+            self._resultados.put((canal, sequencia, retorno, erro))
+        else:
+            self._resultados.put((canal, sequencia, ao_concluir, valor))
+
+    def _verificar(self):
+        """Roda no thread do Tk: entrega resultados que ainda são atuais"""
+        self._verificacao = None
+        while True:
+            try:
+                canal, sequencia, retorno, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            if sequencia != self._sequencias.get(canal) or retorno is None:
+                continue  # Pedido obsoleto ou cancelado
+            self._cancelamentos.pop(canal, None)
+            try:
+                retorno(valor)
+            except Exception as erro:
+                print(f"❌ Erro ao exibir resultado de '{canal}': {erro}")
+
+        if self._pendentes and not self._encerrado:
+            self._verificacao = self.root.after(self.intervalo_verificacao_ms, self._verificar)
+
+    # ------------------------------------------------------------ debounce
+
+    def agendar(self, canal: str, callback: Callable[[], None], atraso_ms: int = ATRASO_DEBOUNCE_MS):
+        """
+        Chama ``callback`` após ``atraso_ms`` sem novos agendamentos no canal
+
+        Cada chamada reinicia a espera, então uma sequência rápida de
+        mudanças (ex.: rolar o combo com o teclado) gera um único cálculo.
+        """
+        anterior = self._agendados.pop(canal, None)
+        if anterior is not None:
+            self.root.after_cancel(anterior)
+
+        def disparar():
+            self._agendados.pop(canal, None)
+            callback()
+
+        self._agendados[canal] = self.root.after(atraso_ms, disparar)
+
+    # ---------------------------------------------------------- ciclo de vida
+
+    @property
+    def ocupado(self) -> bool:
+        """Se há tarefas enviadas cujo resultado ainda não foi processado"""
+        return self._pendentes > 0
+
+    def encerrar(self):
+        """Cancela tudo e libera o worker (chamar antes de destruir a janela)"""
+        self._encerrado = True
+        for canal in list(self._cancelamentos):
+            self.cancelar(canal)
+        for identificador in [self._verificacao, *self._agendados.values()]:
+            if identificador is not None:
+                self.root.after_cancel(identificador)
+        self._verificacao = None
+        self._agendados.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import time
+
+    from gerador_rede import gerar_rede_sintetica
+
+    class RootSimulado:
+        """Substituto mínimo de tk.Tk (after/after_cancel) para rodar sem display"""
+
+        def __init__(self):
+            self._tarefas = {}
+            self._contador = 0
+
+        def after(self, atraso_ms, funcao):
+            self._contador += 1
+            identificador = f"after#{self._contador}"
+            self._tarefas[identificador] = (time.monotonic() + atraso_ms / 1000, funcao)
+            return identificador
+
+        def after_cancel(self, identificador):
+            self._tarefas.pop(identificador, None)
+
+        def processar(self, duracao):
+            fim = time.monotonic() + duracao
+            while time.monotonic() < fim:
+                agora = time.monotonic()
+                for identificador, (quando, funcao) in list(self._tarefas.items()):
+                    if quando <= agora and self._tarefas.pop(identificador, None):
+                        funcao()
+                time.sleep(0.005)
+
+    sistema = gerar_rede_sintetica(200_000, semente=3)
+    grafo = sistema.compilar()
+    ids = [grafo.id_do_indice(indice) for indice in (0, len(grafo) // 2, len(grafo) - 1)]
+
+    root = RootSimulado()
+    executor = ExecutorGUI(root)
+    entregues = []
+
+    # Três cliques seguidos: só o último deve aparecer
+    for destino in ids[1:] + ids[1:2]:
+        executor.enviar('rota', lambda cancelado, d=destino: sistema.calcular_rota(ids[0], d, cancelado=cancelado),
+                        lambda resultado: entregues.append(resultado['destino']))
+    root.processar(3.0)
+    esperado = sistema.pontos[ids[1]].nome
+    print(f"🧵 Entregues: {entregues} | "
+          f"{'✅' if entregues == [esperado] else '❌'} apenas o pedido mais recente")
+
+    # Debounce: cinco mudanças rápidas viram um único disparo
+    disparos = []
+    for _ in range(5):
+        executor.agendar('combo', lambda: disparos.append(time.monotonic()), atraso_ms=50)
+    root.processar(0.3)
+    print(f"   • Debounce: {len(disparos)} disparo(s) para 5 mudanças {'✅' if len(disparos) == 1 else '❌'}")
+    executor.encerrar()
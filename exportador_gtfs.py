@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+📤 EXPORTADOR GTFS/GEOJSON - SISTEMA VERMELINHO
+Busync - Exporta a rede para ferramentas externas
+
+Salve como: exportador_gtfs.py
+"""
+
+import csv
+import io
+import json
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from sistema_backend import SistemaVermelhinho
+
+# Buffer de escrita de cada arquivo (bytes)
+TAMANHO_BUFFER = 1 << 16
+
+# Horário de partida das viagens sintetizadas a partir dos tempos das arestas
+HORARIO_PARTIDA_PADRAO = 6 * 3600
+
+AGENCIA_PADRAO = {
+    'agency_id': 'EPT',
+    'agency_name': 'EPT - Empresa Pública de Transportes de Maricá',
+    'agency_url': 'https://www.marica.rj.gov.br',
+    'agency_timezone': 'America/Sao_Paulo',
+    'agency_lang': 'pt'
+}
+
+SERVICO_PADRAO = 'DIARIO'
+
+
+def formatar_horario(segundos: int) -> str:
+    """Converte segundos desde o início do dia em HH:MM:SS"""
+    return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+
+class ExportadorRede:
+    """Exporta pontos, linhas e conexões do SistemaVermelhinho"""
+
+    def __init__(self, sistema: SistemaVermelhinho):
+        """
+        Inicializa o exportador
+
+        Args:
+            sistema: Instância do SistemaVermelhinho a exportar
+        """
+        self.sistema = sistema
+
+    # ------------------------------------------------------------------ GTFS
+
+    def exportar_gtfs(self, destino: str) -> str:
+        """
+        Escreve um feed GTFS estático
+
+        Cada linha vira uma route com uma viagem de ida (direction_id 0) e uma
+        de volta (direction_id 1). Os horários são acumulados a partir do peso
+        das arestas, de modo que o importador reconstrói os mesmos tempos.
+        Conexões sem linha (integrações) são exportadas em transfers.txt.
+
+        Args:
+            destino: Diretório de saída ou caminho terminado em .zip
+
+        Returns:
+            Caminho do feed gerado
+        """
+        with self._destino(destino) as abrir:
+            with abrir('agency.txt') as arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(AGENCIA_PADRAO.keys())
+                escritor.writerow(AGENCIA_PADRAO.values())
+
+            with abrir('calendar.txt') as arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(['service_id', 'monday', 'tuesday', 'wednesday', 'thursday',
+                                   'friday', 'saturday', 'sunday', 'start_date', 'end_date'])
+                escritor.writerow([SERVICO_PADRAO, 1, 1, 1, 1, 1, 1, 1, '20240101', '20301231'])
+
+            with abrir('stops.txt') as arquivo:
+                self._escrever_pontos(csv.writer(arquivo))
+
+            with abrir('routes.txt') as arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(['route_id', 'agency_id', 'route_short_name', 'route_long_name',
+                                   'route_type', 'route_color', 'route_text_color'])
+                for linha_id, linha in self.sistema.linhas_vermelinho.items():
+                    escritor.writerow([linha_id, AGENCIA_PADRAO['agency_id'], linha_id,
+                                       linha['nome'], 3, 'C0392B', 'FFFFFF'])
+
+            with abrir('trips.txt') as arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(['route_id', 'service_id', 'trip_id', 'trip_headsign', 'direction_id'])
+                for linha_id, sentido, direcao, itinerario in self._viagens():
+                    headsign = self.sistema.pontos[itinerario[-1]].nome if itinerario else ''
+                    escritor.writerow([linha_id, SERVICO_PADRAO, f"{linha_id}_{sentido}", headsign, direcao])
+
+            with abrir('stop_times.txt') as arquivo:
+                self._escrever_horarios(csv.writer(arquivo))
+
+            with abrir('transfers.txt') as arquivo:
+                self._escrever_transferencias(csv.writer(arquivo))
+
+        print(f"✅ Feed GTFS exportado em: {destino}")
+        return destino
+
+    @contextmanager
+    def _destino(self, destino: str):
+        """Fornece uma função que abre arquivos de texto no diretório ou .zip de saída"""
+        if destino.lower().endswith('.zip'):
+            with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+                @contextmanager
+                def abrir(nome):
+                    with arquivo_zip.open(nome, 'w') as bruto:
+                        buffer = io.BufferedWriter(bruto, buffer_size=TAMANHO_BUFFER)
+                        texto = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+                        try:
+                            yield texto
+                        finally:
+                            texto.flush()
+                            buffer.flush()
+                            texto.detach()
+                yield abrir
+        else:
+            os.makedirs(destino, exist_ok=True)
+
+            @contextmanager
+            def abrir(nome):
+                with open(os.path.join(destino, nome), 'w', encoding='utf-8', newline='',
+                          buffering=TAMANHO_BUFFER) as arquivo:
+                    yield arquivo
+            yield abrir
+
+    def _escrever_pontos(self, escritor):
+        """Escreve stops.txt (vermelinho_tipo é uma coluna de extensão)"""
+        escritor.writerow(['stop_id', 'stop_name', 'stop_desc', 'stop_lat', 'stop_lon',
+                           'location_type', 'wheelchair_boarding', 'vermelinho_tipo'])
+        for ponto_id, ponto in self.sistema.pontos.items():
+            escritor.writerow([ponto_id, ponto.nome, ponto.endereco,
+                               f"{ponto.latitude:.6f}", f"{ponto.longitude:.6f}",
+                               0, 1 if ponto.acessivel else 2, ponto.tipo])
+
+    def _viagens(self) -> Iterator[Tuple[str, str, int, List[str]]]:
+        """Gera (linha_id, sentido, direction_id, itinerário) de cada viagem exportada"""
+        for linha_id, linha in self.sistema.linhas_vermelinho.items():
+            for sentido, direcao in (("ida", 0), ("volta", 1)):
+                itinerario = [p for p in linha.get(sentido, []) if p in self.sistema.pontos]
+                if len(itinerario) >= 2:
+                    yield linha_id, sentido, direcao, itinerario
+
+    def _tempo_segmento(self, ponto_a: str, ponto_b: str) -> float:
+        """Tempo em minutos entre dois pontos consecutivos de um itinerário"""
+        if self.sistema.grafo.has_edge(ponto_a, ponto_b):
+            return self.sistema.grafo[ponto_a][ponto_b]['weight']
+        return self.sistema._calcular_tempo_viagem(ponto_a, ponto_b)
+
+    def _escrever_horarios(self, escritor):
+        """
+        Escreve stop_times.txt agrupado por viagem e em ordem de stop_sequence,
+        o que permite ao importador_gtfs ler o feed sem ordenação externa
+        """
+        escritor.writerow(['trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence'])
+        for linha_id, sentido, _, itinerario in self._viagens():
+            trip_id = f"{linha_id}_{sentido}"
+            segundos = HORARIO_PARTIDA_PADRAO
+            for sequencia, ponto_id in enumerate(itinerario, start=1):
+                if sequencia > 1:
+                    anterior = itinerario[sequencia - 2]
+                    segundos += int(round(self._tempo_segmento(anterior, ponto_id) * 60))
+                horario = formatar_horario(segundos)
+                escritor.writerow([trip_id, horario, horario, ponto_id, sequencia])
+
+    def _escrever_transferencias(self, escritor):
+        """
+        Escreve transfers.txt com as arestas que nenhuma viagem percorre
+
+        As arestas das viagens carregam o atributo ``linha``; as de integração
+        carregam só o ``tipo`` (integracao, compartilhada).
+        """
+        escritor.writerow(['from_stop_id', 'to_stop_id', 'transfer_type',
+                           'min_transfer_time', 'vermelinho_tipo'])
+        for ponto_a, ponto_b, dados in self.sistema.grafo.edges(data=True):
+            if 'linha' in dados:
+                continue
+            segundos = int(round(dados['weight'] * 60))
+            tipo = dados.get('tipo', 'integracao')
+            escritor.writerow([ponto_a, ponto_b, 2, segundos, tipo])
+            escritor.writerow([ponto_b, ponto_a, 2, segundos, tipo])
+
+    # --------------------------------------------------------------- GeoJSON
+
+    def exportar_geojson(self, caminho: str) -> str:
+        """
+        Escreve a rede como FeatureCollection GeoJSON
+
+        Pontos viram Point, conexões e itinerários viram LineString. As
+        features são escritas uma a uma, sem montar a coleção em memória.
+
+        Args:
+            caminho: Arquivo .geojson de saída
+
+        Returns:
+            Caminho do arquivo gerado
+        """
+        with open(caminho, 'w', encoding='utf-8', buffering=TAMANHO_BUFFER) as arquivo:
+            arquivo.write('{"type": "FeatureCollection", "features": [\n')
+            primeira = True
+            for feature in self._features():
+                if not primeira:
+                    arquivo.write(',\n')
+                arquivo.write(json.dumps(feature, ensure_ascii=False))
+                primeira = False
+            arquivo.write('\n]}\n')
+
+        print(f"✅ GeoJSON exportado em: {caminho}")
+        return caminho
+
+    def _coordenada(self, ponto_id: str) -> List[float]:
+        """Coordenada [lon, lat] de um ponto, na ordem exigida pelo GeoJSON"""
+        ponto = self.sistema.pontos[ponto_id]
+        return [ponto.longitude, ponto.latitude]
+
+    def _features(self) -> Iterator[dict]:
+        """Gera as features da rede"""
+        for ponto_id, ponto in self.sistema.pontos.items():
+            yield {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [ponto.longitude, ponto.latitude]},
+                'properties': {
+                    'camada': 'ponto',
+                    'id': ponto_id,
+                    'nome': ponto.nome,
+                    'endereco': ponto.endereco,
+                    'tipo': ponto.tipo,
+                    'acessivel': ponto.acessivel,
+                    'linhas': list(ponto.linhas)
+                }
+            }
+
+        for ponto_a, ponto_b, dados in self.sistema.grafo.edges(data=True):
+            yield {
+                'type': 'Feature',
+                'geometry': {'type': 'LineString',
+                             'coordinates': [self._coordenada(ponto_a), self._coordenada(ponto_b)]},
+                'properties': {
+                    'camada': 'conexao',
+                    'origem': ponto_a,
+                    'destino': ponto_b,
+                    'tempo': dados['weight'],
+                    'linha': dados.get('linha'),
+                    'tipo': dados.get('tipo', 'linha')
+                }
+            }
+
+        for linha_id, sentido, _, itinerario in self._viagens():
+            yield {
+                'type': 'Feature',
+                'geometry': {'type': 'LineString',
+                             'coordinates': [self._coordenada(p) for p in itinerario]},
+                'properties': {
+                    'camada': 'itinerario',
+                    'linha': linha_id,
+                    'nome': self.sistema.linhas_vermelinho[linha_id]['nome'],
+                    'sentido': sentido
+                }
+            }
+
+
+def exportar_gtfs(sistema: SistemaVermelhinho, destino: str) -> str:
+    """Atalho para exportar o sistema como feed GTFS"""
+    return ExportadorRede(sistema).exportar_gtfs(destino)
+
+
+def exportar_geojson(sistema: SistemaVermelhinho, caminho: str) -> str:
+    """Atalho para exportar o sistema como GeoJSON"""
+    return ExportadorRede(sistema).exportar_geojson(caminho)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    print("🧪 Exportando a rede do Sistema Vermelinho...")
+
+    sistema = SistemaVermelhinho()
+    exportador = ExportadorRede(sistema)
+    exportador.exportar_gtfs("vermelinho_gtfs.zip")
+    exportador.exportar_geojson("vermelinho.geojson")
+
+    # Recarregar pelo importador para conferir a ida e volta
+    from importador_gtfs import importar_gtfs
+    recarregado = importar_gtfs("vermelinho_gtfs.zip")
+    print(f"   • Pontos: {len(sistema.pontos)} → {len(recarregado.pontos)}")
+    print(f"   • Conexões: {sistema.grafo.number_of_edges()} → {recarregado.grafo.number_of_edges()}")
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+🏗️ GERADOR DE REDE SINTÉTICA - SISTEMA VERMELINHO
+Busync - Redes de transporte realistas para testes de escala e desempenho
+
+A rede cresce como a de Maricá: um terminal central, terminais de bairro
+ligados por linhas troncais, e linhas radiais que saem dos terminais,
+compartilham o trecho inicial de outras linhas (como E02/E08/E09 saindo da
+Rodoviária pela Av. Roberto Silveira) e depois seguem por um corredor
+próprio. Algumas linhas terminam em um ponto de outra linha, formando
+pontos de integração.
+
+Salve como: gerador_rede.py
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sistema_backend import SistemaVermelhinho
+
+# Centro de referência (Terminal Rodoviário de Maricá)
+LATITUDE_CENTRO = -22.9194
+LONGITUDE_CENTRO = -42.8186
+KM_POR_GRAU = 111.32
+
+# Escalas usadas pelos benchmarks
+ESCALAS_PADRAO = (1_000, 10_000, 100_000, 1_000_000)
+
+# Tipos de via de cada linha e o acréscimo de tempo por segmento
+# (mesma regra de SistemaVermelhinho._calcular_tempo_viagem)
+TIPOS_VIA = (("Rua", 0), ("Av.", 1), ("Estrada", 1))
+
+
+class GeradorRedeSintetica:
+    """Gera um SistemaVermelhinho sintético, determinístico para uma semente"""
+
+    def __init__(self, total_pontos: int, semente: int = 0,
+                 pontos_por_linha: Tuple[int, int] = (12, 40),
+                 espacamento_km: Tuple[float, float] = (0.25, 0.6),
+                 pontos_por_terminal: int = 1500,
+                 fracao_trecho_compartilhado: float = 0.6,
+                 fracao_integracao: float = 0.2,
+                 fracao_acessivel: float = 0.85):
+        """
+        Args:
+            total_pontos: Quantidade exata de pontos da rede (mínimo 2)
+            semente: Semente do gerador aleatório
+            pontos_por_linha: Faixa de pontos por linha
+            espacamento_km: Faixa de distância entre pontos consecutivos
+            pontos_por_terminal: Um terminal para cada N pontos
+            fracao_trecho_compartilhado: Chance de uma linha começar pelo trecho de outra
+            fracao_integracao: Chance de uma linha terminar em ponto de outra linha
+            fracao_acessivel: Fração aproximada de pontos acessíveis. Os não
+                acessíveis ficam no trecho final de algumas linhas (ruas sem
+                calçada na periferia), não espalhados pelo meio dos corredores
+        """
+        if total_pontos < 2:
+            raise ValueError("A rede sintética precisa de pelo menos 2 pontos")
+
+        self.total_pontos = total_pontos
+        self.semente = semente
+        self.pontos_por_linha = pontos_por_linha
+        self.espacamento_km = espacamento_km
+        self.pontos_por_terminal = pontos_por_terminal
+        self.fracao_trecho_compartilhado = fracao_trecho_compartilhado
+        self.fracao_integracao = fracao_integracao
+        self.fracao_acessivel = fracao_acessivel
+
+        self.rng = np.random.default_rng(semente)
+        # Coordenadas em km relativas ao centro (x = leste, y = norte)
+        self._x = np.empty(total_pontos, dtype=np.float64)
+        self._y = np.empty(total_pontos, dtype=np.float64)
+        # Tipo de via de cada ponto (índice em TIPOS_VIA)
+        self._via = np.zeros(total_pontos, dtype=np.uint8)
+        self._acessivel = np.ones(total_pontos, dtype=bool)
+        self._total = 0
+        self._terminais: List[int] = []
+        # Cada linha: (id, nome, sequência de ida, índice do tipo de via)
+        self._linhas: List[Tuple[str, str, List[int], int]] = []
+        self._linhas_por_terminal: Dict[int, List[int]] = {}
+
+    # ------------------------------------------------------------ geometria
+
+    def _novo_ponto(self, x: float, y: float, via: int) -> Optional[int]:
+        """Cria um ponto; retorna None quando a rede já está completa"""
+        if self._total >= self.total_pontos:
+            return None
+        indice = self._total
+        self._x[indice], self._y[indice], self._via[indice] = x, y, via
+        self._total += 1
+        return indice
+
+    def _novos_pontos(self, xs: np.ndarray, ys: np.ndarray, via: int) -> List[int]:
+        """Cria vários pontos de uma vez, respeitando o total"""
+        quantidade = min(len(xs), self.total_pontos - self._total)
+        inicio = self._total
+        self._x[inicio:inicio + quantidade] = xs[:quantidade]
+        self._y[inicio:inicio + quantidade] = ys[:quantidade]
+        self._via[inicio:inicio + quantidade] = via
+        self._total += quantidade
+        return list(range(inicio, inicio + quantidade))
+
+    def _raio_km(self) -> float:
+        """Raio da área urbana, crescendo com a raiz do número de pontos"""
+        return max(4.0, 3.0 * math.sqrt(self.total_pontos / 100))
+
+    # -------------------------------------------------------------- geração
+
+    def gerar(self) -> SistemaVermelhinho:
+        """Gera a rede e monta o SistemaVermelhinho"""
+        self._gerar_terminais()
+        self._gerar_troncais()
+        while self._total < self.total_pontos:
+            self._gerar_linha_radial()
+        return self._montar_sistema()
+
+    def _gerar_terminais(self):
+        """Terminal central na origem e terminais de bairro espalhados"""
+        quantidade = max(1, min(self.total_pontos // 2, round(self.total_pontos / self.pontos_por_terminal)))
+        self._terminais.append(self._novo_ponto(0.0, 0.0, 1))
+
+        raio = self._raio_km()
+        for _ in range(quantidade - 1):
+            # Distribuição uniforme no disco
+            distancia = raio * math.sqrt(self.rng.uniform(0.05, 1.0))
+            angulo = self.rng.uniform(0, 2 * math.pi)
+            self._terminais.append(self._novo_ponto(distancia * math.cos(angulo),
+                                                    distancia * math.sin(angulo), 1))
+
+    def _gerar_troncais(self):
+        """Liga cada terminal de bairro ao terminal mais próximo já conectado"""
+        for posicao, terminal in enumerate(self._terminais[1:], start=1):
+            anteriores = np.array(self._terminais[:posicao])
+            distancias = np.hypot(self._x[anteriores] - self._x[terminal],
+                                  self._y[anteriores] - self._y[terminal])
+            destino = int(anteriores[np.argmin(distancias)])
+
+            comprimento = float(distancias.min())
+            passos = max(1, int(comprimento / np.mean(self.espacamento_km)))
+            t = np.linspace(0, 1, passos + 1)[1:-1]
+            ruido = self.rng.normal(0, 0.08, size=(2, len(t)))
+            xs = self._x[terminal] + (self._x[destino] - self._x[terminal]) * t + ruido[0]
+            ys = self._y[terminal] + (self._y[destino] - self._y[terminal]) * t + ruido[1]
+            intermediarios = self._novos_pontos(xs, ys, 1)
+
+            self._registrar_linha(f"TERMINAL {posicao:03d} X TERMINAL {self._terminais.index(destino):03d} (TRONCAL)",
+                                  [terminal] + intermediarios + [destino], terminal, 1)
+
+    def _gerar_linha_radial(self):
+        """Gera uma linha saindo de um terminal, possivelmente pelo trecho de outra"""
+        # O terminal central concentra as linhas, como a Rodoviária, mas sem
+        # virar um nó com milhares de vizinhos nas redes grandes
+        if len(self._terminais) > 1 and self.rng.random() > min(0.3, 3 / len(self._terminais)):
+            terminal = self._terminais[int(self.rng.integers(1, len(self._terminais)))]
+        else:
+            terminal = self._terminais[0]
+
+        sequencia = [terminal]
+        irmas = self._linhas_por_terminal.get(terminal, [])
+        if irmas and self.rng.random() < self.fracao_trecho_compartilhado:
+            ida_irma = self._linhas[irmas[int(self.rng.integers(len(irmas)))]][2]
+            if len(ida_irma) > 2:
+                sequencia = list(ida_irma[:int(self.rng.integers(2, min(len(ida_irma), 10)))])
+
+        via = int(self.rng.integers(len(TIPOS_VIA)))
+        quantidade = int(self.rng.integers(*self.pontos_por_linha)) - len(sequencia) + 1
+        quantidade = max(1, quantidade)
+
+        # Corredor: passeio aleatório com direção persistente, afastando-se do centro
+        ultimo = sequencia[-1]
+        x0, y0 = self._x[ultimo], self._y[ultimo]
+        rumo = math.atan2(y0, x0) if (x0 or y0) else self.rng.uniform(0, 2 * math.pi)
+        rumo += self.rng.normal(0, 0.6)
+        rumos = rumo + np.cumsum(self.rng.normal(0, 0.25, quantidade))
+        passos = self.rng.uniform(*self.espacamento_km, quantidade)
+        xs = x0 + np.cumsum(passos * np.cos(rumos))
+        ys = y0 + np.cumsum(passos * np.sin(rumos))
+        novos = self._novos_pontos(xs, ys, via)
+        sequencia += novos
+
+        # Último quarto do corredor sem acessibilidade, em parte das linhas
+        if novos and self.rng.random() < min(1.0, (1 - self.fracao_acessivel) * 4):
+            self._acessivel[novos[-max(1, len(novos) // 4):]] = False
+
+        # Integração: termina em um ponto de outra linha
+        if self._linhas and self.rng.random() < self.fracao_integracao:
+            outra = self._linhas[int(self.rng.integers(len(self._linhas)))][2]
+            ponto = outra[int(self.rng.integers(len(outra)))]
+            if ponto not in sequencia:
+                sequencia.append(ponto)
+
+        if len(sequencia) < 2:
+            return
+        numero = len(self._linhas) + 1
+        self._registrar_linha(f"TERMINAL {self._terminais.index(terminal):03d} X BAIRRO {numero:05d} (VIA {TIPOS_VIA[via][0].upper()})",
+                              sequencia, terminal, via)
+
+    def _registrar_linha(self, nome: str, ida: List[int], terminal: int, via: int):
+        """Guarda a linha e indexa pelo terminal de origem"""
+        self._linhas_por_terminal.setdefault(terminal, []).append(len(self._linhas))
+        self._linhas.append((f"S{len(self._linhas) + 1:05d}", nome, ida, via))
+
+    def _volta(self, ida: List[int]) -> List[int]:
+        """Sequência de volta: a ida invertida, às vezes pulando uma parada (expresso)"""
+        volta = ida[::-1]
+        if len(volta) > 4 and self.rng.random() < 0.4:
+            del volta[int(self.rng.integers(1, len(volta) - 1))]
+        return volta
+
+    # ------------------------------------------------------------- montagem
+
+    def _ids(self) -> List[str]:
+        """IDs dos pontos: terminais com prefixo T, demais com prefixo P"""
+        terminais = set(self._terminais)
+        return [f"T{i:07d}" if i in terminais else f"P{i:07d}" for i in range(self._total)]
+
+    def _tempos(self, origens: np.ndarray, destinos: np.ndarray) -> np.ndarray:
+        """
+        Tempo de cada segmento, com a regra de SistemaVermelhinho._calcular_tempo_viagem
+        aplicada de forma vetorizada (2.4 min/km, mínimo 2, acréscimo por via, máximo 15)
+        """
+        distancias = np.hypot(self._x[origens] - self._x[destinos], self._y[origens] - self._y[destinos])
+        tempos = np.maximum(2, (distancias * 2.4).astype(np.int64))
+        terminal = np.zeros(self._total, dtype=bool)
+        terminal[self._terminais] = True
+        acrescimos = np.array([acrescimo for _, acrescimo in TIPOS_VIA], dtype=np.int64)
+        acrescimo = np.where(terminal[origens] | terminal[destinos], 2,
+                             np.maximum(acrescimos[self._via[origens]], acrescimos[self._via[destinos]]))
+        return np.minimum(tempos + acrescimo, 15)
+
+    def _montar_sistema(self) -> SistemaVermelhinho:
+        """Converte a rede gerada em um SistemaVermelhinho"""
+        sistema = SistemaVermelhinho(carregar_rede_padrao=False)
+        ids = self._ids()
+        n = self._total
+
+        latitudes = LATITUDE_CENTRO + self._y[:n] / KM_POR_GRAU
+        longitudes = LONGITUDE_CENTRO + self._x[:n] / (KM_POR_GRAU * math.cos(math.radians(LATITUDE_CENTRO)))
+        terminais = set(self._terminais)
+
+        for i, ponto_id in enumerate(ids):
+            if i in terminais:
+                nome = f"Terminal {self._terminais.index(i):03d}"
+            else:
+                nome = f"{TIPOS_VIA[self._via[i]][0]} Sintética {i}"
+            sistema.pontos.adicionar(ponto_id, nome, f"{nome}, Maricá",
+                                     float(latitudes[i]), float(longitudes[i]),
+                                     bool(self._acessivel[i]),
+                                     "terminal" if i in terminais else "parada")
+        sistema.grafo.add_nodes_from(ids)
+
+        # Segmentos únicos: o primeiro que aparecer define a linha da aresta
+        vistos = set()
+        origens, destinos, linhas_aresta = [], [], []
+        for linha_id, nome, ida, _ in self._linhas:
+            volta = self._volta(ida)
+            sistema.linhas_vermelinho[linha_id] = {
+                "nome": nome,
+                "ida": [ids[i] for i in ida],
+                "volta": [ids[i] for i in volta]
+            }
+            for sequencia in (ida, volta):
+                for a, b in zip(sequencia, sequencia[1:]):
+                    chave = (a, b) if a < b else (b, a)
+                    if a == b or chave in vistos:
+                        continue
+                    vistos.add(chave)
+                    origens.append(a)
+                    destinos.append(b)
+                    linhas_aresta.append(linha_id)
+            for i in set(ida):
+                sistema.pontos.vincular_linha(ids[i], linha_id)
+        sistema.pontos.compactar()
+
+        tempos = self._tempos(np.array(origens, dtype=np.int64), np.array(destinos, dtype=np.int64))
+        sistema.grafo.add_edges_from(
+            (ids[a], ids[b], {'weight': int(t), 'linha': linha})
+            for a, b, t, linha in zip(origens, destinos, tempos, linhas_aresta)
+        )
+        return sistema
+
+
+def gerar_rede_sintetica(total_pontos: int, semente: int = 0, **parametros) -> SistemaVermelhinho:
+    """
+    Gera uma rede sintética realista
+
+    Args:
+        total_pontos: Quantidade de pontos (1k a 1M nas escalas padrão)
+        semente: Semente para resultados reprodutíveis
+        **parametros: Demais parâmetros de GeradorRedeSintetica
+
+    Returns:
+        SistemaVermelhinho com pontos, linhas (ida/volta) e conexões
+    """
+    return GeradorRedeSintetica(total_pontos, semente, **parametros).gerar()
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import sys
+
+    escalas = [int(valor) for valor in sys.argv[1:]] or list(ESCALAS_PADRAO[:3])
+    print("🧪 Gerando redes sintéticas...")
+
+    for total in escalas:
+        inicio = time.perf_counter()
+        sistema = gerar_rede_sintetica(total, semente=42)
+        duracao = time.perf_counter() - inicio
+        graus = [grau for _, grau in sistema.grafo.degree()]
+        print(f"   • {total:>9,} pontos | {sistema.grafo.number_of_edges():>9,} conexões | "
+              f"{len(sistema.linhas_vermelinho):>6,} linhas | grau máx {max(graus)} | {duracao:.2f}s")
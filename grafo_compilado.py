@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+🧮 GRAFO COMPILADO - SISTEMA VERMELINHO
+Busync - Rede em arrays planos (CSR) para roteamento rápido e compartilhável
+
+O grafo do NetworkX é um dicionário de dicionários: cada leitura mexe na
+contagem de referências de milhares de objetos espalhados pela memória, o
+que destrói o copy-on-write entre processos. Aqui a rede vira um punhado
+de arrays NumPy contíguos (ponteiros, vizinhos, pesos, linha de cada
+aresta) e os IDs ficam em um único bloco de bytes UTF-8. A busca de
+Dijkstra lê esses buffers por memoryview sem tocar em objetos Python da
+rede.
+
+Salve como: grafo_compilado.py
+"""
+
+import heapq
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Rótulo dos segmentos sem linha (integrações e trechos compartilhados)
+SEM_LINHA = -1
+
+# Pontos finalizados entre duas verificações do pedido de cancelamento
+INTERVALO_CANCELAMENTO = 1024
+
+
+# Arrays gravados no snapshot .npz (além do blob de IDs e das linhas)
+CAMPOS_SNAPSHOT = ('ids_ptr', 'ordem_ids', 'indptr', 'vizinhos', 'pesos',
+                   'linha_aresta', 'acessivel', 'latitudes', 'longitudes')
+
+
+class BuscaCancelada(Exception):
+    """A busca foi interrompida porque o pedido ficou obsoleto"""
+
+
+class GrafoCompilado:
+    """Rede não direcionada em formato CSR, com índices iguais aos da TabelaPontos"""
+
+    def __init__(self, ids_blob: bytes, ids_ptr: np.ndarray, ordem_ids: np.ndarray,
+                 indptr: np.ndarray, vizinhos: np.ndarray, pesos: np.ndarray,
+                 linha_aresta: np.ndarray, linhas: List[str], acessivel: np.ndarray,
+                 latitudes: np.ndarray, longitudes: np.ndarray, versao: int = 0):
+        """
+        Args:
+            ids_blob: IDs dos pontos concatenados em UTF-8
+            ids_ptr: Início de cada ID no blob (n + 1 posições)
+            ordem_ids: Índices dos pontos em ordem crescente de ID (busca binária)
+            indptr: Início da lista de vizinhos de cada ponto (n + 1 posições)
+            vizinhos: Índice do vizinho de cada aresta
+            pesos: Tempo (min) de cada aresta
+            linha_aresta: Código da linha de cada aresta (SEM_LINHA se não houver)
+            linhas: IDs das linhas, na ordem dos códigos
+            acessivel: 1 se o ponto é acessível
+            latitudes: Latitude de cada ponto
+            longitudes: Longitude de cada ponto
+            versao: Versão da rede que originou a compilação
+        """
+        self.ids_blob = ids_blob
+        self.ids_ptr = ids_ptr
+        self.ordem_ids = ordem_ids
+        self.indptr = indptr
+        self.vizinhos = vizinhos
+        self.pesos = pesos
+        self.linha_aresta = linha_aresta
+        self.linhas = linhas
+        self.acessivel = acessivel
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.versao = versao
+
+        # memoryviews devolvem int/float nativos, bem mais rápido que indexar NumPy
+        self._mv_ids_ptr = memoryview(ids_ptr)
+        self._mv_ordem = memoryview(ordem_ids)
+        self._mv_indptr = memoryview(indptr)
+        self._mv_vizinhos = memoryview(vizinhos)
+        self._mv_pesos = memoryview(pesos)
+        self._mv_linha = memoryview(linha_aresta)
+        self._mv_acessivel = memoryview(acessivel)
+
+    @classmethod
+    def de_sistema(cls, sistema) -> 'GrafoCompilado':
+        """
+        Compila o grafo de um SistemaVermelhinho
+
+        Args:
+            sistema: Sistema com pontos (TabelaPontos) e grafo NetworkX
+
+        Returns:
+            GrafoCompilado com a versão atual da rede
+        """
+        pontos = sistema.pontos
+        ids = list(pontos)
+        codigos_linha = {}
+        linhas: List[str] = []
+
+        ponteiros = [0]
+        vizinhos, pesos, linha_aresta = [], [], []
+        adjacencia = sistema.grafo.adj
+        for ponto_id in ids:
+            for vizinho, dados in adjacencia[ponto_id].items() if ponto_id in adjacencia else ():
+                if vizinho not in pontos:
+                    continue
+                vizinhos.append(pontos.indice(vizinho))
+                pesos.append(dados.get('weight', 1))
+                linha = dados.get('linha')
+                if linha is None:
+                    linha_aresta.append(SEM_LINHA)
+                else:
+                    if linha not in codigos_linha:
+                        codigos_linha[linha] = len(linhas)
+                        linhas.append(linha)
+                    linha_aresta.append(codigos_linha[linha])
+            ponteiros.append(len(vizinhos))
+
+        codificados = [ponto_id.encode('utf-8') for ponto_id in ids]
+        ids_ptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in codificados], out=ids_ptr[1:])
+        ordem = sorted(range(len(ids)), key=codificados.__getitem__)
+
+        return cls(
+            ids_blob=b''.join(codificados),
+            ids_ptr=ids_ptr,
+            ordem_ids=np.array(ordem, dtype=np.int64),
+            indptr=np.array(ponteiros, dtype=np.int64),
+            vizinhos=np.array(vizinhos, dtype=np.int64),
+            pesos=np.array(pesos, dtype=np.float64),
+            linha_aresta=np.array(linha_aresta, dtype=np.int64),
+            linhas=linhas,
+            acessivel=pontos.acessiveis.astype(np.uint8),
+            latitudes=pontos.latitudes.copy(),
+            longitudes=pontos.longitudes.copy(),
+            versao=getattr(sistema, 'versao_rede', 0)
+        )
+
+    # ------------------------------------------------------------------ IDs
+
+    def __len__(self) -> int:
+        return len(self.ids_ptr) - 1
+
+    def _id_bytes(self, indice: int) -> bytes:
+        # Fatiar bytes já devolve uma cópia do trecho (que bytes() apenas
+        # reaproveita); com memória compartilhada o blob é um memoryview e
+        # bytes() copia só os bytes deste ID
+        return bytes(self.ids_blob[self._mv_ids_ptr[indice]:self._mv_ids_ptr[indice + 1]])
+
+    def id_do_indice(self, indice: int) -> str:
+        """ID do ponto na posição indicada"""
+        return self._id_bytes(indice).decode('utf-8')
+
+    def indice(self, ponto_id: str) -> Optional[int]:
+        """Índice do ponto pelo ID (busca binária no blob), ou None"""
+        alvo = ponto_id.encode('utf-8')
+        ordem = self._mv_ordem
+        inicio, fim = 0, len(ordem)
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if self._id_bytes(ordem[meio]) < alvo:
+                inicio = meio + 1
+            else:
+                fim = meio
+        if inicio < len(ordem) and self._id_bytes(ordem[inicio]) == alvo:
+            return ordem[inicio]
+        return None
+
+    # --------------------------------------------------------------- arestas
+
+    @property
+    def total_arestas(self) -> int:
+        """Arestas não direcionadas (cada uma aparece duas vezes no CSR)"""
+        return len(self.vizinhos) // 2
+
+    def segmento(self, origem: int, destino: int) -> Optional[Tuple[float, Optional[str]]]:
+        """
+        Peso e linha da aresta origem-destino
+
+        Returns:
+            (peso, linha ou None) ou None se não houver aresta
+        """
+        vizinhos = self._mv_vizinhos
+        for posicao in range(self._mv_indptr[origem], self._mv_indptr[origem + 1]):
+            if vizinhos[posicao] == destino:
+                codigo = self._mv_linha[posicao]
+                return self._mv_pesos[posicao], (None if codigo == SEM_LINHA else self.linhas[codigo])
+        return None
+
+    def segmentos(self, caminho) -> List[Optional[Tuple[float, Optional[str]]]]:
+        """(peso, linha) de cada trecho consecutivo de um caminho em índices"""
+        return [self.segmento(caminho[i], caminho[i + 1]) for i in range(len(caminho) - 1)]
+
+    def caminho_acessivel(self, caminho) -> bool:
+        """Se todos os pontos do caminho são acessíveis"""
+        acessivel = self._mv_acessivel
+        return all(acessivel[indice] for indice in caminho)
+
+    # --------------------------------------------------------------- busca
+
+    def _dijkstra(self, origem: int, alvos: Set[int], apenas_acessivel: bool,
+                  cancelado=None, contadores: Optional[Dict[str, int]] = None
+                  ) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Dijkstra com heap binário sobre o CSR, parando quando todos os alvos
+        forem finalizados (ou a componente acabar)
+
+        Args:
+            cancelado: threading.Event opcional; se for acionado durante a
+                busca, ela para com BuscaCancelada
+            contadores: Se informado, recebe pontos finalizados, arestas
+                relaxadas e inserções no heap (calculados depois do laço,
+                sem custo dentro dele)
+
+        Returns:
+            (distâncias finais, predecessor de cada ponto alcançado)
+        """
+        indptr, vizinhos, pesos = self._mv_indptr, self._mv_vizinhos, self._mv_pesos
+        acessivel = self._mv_acessivel if apenas_acessivel else None
+        contador = count()
+        restantes = len(alvos)
+
+        finalizados = {}
+        vistos = {origem: 0.0}
+        anterior = {origem: -1}
+        fila = [(0.0, next(contador), origem)]
+        verificar = cancelado.is_set if cancelado is not None else None
+
+        while fila:
+            distancia, _, atual = heapq.heappop(fila)
+            if atual in finalizados:
+                continue
+            finalizados[atual] = distancia
+            if verificar is not None and not len(finalizados) % INTERVALO_CANCELAMENTO and verificar():
+                raise BuscaCancelada()
+            if atual in alvos:
+                restantes -= 1
+                if not restantes:
+                    break
+            for posicao in range(indptr[atual], indptr[atual + 1]):
+                vizinho = vizinhos[posicao]
+                if vizinho in finalizados or (acessivel is not None and not acessivel[vizinho]):
+                    continue
+                nova = distancia + pesos[posicao]
+                if vizinho not in vistos or nova < vistos[vizinho]:
+                    vistos[vizinho] = nova
+                    anterior[vizinho] = atual
+                    heapq.heappush(fila, (nova, next(contador), vizinho))
+
+        if contadores is not None:
+            # Toda inserção consumiu um número do contador de desempate;
+            # as arestas relaxadas são as dos pontos finalizados, exceto as
+            # do último quando a busca parou nele (O(finalizados), sem varrer a rede)
+            indptr = self.indptr
+            indices = np.fromiter(finalizados, dtype=np.int64, count=len(finalizados))
+            relaxadas = int((indptr[indices + 1] - indptr[indices]).sum())
+            if alvos and not restantes:
+                relaxadas -= int(indptr[atual + 1] - indptr[atual])
+            contadores['pontos_finalizados'] = len(finalizados)
+            contadores['arestas_relaxadas'] = relaxadas
+            contadores['insercoes_heap'] = next(contador)
+
+        return finalizados, anterior
+
+    @staticmethod
+    def _reconstruir(anterior: Dict[int, int], destino: int) -> List[int]:
+        caminho = [destino]
+        while anterior[caminho[-1]] != -1:
+            caminho.append(anterior[caminho[-1]])
+        caminho.reverse()
+        return caminho
+
+    def menor_caminho(self, origem: int, destino: int, apenas_acessivel: bool = False,
+                      cancelado=None, contadores: Optional[Dict[str, int]] = None
+                      ) -> Optional[Tuple[List[int], float]]:
+        """
+        Menor caminho entre dois pontos
+
+        Encontra o mesmo custo que nx.shortest_path; quando há empate entre
+        caminhos de custo igual, o escolhido pode ser outro (desempate pela
+        ordem de inserção na fila).
+
+        Args:
+            origem: Índice do ponto de origem
+            destino: Índice do ponto de destino
+            apenas_acessivel: Se True, ignora pontos não acessíveis
+            cancelado: threading.Event opcional para interromper a busca
+            contadores: Dicionário opcional que recebe os contadores da busca
+
+        Returns:
+            (índices do caminho, tempo total) ou None se não houver caminho
+
+        Raises:
+            BuscaCancelada: Se ``cancelado`` for acionado durante a busca
+        """
+        finalizados, anterior = self._dijkstra(origem, {destino}, apenas_acessivel, cancelado, contadores)
+        if destino not in finalizados:
+            return None
+        return self._reconstruir(anterior, destino), finalizados[destino]
+
+    def menores_caminhos(self, origem: int, destinos: Iterable[int],
+                         apenas_acessivel: bool = False) -> Dict[int, Optional[Tuple[List[int], float]]]:
+        """
+        Menores caminhos de uma origem para vários destinos em uma única busca
+
+        Args:
+            origem: Índice do ponto de origem
+            destinos: Índices dos destinos
+            apenas_acessivel: Se True, ignora pontos não acessíveis
+
+        Returns:
+            Para cada destino, (índices do caminho, tempo total) ou None
+        """
+        alvos = set(destinos)
+        finalizados, anterior = self._dijkstra(origem, alvos, apenas_acessivel)
+        return {destino: (self._reconstruir(anterior, destino), finalizados[destino])
+                if destino in finalizados else None
+                for destino in alvos}
+
+    def mais_proximos(self, origens: Iterable[int], apenas_acessivel: bool = False
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Dijkstra com várias origens: para cada ponto, a origem mais próxima
+
+        Uma única busca cobre a rede inteira, partindo de todas as origens
+        com distância 0. Como a rede não é direcionada, o tempo de um ponto
+        até a origem mais próxima é o mesmo da origem até ele, e seguir os
+        predecessores a partir do ponto já dá o caminho na ordem da viagem.
+
+        Args:
+            origens: Índices dos pontos de partida (ex.: todos os terminais)
+            apenas_acessivel: Se True, ignora pontos não acessíveis (também
+                como origem); eles ficam sem origem mais próxima
+
+        Returns:
+            (tempo até a origem mais próxima (inf se inalcançável), índice
+            dessa origem (-1), próximo ponto no caminho até ela (-1 na própria
+            origem ou se inalcançável)), arrays com um valor por ponto
+        """
+        indptr, vizinhos, pesos = self._mv_indptr, self._mv_vizinhos, self._mv_pesos
+        acessivel = self._mv_acessivel if apenas_acessivel else None
+        total = len(self)
+        infinito = float('inf')
+
+        distancias = [infinito] * total
+        mais_proximo = [-1] * total
+        anterior = [-1] * total
+        finalizado = bytearray(total)
+        fila = []
+        for origem in origens:
+            if (acessivel is None or acessivel[origem]) and distancias[origem]:
+                distancias[origem] = 0.0
+                mais_proximo[origem] = origem
+                fila.append((0.0, origem))
+        heapq.heapify(fila)
+
+        while fila:
+            distancia, atual = heapq.heappop(fila)
+            if finalizado[atual]:
+                continue
+            finalizado[atual] = 1
+            fonte = mais_proximo[atual]
+            for posicao in range(indptr[atual], indptr[atual + 1]):
+                vizinho = vizinhos[posicao]
+                if finalizado[vizinho] or (acessivel is not None and not acessivel[vizinho]):
+                    continue
+                nova = distancia + pesos[posicao]
+                if nova < distancias[vizinho]:
+                    distancias[vizinho] = nova
+                    mais_proximo[vizinho] = fonte
+                    anterior[vizinho] = atual
+                    heapq.heappush(fila, (nova, vizinho))
+
+        return (np.array(distancias, dtype=np.float64), np.array(mais_proximo, dtype=np.int64),
+                np.array(anterior, dtype=np.int64))
+
+    @staticmethod
+    def caminho_ate_origem(proximo: np.ndarray, indice: int) -> List[int]:
+        """Caminho de ``indice`` até a origem mais próxima (ver mais_proximos)"""
+        caminho = [indice]
+        while proximo[caminho[-1]] != -1:
+            caminho.append(int(proximo[caminho[-1]]))
+        return caminho
+
+    def memoria_bytes(self) -> int:
+        """Memória ocupada pelos arrays da rede compilada"""
+        arrays = (self.ids_ptr, self.ordem_ids, self.indptr, self.vizinhos,
+                  self.pesos, self.linha_aresta, self.acessivel, self.latitudes, self.longitudes)
+        return len(self.ids_blob) + sum(a.nbytes for a in arrays)
+
+    # ------------------------------------------------------------ snapshot
+
+    def salvar(self, caminho: str):
+        """
+        Grava a rede compilada em um snapshot .npz (sem compressão)
+
+        Carregar o snapshot evita montar o grafo NetworkX e recompilar.
+        """
+        arrays = {campo: getattr(self, campo) for campo in CAMPOS_SNAPSHOT}
+        np.savez(caminho,
+                 ids_blob=np.frombuffer(bytes(self.ids_blob), dtype=np.uint8),
+                 linhas=np.frombuffer('\0'.join(self.linhas).encode('utf-8'), dtype=np.uint8),
+                 versao=np.array(self.versao, dtype=np.int64),
+                 **arrays)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> 'GrafoCompilado':
+        """
+        Lê um snapshot gravado por salvar()
+
+        Args:
+            caminho: Arquivo .npz
+
+        Returns:
+            GrafoCompilado equivalente ao gravado
+        """
+        with np.load(caminho) as dados:
+            linhas = dados['linhas'].tobytes().decode('utf-8')
+            return cls(
+                ids_blob=dados['ids_blob'].tobytes(),
+                linhas=linhas.split('\0') if linhas else [],
+                versao=int(dados['versao']),
+                **{campo: dados[campo] for campo in CAMPOS_SNAPSHOT}
+            )
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import time
+    import networkx as nx
+    from sistema_backend import SistemaVermelhinho
+
+    sistema = SistemaVermelhinho()
+    grafo = GrafoCompilado.de_sistema(sistema)
+    print(f"🧮 Rede compilada: {len(grafo)} pontos, {grafo.total_arestas} arestas, {grafo.memoria_bytes():,} bytes")
+
+    origem, destino = grafo.indice("RODOVIARIA"), grafo.indice("PRACA_PONTA_NEGRA")
+    caminho, tempo = grafo.menor_caminho(origem, destino)
+    esperado = nx.shortest_path_length(sistema.grafo, "RODOVIARIA", "PRACA_PONTA_NEGRA", weight='weight')
+    print(f"   • Tempo: {tempo:.1f} min | igual ao NetworkX: {'✅' if tempo == esperado else '❌'}")
+
+    inicio = time.perf_counter()
+    for _ in range(1000):
+        grafo.menor_caminho(origem, destino)
+    print(f"   • {(time.perf_counter() - inicio):.3f} ms por busca")
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+💤 IMPORTAÇÃO PREGUIÇOSA - SISTEMA VERMELINHO
+Busync - Carrega dependências de visualização apenas no primeiro uso
+
+Salve como: importacao_preguicosa.py
+"""
+
+import importlib
+import importlib.util
+
+
+class ModuloPreguicoso:
+    """
+    Substituto de um módulo que só é importado no primeiro acesso a um atributo
+
+    Permite manter o estilo ``tk.Frame(...)`` / ``plt.subplots(...)`` no código
+    sem que tkinter, matplotlib ou folium sejam carregados ao importar o
+    arquivo. Servidores headless que usam apenas o roteamento nunca pagam o
+    custo dessas bibliotecas.
+    """
+
+    def __init__(self, nome: str):
+        """
+        Args:
+            nome: Nome completo do módulo (ex.: 'matplotlib.pyplot')
+        """
+        self.__dict__['_nome'] = nome
+        self.__dict__['_modulo'] = None
+
+    def _carregar(self):
+        """Importa o módulo real (uma única vez)"""
+        modulo = self.__dict__['_modulo']
+        if modulo is None:
+            modulo = importlib.import_module(self.__dict__['_nome'])
+            self.__dict__['_modulo'] = modulo
+        return modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._carregar(), atributo, valor)
+
+    def __repr__(self):
+        estado = "carregado" if self.__dict__['_modulo'] is not None else "não carregado"
+        return f"<módulo preguiçoso '{self.__dict__['_nome']}' ({estado})>"
+
+
+def modulo_disponivel(nome: str) -> bool:
+    """Verifica se um módulo pode ser importado, sem importá-lo"""
+    try:
+        return importlib.util.find_spec(nome) is not None
+    except (ImportError, ValueError):
+        return False
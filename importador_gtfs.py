@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+📥 IMPORTADOR GTFS - SISTEMA VERMELINHO
+Busync - Leitura em streaming de feeds GTFS estáticos
+
+Salve como: importador_gtfs.py
+"""
+
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sistema_backend import SistemaVermelhinho
+
+# Menor peso aceito para um segmento (horários iguais no GTFS viram 0 min)
+TEMPO_MINIMO_SEGMENTO = 1.0
+
+# Quantidade de linhas do stop_times.txt inseridas por lote no SQLite
+TAMANHO_LOTE_SQLITE = 50000
+
+
+class StopTimesForaDeOrdem(Exception):
+    """Indica que o stop_times.txt não está agrupado por trip_id"""
+
+
+def converter_horario(valor: str) -> Optional[int]:
+    """Converte HH:MM:SS (pode passar de 24h) em segundos desde o início do dia"""
+    valor = valor.strip()
+    if not valor:
+        return None
+    horas, minutos, segundos = valor.split(':')
+    return int(horas) * 3600 + int(minutos) * 60 + int(segundos)
+
+
+class ImportadorGTFS:
+    """Importa um feed GTFS estático (diretório ou .zip) para o SistemaVermelhinho"""
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa o importador
+
+        Args:
+            caminho: Diretório com os arquivos .txt do feed ou arquivo .zip
+        """
+        self.caminho = caminho
+        self.eh_zip = zipfile.is_zipfile(caminho) if os.path.isfile(caminho) else False
+        self.estatisticas = {}
+        self._resetar_agregados()
+
+    def _resetar_agregados(self):
+        """Zera as estruturas acumuladas durante a leitura do stop_times.txt"""
+        # (ponto_a, ponto_b) ordenado -> [soma_minutos, amostras, linha]
+        self._segmentos: Dict[Tuple[str, str], list] = {}
+        # (linha_id, direcao) -> maior sequência de pontos vista
+        self._itinerarios: Dict[Tuple[str, int], List[str]] = {}
+        self.estatisticas.update({
+            'linhas_stop_times': 0,
+            'viagens_processadas': 0,
+            'paradas_desconhecidas': 0,
+            'ordenacao_externa': False
+        })
+
+    @contextmanager
+    def _abrir(self, nome_arquivo: str):
+        """Abre um arquivo do feed como texto, seja de diretório ou de .zip"""
+        if self.eh_zip:
+            with zipfile.ZipFile(self.caminho) as arquivo_zip:
+                with arquivo_zip.open(nome_arquivo) as bruto:
+                    yield io.TextIOWrapper(bruto, encoding='utf-8-sig', newline='')
+        else:
+            with open(os.path.join(self.caminho, nome_arquivo), encoding='utf-8-sig', newline='') as arquivo:
+                yield arquivo
+
+    def _existe(self, nome_arquivo: str) -> bool:
+        """Verifica se o arquivo existe no feed"""
+        if self.eh_zip:
+            with zipfile.ZipFile(self.caminho) as arquivo_zip:
+                return nome_arquivo in arquivo_zip.namelist()
+        return os.path.isfile(os.path.join(self.caminho, nome_arquivo))
+
+    def _ler_tabela(self, nome_arquivo: str) -> Iterator[Tuple[Dict[str, int], List[str]]]:
+        """
+        Lê um arquivo do feed linha a linha
+
+        Usa csv.reader com índice de colunas em vez de DictReader para não
+        alocar um dict por linha nos arquivos grandes.
+
+        Yields:
+            Tupla (mapa coluna -> índice, linha como lista de strings)
+        """
+        with self._abrir(nome_arquivo) as arquivo:
+            leitor = csv.reader(arquivo)
+            cabecalho = next(leitor, None)
+            if cabecalho is None:
+                return
+            colunas = {nome.strip(): i for i, nome in enumerate(cabecalho)}
+            for linha in leitor:
+                if linha:
+                    yield colunas, linha
+
+    @staticmethod
+    def _campo(colunas: Dict[str, int], linha: List[str], nome: str, padrao: str = "") -> str:
+        """Retorna o valor de uma coluna opcional"""
+        indice = colunas.get(nome)
+        if indice is None or indice >= len(linha):
+            return padrao
+        return linha[indice].strip()
+
+    def importar(self, sistema: Optional[SistemaVermelhinho] = None) -> SistemaVermelhinho:
+        """
+        Importa o feed completo
+
+        Args:
+            sistema: Sistema a preencher; se None, cria um sistema vazio
+
+        Returns:
+            SistemaVermelhinho com pontos, linhas e conexões do feed
+        """
+        if sistema is None:
+            sistema = SistemaVermelhinho(carregar_rede_padrao=False)
+
+        self._importar_pontos(sistema)
+        linhas = self._importar_linhas()
+        viagens = self._importar_viagens(linhas)
+
+        try:
+            self._processar_stop_times(self._stop_times_do_arquivo(), sistema, viagens)
+        except StopTimesForaDeOrdem:
+            # Feed não agrupado por viagem: ordena em disco e reprocessa
+            self._resetar_agregados()
+            self.estatisticas['ordenacao_externa'] = True
+            with self._stop_times_ordenados() as ordenados:
+                self._processar_stop_times(ordenados, sistema, viagens)
+
+        self._montar_linhas(sistema, linhas)
+        self._montar_conexoes(sistema)
+        if self._existe('transfers.txt'):
+            self._importar_transferencias(sistema)
+        sistema.marcar_rede_alterada()
+
+        print(f"✅ GTFS importado: {len(sistema.pontos)} pontos, "
+              f"{len(sistema.linhas_vermelinho)} linhas e {sistema.grafo.number_of_edges()} conexões")
+        return sistema
+
+    def _importar_pontos(self, sistema: SistemaVermelhinho):
+        """Lê stops.txt e adiciona os pontos à tabela do sistema"""
+        for colunas, linha in self._ler_tabela('stops.txt'):
+            # Estações, entradas e nós genéricos não recebem ônibus diretamente
+            if self._campo(colunas, linha, 'location_type', '0') not in ('', '0'):
+                continue
+
+            id_ponto = self._campo(colunas, linha, 'stop_id')
+            nome = self._campo(colunas, linha, 'stop_name') or id_ponto
+            sistema.pontos.adicionar(
+                id=id_ponto,
+                nome=nome,
+                endereco=self._campo(colunas, linha, 'stop_desc') or nome,
+                latitude=float(self._campo(colunas, linha, 'stop_lat', '0') or 0),
+                longitude=float(self._campo(colunas, linha, 'stop_lon', '0') or 0),
+                acessivel=self._campo(colunas, linha, 'wheelchair_boarding') != '2',
+                tipo=self._tipo_ponto(colunas, linha)
+            )
+            sistema.grafo.add_node(id_ponto)
+
+    def _tipo_ponto(self, colunas: Dict[str, int], linha: List[str]) -> str:
+        """Tipo do ponto: coluna de extensão do exportador ou inferido da estação-mãe"""
+        tipo = self._campo(colunas, linha, 'vermelinho_tipo')
+        if tipo:
+            return tipo
+        return "terminal" if self._campo(colunas, linha, 'parent_station') else "parada"
+
+    def _importar_linhas(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Lê routes.txt
+
+        Returns:
+            Dicionário route_id -> (id da linha no sistema, nome da linha)
+        """
+        linhas = {}
+        usados = set()
+        for colunas, linha in self._ler_tabela('routes.txt'):
+            route_id = self._campo(colunas, linha, 'route_id')
+            curto = self._campo(colunas, linha, 'route_short_name')
+            longo = self._campo(colunas, linha, 'route_long_name')
+
+            linha_id = curto or route_id
+            if linha_id in usados:
+                linha_id = f"{linha_id}-{route_id}"
+            usados.add(linha_id)
+
+            linhas[route_id] = (linha_id, longo or curto or route_id)
+        return linhas
+
+    def _importar_viagens(self, linhas: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[str, int]]:
+        """
+        Lê trips.txt
+
+        Returns:
+            Dicionário trip_id -> (id da linha no sistema, direção 0=ida/1=volta)
+        """
+        viagens = {}
+        for colunas, linha in self._ler_tabela('trips.txt'):
+            route_id = self._campo(colunas, linha, 'route_id')
+            if route_id not in linhas:
+                continue
+            direcao = 1 if self._campo(colunas, linha, 'direction_id') == '1' else 0
+            viagens[self._campo(colunas, linha, 'trip_id')] = (linhas[route_id][0], direcao)
+        return viagens
+
+    def _stop_times_do_arquivo(self) -> Iterator[Tuple[str, int, str, Optional[int], Optional[int]]]:
+        """Lê stop_times.txt na ordem do arquivo"""
+        for colunas, linha in self._ler_tabela('stop_times.txt'):
+            yield (
+                self._campo(colunas, linha, 'trip_id'),
+                int(self._campo(colunas, linha, 'stop_sequence', '0')),
+                self._campo(colunas, linha, 'stop_id'),
+                converter_horario(self._campo(colunas, linha, 'arrival_time')),
+                converter_horario(self._campo(colunas, linha, 'departure_time'))
+            )
+
+    @contextmanager
+    def _stop_times_ordenados(self):
+        """
+        Ordena o stop_times.txt por (trip_id, stop_sequence) usando SQLite em
+        arquivo temporário, mantendo a memória limitada mesmo em feeds enormes
+        """
+        descritor, caminho_db = tempfile.mkstemp(suffix='.sqlite', prefix='gtfs_stop_times_')
+        os.close(descritor)
+        conexao = sqlite3.connect(caminho_db)
+        try:
+            conexao.execute("PRAGMA journal_mode = OFF")
+            conexao.execute("PRAGMA synchronous = OFF")
+            conexao.execute(
+                "CREATE TABLE stop_times (trip_id TEXT, seq INTEGER, stop_id TEXT, chegada INTEGER, partida INTEGER)"
+            )
+
+            lote = []
+            for registro in self._stop_times_do_arquivo():
+                lote.append(registro)
+                if len(lote) >= TAMANHO_LOTE_SQLITE:
+                    conexao.executemany("INSERT INTO stop_times VALUES (?, ?, ?, ?, ?)", lote)
+                    lote.clear()
+            if lote:
+                conexao.executemany("INSERT INTO stop_times VALUES (?, ?, ?, ?, ?)", lote)
+            conexao.commit()
+
+            yield conexao.execute("SELECT * FROM stop_times ORDER BY trip_id, seq")
+        finally:
+            conexao.close()
+            os.remove(caminho_db)
+
+    def _processar_stop_times(self, registros, sistema: SistemaVermelhinho,
+                              viagens: Dict[str, Tuple[str, int]]):
+        """
+        Percorre os registros agrupando por viagem
+
+        Apenas a viagem corrente fica em memória; o restante é agregado em
+        segmentos (pares de pontos) e no maior itinerário de cada linha/direção.
+        """
+        viagem_atual = None
+        paradas = []
+        finalizadas = set()
+
+        for trip_id, seq, stop_id, chegada, partida in registros:
+            self.estatisticas['linhas_stop_times'] += 1
+
+            if trip_id != viagem_atual:
+                if viagem_atual is not None:
+                    self._processar_viagem(viagem_atual, paradas, sistema, viagens)
+                    finalizadas.add(viagem_atual)
+                if trip_id in finalizadas:
+                    raise StopTimesForaDeOrdem(trip_id)
+                viagem_atual = trip_id
+                paradas = []
+
+            paradas.append((seq, stop_id, chegada, partida))
+
+        if viagem_atual is not None:
+            self._processar_viagem(viagem_atual, paradas, sistema, viagens)
+
+    def _processar_viagem(self, trip_id: str, paradas: list, sistema: SistemaVermelhinho,
+                          viagens: Dict[str, Tuple[str, int]]):
+        """Agrega os segmentos e o itinerário de uma viagem"""
+        if trip_id not in viagens:
+            return
+        linha_id, direcao = viagens[trip_id]
+        self.estatisticas['viagens_processadas'] += 1
+
+        paradas.sort(key=lambda parada: parada[0])
+        validas = []
+        for parada in paradas:
+            if parada[1] in sistema.pontos:
+                validas.append(parada)
+            else:
+                self.estatisticas['paradas_desconhecidas'] += 1
+
+        for (_, ponto_a, _, partida_a), (_, ponto_b, chegada_b, _) in zip(validas, validas[1:]):
+            if ponto_a == ponto_b:
+                continue
+            chave = (ponto_a, ponto_b) if ponto_a < ponto_b else (ponto_b, ponto_a)
+            segmento = self._segmentos.get(chave)
+            if segmento is None:
+                segmento = self._segmentos[chave] = [0.0, 0, linha_id]
+            if partida_a is not None and chegada_b is not None:
+                segmento[0] += (chegada_b - partida_a) / 60
+                segmento[1] += 1
+
+        itinerario = self._itinerarios.get((linha_id, direcao))
+        if itinerario is None or len(validas) > len(itinerario):
+            self._itinerarios[(linha_id, direcao)] = [parada[1] for parada in validas]
+
+    def _montar_linhas(self, sistema: SistemaVermelhinho, linhas: Dict[str, Tuple[str, str]]):
+        """Preenche linhas_vermelinho e as linhas de cada ponto"""
+        nomes = dict(linhas.values())
+        for (linha_id, direcao), itinerario in sorted(self._itinerarios.items()):
+            linha = sistema.linhas_vermelinho.setdefault(
+                linha_id, {"nome": nomes.get(linha_id, linha_id), "ida": [], "volta": []}
+            )
+            linha["volta" if direcao == 1 else "ida"] = itinerario
+
+        for linha_id, linha_info in sistema.linhas_vermelinho.items():
+            for ponto_id in linha_info["ida"] + linha_info["volta"]:
+                sistema.pontos.vincular_linha(ponto_id, linha_id)
+        sistema.pontos.compactar()
+
+    def _montar_conexoes(self, sistema: SistemaVermelhinho):
+        """Cria as arestas com o tempo médio programado de cada segmento"""
+        for (ponto_a, ponto_b), (soma, amostras, linha_id) in self._segmentos.items():
+            if amostras:
+                tempo = max(TEMPO_MINIMO_SEGMENTO, round(soma / amostras, 1))
+            else:
+                # Sem horários no feed: usa a mesma estimativa da rede padrão
+                tempo = sistema._calcular_tempo_viagem(ponto_a, ponto_b)
+            sistema.grafo.add_edge(ponto_a, ponto_b, weight=tempo, linha=linha_id)
+
+        self.estatisticas['segmentos'] = len(self._segmentos)
+        self._segmentos = {}
+
+    def _importar_transferencias(self, sistema: SistemaVermelhinho):
+        """
+        Lê transfers.txt e cria conexões de integração entre pontos distintos
+
+        Apenas transferências com tempo mínimo (transfer_type 2) viram arestas;
+        conexões já criadas pelas viagens são mantidas.
+        """
+        for colunas, linha in self._ler_tabela('transfers.txt'):
+            ponto_a = self._campo(colunas, linha, 'from_stop_id')
+            ponto_b = self._campo(colunas, linha, 'to_stop_id')
+            if ponto_a == ponto_b or ponto_a not in sistema.pontos or ponto_b not in sistema.pontos:
+                continue
+            if self._campo(colunas, linha, 'transfer_type') != '2' or sistema.grafo.has_edge(ponto_a, ponto_b):
+                continue
+            segundos = int(self._campo(colunas, linha, 'min_transfer_time', '0') or 0)
+            tipo = self._campo(colunas, linha, 'vermelinho_tipo') or "integracao"
+            sistema.grafo.add_edge(ponto_a, ponto_b, weight=segundos / 60, tipo=tipo)
+
+
+def importar_gtfs(caminho: str) -> SistemaVermelhinho:
+    """Atalho para importar um feed GTFS em um novo SistemaVermelhinho"""
+    return ImportadorGTFS(caminho).importar()
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("💡 Uso: python importador_gtfs.py <feed_gtfs.zip | diretorio>")
+        sys.exit(1)
+
+    importador = ImportadorGTFS(sys.argv[1])
+    sistema = importador.importar()
+    stats = sistema.obter_estatisticas()
+
+    print(f"📊 Estatísticas do feed:")
+    print(f"   • Pontos: {stats['total_pontos']}")
+    print(f"   • Conexões: {stats['total_conexoes']}")
+    print(f"   • Linhas: {stats['total_linhas']}")
+    print(f"   • Viagens processadas: {importador.estatisticas['viagens_processadas']}")
+    print(f"   • Linhas de stop_times: {importador.estatisticas['linhas_stop_times']}")
+    print(f"   • Ordenação externa: {'sim' if importador.estatisticas['ordenacao_externa'] else 'não'}")
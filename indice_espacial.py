@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+🗺️ ÍNDICE ESPACIAL - SISTEMA VERMELINHO
+Busync - Grade regular para achar o ponto de ônibus mais próximo de uma coordenada
+
+Salve como: indice_espacial.py
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+KM_POR_GRAU = 111.32
+RAIO_TERRA_KM = 6371.0
+
+# Lado padrão de cada célula da grade
+TAMANHO_CELULA_KM = 0.5
+
+# Distância máxima padrão entre uma coordenada e o ponto associado a ela;
+# além disso a coordenada está fora da área atendida pela rede
+DISTANCIA_MAXIMA_KM = 2.0
+
+
+class GradeEspacial:
+    """
+    Índice em grade sobre as coordenadas dos pontos
+
+    Os pontos são ordenados por célula; cada célula guarda só o intervalo
+    correspondente no array ordenado. A consulta percorre anéis de células
+    ao redor da coordenada até que nenhum anel mais distante possa ter um
+    ponto mais próximo que o melhor encontrado.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray,
+                 tamanho_celula_km: float = TAMANHO_CELULA_KM):
+        """
+        Args:
+            latitudes: Latitude de cada ponto (índices iguais aos do grafo)
+            longitudes: Longitude de cada ponto
+            tamanho_celula_km: Lado de cada célula
+        """
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.tamanho_celula_km = tamanho_celula_km
+
+        latitude_media = float(self.latitudes.mean()) if len(self.latitudes) else 0.0
+        self._passo_lat = tamanho_celula_km / KM_POR_GRAU
+        self._passo_lon = tamanho_celula_km / (KM_POR_GRAU * max(0.01, math.cos(math.radians(latitude_media))))
+
+        linhas = np.floor(self.latitudes / self._passo_lat).astype(np.int64)
+        colunas = np.floor(self.longitudes / self._passo_lon).astype(np.int64)
+        self._ordem = np.lexsort((colunas, linhas))
+        self._celulas: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        if len(self._ordem):
+            chaves = np.stack([linhas[self._ordem], colunas[self._ordem]], axis=1)
+            novas = np.flatnonzero(np.any(np.diff(chaves, axis=0) != 0, axis=1)) + 1
+            inicios = np.concatenate([[0], novas])
+            fins = np.concatenate([novas, [len(self._ordem)]])
+            for inicio, fim in zip(inicios.tolist(), fins.tolist()):
+                self._celulas[(int(chaves[inicio, 0]), int(chaves[inicio, 1]))] = (inicio, fim)
+        # Limites das células ocupadas (a busca não passa deles)
+        if self._celulas:
+            self._limites = (int(linhas.min()), int(linhas.max()), int(colunas.min()), int(colunas.max()))
+        else:
+            self._limites = (0, -1, 0, -1)
+
+    def _primeiro_anel(self, linha: int, coluna: int) -> int:
+        """Primeiro anel que alcança as células ocupadas (0 dentro dos limites)"""
+        linha_min, linha_max, coluna_min, coluna_max = self._limites
+        return max(0, linha_min - linha, linha - linha_max, coluna_min - coluna, coluna - coluna_max)
+
+    def _ultimo_anel(self, linha: int, coluna: int) -> int:
+        """Anel a partir do qual todas as células ocupadas já foram visitadas"""
+        linha_min, linha_max, coluna_min, coluna_max = self._limites
+        return max(abs(linha - linha_min), abs(linha - linha_max),
+                   abs(coluna - coluna_min), abs(coluna - coluna_max))
+
+    @staticmethod
+    def distancia_km(lat1: float, lon1: float, lat2, lon2):
+        """Distância de Haversine (aceita arrays em lat2/lon2)"""
+        lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(a))
+
+    def mais_proximo(self, latitude: float, longitude: float, mascara: Optional[np.ndarray] = None,
+                     distancia_maxima_km: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """
+        Ponto mais próximo de uma coordenada
+
+        A busca começa no primeiro anel que alcança as células ocupadas e
+        cada anel só percorre as células dentro desses limites, então uma
+        coordenada longe da rede custa o mesmo que uma dentro dela.
+
+        Args:
+            latitude: Latitude da consulta
+            longitude: Longitude da consulta
+            mascara: Array booleano; se informado, só considera pontos True
+                (ex.: apenas acessíveis)
+            distancia_maxima_km: Se informada, pontos mais distantes que isso
+                não são candidatos (coordenada fora da área da rede)
+
+        Returns:
+            (índice do ponto, distância em km) ou None se não houver candidato
+        """
+        linha = math.floor(latitude / self._passo_lat)
+        coluna = math.floor(longitude / self._passo_lon)
+        melhor: Optional[Tuple[int, float]] = None
+
+        if not self._celulas:
+            return None
+
+        limite = distancia_maxima_km if distancia_maxima_km is not None else math.inf
+        for anel in range(self._primeiro_anel(linha, coluna), self._ultimo_anel(linha, coluna) + 1):
+            # Nenhum ponto do anel está a menos de (anel - 1) células da consulta
+            if (anel - 1) * self.tamanho_celula_km > min(limite, melhor[1] if melhor is not None else math.inf):
+                break
+            candidatos = [self._celulas[chave] for chave in self._anel(linha, coluna, anel) if chave in self._celulas]
+            if not candidatos:
+                continue
+            indices = np.concatenate([self._ordem[inicio:fim] for inicio, fim in candidatos])
+            if mascara is not None:
+                indices = indices[mascara[indices]]
+            if not len(indices):
+                continue
+            distancias = self.distancia_km(latitude, longitude, self.latitudes[indices], self.longitudes[indices])
+            posicao = int(np.argmin(distancias))
+            if melhor is None or distancias[posicao] < melhor[1]:
+                melhor = (int(indices[posicao]), float(distancias[posicao]))
+        if melhor is not None and melhor[1] > limite:
+            return None
+        return melhor
+
+    def _anel(self, linha: int, coluna: int, anel: int):
+        """Células na borda do quadrado de raio ``anel``, dentro dos limites ocupados"""
+        if anel == 0:
+            yield (linha, coluna)
+            return
+        linha_min, linha_max, coluna_min, coluna_max = self._limites
+        inicio, fim = max(coluna - anel, coluna_min), min(coluna + anel, coluna_max)
+        for linha_borda in (linha - anel, linha + anel):
+            if linha_min <= linha_borda <= linha_max:
+                for coluna_borda in range(inicio, fim + 1):
+                    yield (linha_borda, coluna_borda)
+        inicio, fim = max(linha - anel + 1, linha_min), min(linha + anel - 1, linha_max)
+        for coluna_borda in (coluna - anel, coluna + anel):
+            if coluna_min <= coluna_borda <= coluna_max:
+                for linha_borda in range(inicio, fim + 1):
+                    yield (linha_borda, coluna_borda)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import time
+
+    from gerador_rede import gerar_rede_sintetica
+
+    compilado = gerar_rede_sintetica(20_000, semente=1).compilar()
+    grade = GradeEspacial(compilado.latitudes, compilado.longitudes)
+
+    # Dentro da rede: mesmo resultado da força bruta
+    latitude, longitude = float(compilado.latitudes[123]) + 0.001, float(compilado.longitudes[123])
+    indice, distancia = grade.mais_proximo(latitude, longitude)
+    distancias = GradeEspacial.distancia_km(latitude, longitude, compilado.latitudes, compilado.longitudes)
+    assert indice == int(np.argmin(distancias)), "Ponto mais próximo diferente da força bruta"
+    print(f"✅ Ponto mais próximo: {compilado.id_do_indice(indice)} a {distancia * 1000:.0f} m")
+
+    # Fora da área: resposta imediata e rejeitada pela distância máxima
+    inicio = time.perf_counter()
+    longe = grade.mais_proximo(0.0, 0.0)
+    rejeitado = grade.mais_proximo(0.0, 0.0, distancia_maxima_km=DISTANCIA_MAXIMA_KM)
+    duracao = (time.perf_counter() - inicio) * 1000
+    assert longe is not None and longe[1] > DISTANCIA_MAXIMA_KM
+    assert rejeitado is None, "Coordenada fora da área aceita"
+    print(f"✅ Coordenada (0, 0): ponto a {longe[1]:.0f} km, rejeitado com limite de "
+          f"{DISTANCIA_MAXIMA_KM} km ({duracao:.1f} ms)")
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+⏱️ INSTRUMENTAÇÃO DE CONSULTAS - SISTEMA VERMELINHO
+Busync - Tempo por etapa e contadores da busca dentro de calcular_rota
+
+Uma MedicaoConsulta acompanha uma única consulta: cada chamada a marcar()
+fecha a etapa corrente (validação, seleção do perfil, busca, formatação,
+detalhes) com time.perf_counter_ns, e a busca de Dijkstra preenche os
+contadores (pontos finalizados, arestas relaxadas, inserções no heap).
+
+Desligada, a instrumentação não custa nada: calcular_rota só entra no
+caminho medido quando recebe ``instrumentar=True`` ou quando o sistema
+tem um callback em ``ao_medir``.
+
+Salve como: instrumentacao.py
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+# Etapas de calcular_rota, na ordem em que acontecem
+ETAPAS = ('validacao', 'perfil', 'busca', 'formatacao', 'detalhes')
+
+# Callback chamado ao fim de cada consulta instrumentada
+AoMedir = Callable[['MedicaoConsulta'], None]
+
+
+class MedicaoConsulta:
+    """Tempos por etapa (ns) e contadores da busca de uma consulta"""
+
+    __slots__ = ('origem', 'destino', 'apenas_acessivel', 'etapas', 'contadores', '_inicio', '_marca')
+
+    def __init__(self, origem: str, destino: str, apenas_acessivel: bool = False):
+        """
+        Args:
+            origem: ID do ponto de origem
+            destino: ID do ponto de destino
+            apenas_acessivel: Se a consulta usa o filtro de acessibilidade
+        """
+        self.origem = origem
+        self.destino = destino
+        self.apenas_acessivel = apenas_acessivel
+        self.etapas: Dict[str, int] = {}
+        # Preenchido pela busca (ver GrafoCompilado._dijkstra)
+        self.contadores: Dict[str, int] = {}
+        self._inicio = self._marca = time.perf_counter_ns()
+
+    def marcar(self, etapa: str):
+        """Encerra ``etapa``: soma o tempo desde a marca anterior"""
+        agora = time.perf_counter_ns()
+        self.etapas[etapa] = self.etapas.get(etapa, 0) + agora - self._marca
+        self._marca = agora
+
+    @property
+    def total_ms(self) -> float:
+        """Tempo da consulta até a última marca (ms)"""
+        return (self._marca - self._inicio) / 1e6
+
+    def etapa_ms(self, etapa: str) -> float:
+        """Tempo de uma etapa (ms; 0 se ela não ocorreu)"""
+        return self.etapas.get(etapa, 0) / 1e6
+
+    def para_dict(self) -> dict:
+        """Dicionário serializável (tempos em ms)"""
+        return {
+            'total_ms': round(self.total_ms, 4),
+            'etapas_ms': {etapa: round(duracao / 1e6, 4) for etapa, duracao in self.etapas.items()},
+            'contadores': dict(self.contadores),
+        }
+
+    def resumo(self) -> str:
+        """Linha legível (ver resumir_medicao)"""
+        return resumir_medicao(self.para_dict())
+
+    def __repr__(self):
+        return f"<MedicaoConsulta {self.origem} → {self.destino}: {self.total_ms:.3f} ms>"
+
+
+def resumir_medicao(medicao: dict) -> str:
+    """
+    Linha legível de uma medição (como anexada em ``resultado['medicao']``)
+
+    Ex.: 'busca 3.20 ms (91%) | formatacao 0.10 ms (3%) | pontos_finalizados=1,204'
+    """
+    etapas = medicao['etapas_ms']
+    total = sum(etapas.values()) or 1
+    partes = [f"{etapa} {duracao:.2f} ms ({duracao * 100 / total:.0f}%)" for etapa, duracao in etapas.items()]
+    if medicao['contadores']:
+        partes.append(', '.join(f"{nome}={valor:,}" for nome, valor in medicao['contadores'].items()))
+    return ' | '.join(partes)
+
+
+def coletor(destino: Optional[list] = None) -> AoMedir:
+    """
+    Callback para ``SistemaVermelhinho.ao_medir`` que guarda as medições
+
+    Args:
+        destino: Lista onde acrescentar (uma nova se omitida; acessível
+            em ``callback.medicoes``)
+    """
+    medicoes = [] if destino is None else destino
+
+    def ao_medir(medicao: MedicaoConsulta):
+        medicoes.append(medicao)
+
+    ao_medir.medicoes = medicoes
+    return ao_medir
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    from gerador_rede import gerar_rede_sintetica
+
+    sistema = gerar_rede_sintetica(50_000, semente=7)
+    ids = list(sistema.pontos.keys())
+    sistema.calcular_rota(ids[0], ids[-1])
+
+    resultado = sistema.calcular_rota(ids[0], ids[-1], instrumentar=True)
+    medicao = resultado['medicao']
+    print(f"⏱️ {ids[0]} → {ids[-1]}: {medicao['total_ms']:.2f} ms")
+    for etapa, duracao in medicao['etapas_ms'].items():
+        print(f"   • {etapa:<11} {duracao:8.3f} ms")
+    print(f"   • {resumir_medicao(medicao)}")
+
+    # Desligada: mesma rota, sem medição anexada
+    inicio = time.perf_counter()
+    for _ in range(20):
+        simples = sistema.calcular_rota(ids[0], ids[-1])
+    print(f"   • Sem instrumentação: {(time.perf_counter() - inicio) / 20 * 1000:.2f} ms/consulta, "
+          f"{'✅' if 'medicao' not in simples else '❌'} nada anexado")
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+📝 LOG DE CONSULTAS - SISTEMA VERMELINHO
+Busync - Registro opcional de cada calcular_rota em JSONL, sem travar a busca
+
+Ligado com ``sistema.log_consultas = LogConsultas('consultas.jsonl')``.
+Cada consulta vira um registro (instante, origem, destino, perfil,
+latência e resultado) colocado em uma fila limitada; um thread de fundo
+grava os registros em lotes e descarrega o arquivo periodicamente. O
+thread que calculou a rota nunca espera pelo disco: se a fila encher, o
+registro é descartado e contado em ``descartados``.
+
+O arquivo é a entrada de replay_consultas.py, que reproduz a carga.
+
+Salve como: log_consultas.py
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+# Registros aguardando gravação antes de começar a descartar
+CAPACIDADE_PADRAO = 100_000
+
+# Intervalo máximo entre descargas do arquivo (s)
+INTERVALO_DESCARGA = 1.0
+
+# Registros gravados por escrita
+TAMANHO_LOTE = 512
+
+_FIM = object()
+
+
+class LogConsultas:
+    """Gravador assíncrono e com buffer do log de consultas (JSON por linha)"""
+
+    def __init__(self, caminho: str, capacidade: int = CAPACIDADE_PADRAO,
+                 intervalo_descarga: float = INTERVALO_DESCARGA):
+        """
+        Args:
+            caminho: Arquivo JSONL (acrescentado se já existir)
+            capacidade: Registros pendentes antes de descartar novos
+            intervalo_descarga: Tempo máximo até o registro chegar ao disco (s)
+        """
+        self.caminho = caminho
+        self.intervalo_descarga = intervalo_descarga
+        self.gravados = 0
+        self.descartados = 0
+        self._fila: queue.Queue = queue.Queue(maxsize=capacidade)
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._gravar, name='busync-log', daemon=True)
+        self._thread.start()
+
+    def registrar(self, origem: str, destino: str, apenas_acessivel: bool,
+                  latencia_s: float, resultado: str, instante: Optional[float] = None):
+        """
+        Enfileira uma consulta (não bloqueia)
+
+        Args:
+            origem: ID do ponto de origem
+            destino: ID do ponto de destino
+            apenas_acessivel: Perfil da consulta
+            latencia_s: Duração de calcular_rota (s)
+            resultado: Classificação (ver SistemaVermelhinho._classificar_resultado)
+            instante: Início da consulta (time.time(); agora se omitido)
+        """
+        try:
+            self._fila.put_nowait((instante if instante is not None else time.time(),
+                                   origem, destino, apenas_acessivel, latencia_s, resultado))
+        except queue.Full:
+            self.descartados += 1
+
+    def _gravar(self):
+        """Thread de fundo: grava em lotes e descarrega a cada intervalo"""
+        proxima_descarga = time.monotonic() + self.intervalo_descarga
+        while True:
+            try:
+                registro = self._fila.get(timeout=self.intervalo_descarga)
+            except queue.Empty:
+                registro = None
+
+            linhas = []
+            while registro is not None and registro is not _FIM:
+                instante, origem, destino, acessivel, latencia, resultado = registro
+                linhas.append(json.dumps({
+                    'ts': round(instante, 6), 'origem': origem, 'destino': destino,
+                    'acessivel': acessivel, 'latencia_ms': round(latencia * 1000, 4),
+                    'resultado': resultado,
+                }, ensure_ascii=False))
+                if len(linhas) >= TAMANHO_LOTE:
+                    break
+                try:
+                    registro = self._fila.get_nowait()
+                except queue.Empty:
+                    registro = None
+
+            if linhas:
+                self._arquivo.write('\n'.join(linhas) + '\n')
+                self.gravados += len(linhas)
+            if registro is _FIM or time.monotonic() >= proxima_descarga:
+                self._arquivo.flush()
+                proxima_descarga = time.monotonic() + self.intervalo_descarga
+            if registro is _FIM:
+                return
+
+    def fechar(self):
+        """Grava o que estiver pendente e fecha o arquivo"""
+        if self._thread.is_alive():
+            self._fila.put(_FIM)
+            self._thread.join()
+        self._arquivo.close()
+
+    def __enter__(self) -> 'LogConsultas':
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+def ler_log(caminho: str) -> Iterator[Dict]:
+    """
+    Lê um log de consultas, ignorando linhas inválidas (ex.: a última
+    linha de um processo interrompido no meio da escrita)
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue
+            if 'origem' in registro and 'destino' in registro:
+                yield registro
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+
+    from sistema_backend import SistemaVermelhinho
+
+    sistema = SistemaVermelhinho()
+    ids = list(sistema.pontos.keys())
+    gerador = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'consultas.jsonl')
+        with LogConsultas(caminho) as log:
+            sistema.log_consultas = log
+            inicio = time.perf_counter()
+            for _ in range(2000):
+                sistema.calcular_rota(*gerador.sample(ids, 2), apenas_acessivel=gerador.random() < 0.2)
+            duracao = time.perf_counter() - inicio
+            sistema.log_consultas = None
+
+        registros = list(ler_log(caminho))
+        print(f"📝 {len(registros)} consultas registradas em {duracao * 1000:.0f} ms "
+              f"(descartadas: {log.descartados})")
+        print(f"   • Exemplo: {registros[0]}")
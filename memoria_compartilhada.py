@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+🔗 MEMÓRIA COMPARTILHADA - SISTEMA VERMELINHO
+Busync - Grafo compilado em multiprocessing.shared_memory, sem pickle
+
+O processo principal copia os arrays do GrafoCompilado (CSR, pesos,
+acessibilidade, coordenadas e tabela de IDs) para um único segmento de
+memória compartilhada e entrega aos workers apenas um DescritorRede de
+poucos bytes. Cada worker se anexa ao segmento e monta um GrafoCompilado
+cujos arrays apontam direto para a memória compartilhada: nada é
+serializado nem copiado, não importa o tamanho da rede.
+
+Uso típico com multiprocessing.Pool:
+
+    with RedeCompartilhada(sistema.compilar()) as rede:
+        with Pool(initializer=inicializar_worker, initargs=(rede.descritor,)) as pool:
+            ...  # nas tarefas, grafo_do_worker() devolve o grafo anexado
+
+Salve como: memoria_compartilhada.py
+"""
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from grafo_compilado import GrafoCompilado
+
+# Arrays do GrafoCompilado copiados para o segmento, nesta ordem
+CAMPOS_ARRAY = ('ids_ptr', 'ordem_ids', 'indptr', 'vizinhos', 'pesos',
+                'linha_aresta', 'acessivel', 'latitudes', 'longitudes')
+
+# Alinhamento de cada array dentro do segmento (linha de cache)
+ALINHAMENTO = 64
+
+# Grafo anexado no processo worker (preenchido por inicializar_worker)
+_grafo_worker: Optional[GrafoCompilado] = None
+
+
+@dataclass(frozen=True)
+class DescritorRede:
+    """Tudo que um worker precisa para se anexar ao grafo (barato de enviar)"""
+    nome_segmento: str
+    tamanho: int
+    # (campo, dtype, deslocamento, quantidade de elementos)
+    arrays: Tuple[Tuple[str, str, int, int], ...]
+    deslocamento_ids: int
+    tamanho_ids: int
+    deslocamento_linhas: int
+    tamanho_linhas: int
+    versao: int
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+class RedeCompartilhada:
+    """Dono do segmento: cria, preenche e libera a memória compartilhada"""
+
+    def __init__(self, grafo: GrafoCompilado):
+        """
+        Args:
+            grafo: Grafo compilado a ser exportado
+        """
+        layout = []
+        posicao = 0
+        for campo in CAMPOS_ARRAY:
+            array = getattr(grafo, campo)
+            posicao = _alinhar(posicao)
+            layout.append((campo, array.dtype.str, posicao, len(array)))
+            posicao += array.nbytes
+        deslocamento_ids = _alinhar(posicao)
+        # IDs das linhas separados por NUL, para o descritor não crescer com a rede
+        linhas_blob = '\0'.join(grafo.linhas).encode('utf-8')
+        deslocamento_linhas = deslocamento_ids + len(grafo.ids_blob)
+        tamanho = max(1, deslocamento_linhas + len(linhas_blob))
+
+        self._segmento = shared_memory.SharedMemory(create=True, size=tamanho)
+        for campo, dtype, deslocamento, quantidade in layout:
+            destino = np.ndarray(quantidade, dtype=dtype, buffer=self._segmento.buf, offset=deslocamento)
+            destino[:] = getattr(grafo, campo)
+            del destino
+        self._segmento.buf[deslocamento_ids:deslocamento_linhas] = grafo.ids_blob
+        self._segmento.buf[deslocamento_linhas:deslocamento_linhas + len(linhas_blob)] = linhas_blob
+
+        self.descritor = DescritorRede(
+            nome_segmento=self._segmento.name,
+            tamanho=tamanho,
+            arrays=tuple(layout),
+            deslocamento_ids=deslocamento_ids,
+            tamanho_ids=len(grafo.ids_blob),
+            deslocamento_linhas=deslocamento_linhas,
+            tamanho_linhas=len(linhas_blob),
+            versao=grafo.versao
+        )
+
+    def liberar(self):
+        """Fecha e remove o segmento (workers já anexados devem ter terminado)"""
+        if self._segmento is not None:
+            self._segmento.close()
+            self._segmento.unlink()
+            self._segmento = None
+
+    def __enter__(self) -> 'RedeCompartilhada':
+        return self
+
+    def __exit__(self, *_):
+        self.liberar()
+
+
+def anexar_grafo(descritor: DescritorRede, processo_independente: bool = False) -> GrafoCompilado:
+    """
+    Monta um GrafoCompilado sobre o segmento descrito, sem copiar os dados
+
+    Args:
+        descritor: Descritor criado por RedeCompartilhada
+        processo_independente: True quando o processo não foi criado pelo
+            multiprocessing do dono (ex.: outro programa). Evita que o
+            resource_tracker desse processo remova o segmento ao sair.
+
+    Returns:
+        GrafoCompilado somente leitura apontando para a memória compartilhada
+    """
+    if sys.version_info >= (3, 13):
+        segmento = shared_memory.SharedMemory(name=descritor.nome_segmento, track=False)
+    else:
+        segmento = shared_memory.SharedMemory(name=descritor.nome_segmento)
+        if processo_independente:
+            resource_tracker.unregister(segmento._name, 'shared_memory')
+
+    arrays = {}
+    for campo, dtype, deslocamento, quantidade in descritor.arrays:
+        array = np.ndarray(quantidade, dtype=dtype, buffer=segmento.buf, offset=deslocamento)
+        array.flags.writeable = False
+        arrays[campo] = array
+
+    inicio = descritor.deslocamento_ids
+    linhas = bytes(segmento.buf[descritor.deslocamento_linhas:
+                                descritor.deslocamento_linhas + descritor.tamanho_linhas]).decode('utf-8')
+    grafo = GrafoCompilado(
+        ids_blob=segmento.buf[inicio:inicio + descritor.tamanho_ids].toreadonly(),
+        linhas=linhas.split('\0') if linhas else [],
+        versao=descritor.versao,
+        **arrays
+    )
+    # O segmento precisa viver enquanto o grafo existir
+    grafo._segmento = segmento
+    return grafo
+
+
+def inicializar_worker(descritor: DescritorRede):
+    """Initializer de multiprocessing.Pool: anexa o grafo uma vez por worker"""
+    global _grafo_worker
+    _grafo_worker = anexar_grafo(descritor)
+
+
+def grafo_do_worker() -> GrafoCompilado:
+    """Grafo anexado por inicializar_worker no processo atual"""
+    if _grafo_worker is None:
+        raise RuntimeError("Worker sem grafo: use inicializar_worker como initializer do Pool")
+    return _grafo_worker
+
+
+def _tempo_no_worker(par: Tuple[str, str]) -> Optional[float]:
+    """Tarefa de exemplo: tempo da rota entre dois IDs usando o grafo anexado"""
+    grafo = grafo_do_worker()
+    busca = grafo.menor_caminho(grafo.indice(par[0]), grafo.indice(par[1]))
+    return busca[1] if busca else None
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import pickle
+    import time
+    from multiprocessing import Pool
+
+    from gerador_rede import gerar_rede_sintetica
+
+    sistema = gerar_rede_sintetica(100_000, semente=1)
+    grafo = sistema.compilar()
+    print(f"🔗 Rede compilada: {grafo.memoria_bytes() / 1024:,.0f} kB | "
+          f"SistemaVermelhinho em pickle: {len(pickle.dumps(sistema)) / 1024:,.0f} kB")
+
+    with RedeCompartilhada(grafo) as rede:
+        print(f"   • Descritor em pickle: {len(pickle.dumps(rede.descritor))} bytes")
+        pares = [(grafo.id_do_indice(i), grafo.id_do_indice(len(grafo) - 1 - i)) for i in range(0, 4000, 100)]
+        inicio = time.perf_counter()
+        with Pool(4, initializer=inicializar_worker, initargs=(rede.descritor,)) as pool:
+            tempos = pool.map(_tempo_no_worker, pares)
+        duracao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        esperado = [grafo.menor_caminho(grafo.indice(a), grafo.indice(b))[1] for a, b in pares]
+        print(f"   • {len(pares)} rotas: {duracao:.2f}s com 4 workers, "
+              f"{time.perf_counter() - inicio:.2f}s no processo principal | "
+              f"resultados iguais: {'✅' if tempos == esperado else '❌'}")
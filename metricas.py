@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+📈 MÉTRICAS - SISTEMA VERMELINHO
+Busync - Contadores, medidores e histogramas no formato texto do Prometheus
+
+Registro de métricas sem dependências externas. Cada métrica tem nome,
+ajuda e rótulos; os valores ficam por combinação de rótulos e são
+atualizados sob uma trava (o servidor HTTP calcula rotas em threads). O
+registro exporta o formato de exposição texto 0.0.4 do Prometheus, servido
+em /metrics pelo servidor_http ou gravado em arquivo para o textfile
+collector do node_exporter.
+
+As métricas do backend (consultas por resultado, latência por motor e
+perfil, acertos dos caches, tamanho e tempo de montagem da rede) ficam em
+METRICAS, compartilhado por todos os sistemas do processo. No servidor
+pré-fork cada processo tem o seu registro.
+
+Salve como: metricas.py
+"""
+
+import bisect
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Limites padrão dos histogramas de latência (segundos)
+LIMITES_LATENCIA = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content-Type do formato texto do Prometheus
+TIPO_CONTEUDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+Rotulos = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return '+Inf' if valor > 0 else '-Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class Metrica:
+    """Base: nome, ajuda, nomes dos rótulos e valores por combinação de rótulos"""
+
+    tipo = 'untyped'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        """
+        Args:
+            nome: Nome Prometheus (ex.: 'busync_consultas_total')
+            ajuda: Texto da linha # HELP
+            rotulos: Nomes dos rótulos, na ordem dos valores passados
+        """
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Rotulos, object] = {}
+        self._trava = threading.Lock()
+
+    def _chave(self, valores: Sequence[str]) -> Rotulos:
+        if len(valores) != len(self.rotulos):
+            raise ValueError(f"{self.nome}: esperados rótulos {self.rotulos}, recebidos {tuple(valores)}")
+        return tuple(str(valor) for valor in valores)
+
+    def _seletor(self, chave: Rotulos, extra: str = '') -> str:
+        pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(self.rotulos, chave)]
+        if extra:
+            pares.append(extra)
+        return '{' + ','.join(pares) + '}' if pares else ''
+
+    def _amostras(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> List[str]:
+        """Linhas da métrica no formato texto do Prometheus"""
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._trava:
+            linhas.extend(self._amostras())
+        return linhas
+
+
+class Contador(Metrica):
+    """Valor que só cresce (ex.: consultas atendidas)"""
+
+    tipo = 'counter'
+
+    def incrementar(self, *rotulos: str, valor: float = 1.0):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valor(self, *rotulos: str) -> float:
+        return self._valores.get(self._chave(rotulos), 0.0)
+
+    def valores(self) -> Dict[Rotulos, float]:
+        """Cópia dos valores por combinação de rótulos"""
+        with self._trava:
+            return dict(self._valores)
+
+    def _amostras(self):
+        for chave, valor in self._valores.items():
+            yield f"{self.nome}{self._seletor(chave)} {_numero(valor)}"
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: pontos na rede)"""
+
+    tipo = 'gauge'
+
+    def definir(self, *rotulos: str, valor: float):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = float(valor)
+
+
+class Histograma(Metrica):
+    """Distribuição em faixas cumulativas (le), com soma e contagem"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                 limites: Sequence[float] = LIMITES_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor: float, *rotulos: str):
+        chave = self._chave(rotulos)
+        posicao = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            estado = self._valores.get(chave)
+            if estado is None:
+                # [contagem por faixa (última = +Inf), soma, contagem]
+                estado = self._valores[chave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            estado[0][posicao] += 1
+            estado[1] += valor
+            estado[2] += 1
+
+    def resumo(self, *rotulos: str) -> Optional[Dict[str, float]]:
+        """Contagem, soma e média de uma combinação de rótulos (None se vazia)"""
+        estado = self._valores.get(self._chave(rotulos))
+        if estado is None:
+            return None
+        return {'contagem': estado[2], 'soma': estado[1], 'media': estado[1] / estado[2]}
+
+    def quantil(self, q: float, *rotulos: str) -> Optional[float]:
+        """Quantil estimado pelo limite superior da faixa (como histogram_quantile)"""
+        estado = self._valores.get(self._chave(rotulos))
+        if estado is None:
+            return None
+        alvo, acumulado = q * estado[2], 0
+        for posicao, quantidade in enumerate(estado[0]):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return self.limites[posicao] if posicao < len(self.limites) else math.inf
+        return math.inf
+
+    def _amostras(self):
+        for chave, (faixas, soma, contagem) in self._valores.items():
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (math.inf,), faixas):
+                acumulado += quantidade
+                faixa = 'le="%s"' % _numero(limite)
+                yield f"{self.nome}_bucket{self._seletor(chave, faixa)} {acumulado}"
+            yield f"{self.nome}_sum{self._seletor(chave)} {_numero(soma)}"
+            yield f"{self.nome}_count{self._seletor(chave)} {contagem}"
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas juntas"""
+
+    def __init__(self):
+        self._metricas: Dict[str, Metrica] = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, metrica: Metrica) -> Metrica:
+        with self._trava:
+            existente = self._metricas.get(metrica.nome)
+            if existente is not None:
+                if type(existente) is not type(metrica) or existente.rotulos != metrica.rotulos:
+                    raise ValueError(f"Métrica '{metrica.nome}' já registrada com outro tipo ou rótulos")
+                return existente
+            self._metricas[metrica.nome] = metrica
+            return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Medidor:
+        return self._registrar(Medidor(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+                   limites: Sequence[float] = LIMITES_LATENCIA) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato texto do Prometheus"""
+        linhas = []
+        for metrica in list(self._metricas.values()):
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
+
+    def gravar(self, caminho: str):
+        """Grava a exportação de forma atômica (textfile collector do node_exporter)"""
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(self.exportar())
+        os.replace(temporario, caminho)
+
+
+class MetricasRotas:
+    """Métricas do backend de rotas"""
+
+    def __init__(self, registro: RegistroMetricas):
+        self.registro = registro
+        self.consultas = registro.contador(
+            'busync_consultas_total', "Consultas de rota por resultado e perfil", ('resultado', 'perfil'))
+        self.latencia = registro.histograma(
+            'busync_consulta_segundos', "Latência de calcular_rota por motor e perfil", ('motor', 'perfil'))
+        self.cache = registro.contador(
+            'busync_cache_total', "Consultas aos caches por resultado (acerto/falha)", ('cache', 'resultado'))
+        self.pontos = registro.medidor('busync_rede_pontos', "Pontos na rede compilada")
+        self.conexoes = registro.medidor('busync_rede_conexoes', "Conexões na rede compilada")
+        self.construcao = registro.medidor(
+            'busync_rede_construcao_segundos', "Tempo da última montagem da rede por etapa", ('etapa',))
+
+    def registrar_consulta(self, resultado: str, apenas_acessivel: bool, segundos: float, motor: str = 'csr'):
+        """
+        Conta uma consulta e observa sua latência
+
+        Args:
+            resultado: 'encontrada', 'sem_caminho', 'ponto_invalido', 'erro' ou 'cancelada'
+            apenas_acessivel: Perfil da consulta
+            segundos: Duração da consulta
+            motor: Motor de busca usado
+        """
+        perfil = 'acessivel' if apenas_acessivel else 'padrao'
+        self.consultas.incrementar(resultado, perfil)
+        self.latencia.observar(segundos, motor, perfil)
+
+    def registrar_cache(self, cache: str, acerto: bool):
+        self.cache.incrementar(cache, 'acerto' if acerto else 'falha')
+
+    def taxa_acerto(self, cache: str) -> Optional[float]:
+        """Fração de acertos de um cache (None se nunca consultado)"""
+        acertos, falhas = self.cache.valor(cache, 'acerto'), self.cache.valor(cache, 'falha')
+        return acertos / (acertos + falhas) if acertos + falhas else None
+
+    def registrar_rede(self, pontos: int, conexoes: int):
+        self.pontos.definir(valor=pontos)
+        self.conexoes.definir(valor=conexoes)
+
+    def registrar_construcao(self, etapa: str, segundos: float):
+        self.construcao.definir(etapa, valor=segundos)
+
+
+# Registro e métricas do processo
+REGISTRO = RegistroMetricas()
+METRICAS = MetricasRotas(REGISTRO)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import random
+    import sys
+
+    from sistema_backend import SistemaVermelhinho
+
+    sistema = SistemaVermelhinho()
+    # Executado como script, este módulo é __main__: usar as métricas do sistema
+    metricas = sistema.metricas
+    ids = list(sistema.pontos.keys())
+    gerador = random.Random(0)
+    for _ in range(500):
+        sistema.calcular_rota(*gerador.sample(ids, 2), apenas_acessivel=gerador.random() < 0.3)
+    sistema.calcular_rota('NAO_EXISTE', ids[0])
+
+    if len(sys.argv) > 1:
+        metricas.registro.gravar(sys.argv[1])
+        print(f"💾 Métricas gravadas em {sys.argv[1]}")
+    else:
+        print(metricas.registro.exportar())
+    p99 = metricas.latencia.quantil(0.99, 'csr', 'padrao')
+    print(f"📈 Consultas: {metricas.consultas.valores()} | p99 (faixa) ≤ {p99 * 1000:.1f} ms")
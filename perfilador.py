@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+🔥 PERFILADOR POR AMOSTRAGEM - SISTEMA VERMELINHO
+Busync - Captura sob demanda das pilhas de roteamento e renderização
+
+Lentidões em produção (interface Tk, roteamento em lote, servidores) são
+intermitentes e não aparecem no benchmark. Este perfilador fica desligado
+até ser acionado por um botão da interface (botao_perfil), por um sinal (SIGUSR2) ou pela
+API ``perfilar(segundos)``; então um thread de fundo lê as pilhas de todos
+os threads com ``sys._current_frames()`` a cada ``intervalo`` segundos,
+durante N segundos, e grava o resultado no formato "collapsed stacks"
+(uma pilha por linha, quadros separados por ';' e a contagem no fim),
+lido por flamegraph.pl, speedscope e inferno.
+
+Com 10 ms de intervalo o custo fica abaixo de 1% de um núcleo, e nada é
+instrumentado: os threads amostrados não executam código extra.
+
+Exemplos:
+    kill -USR2 <pid>                      # 10 s de perfil → perfil_<pid>_<data>.folded
+    flamegraph.pl perfil_1234_20240101-120000.folded > perfil.svg
+
+Salve como: perfilador.py
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+# Intervalo padrão entre amostras (s)
+INTERVALO_PADRAO = 0.01
+
+# Duração padrão de um perfil acionado por sinal ou pela interface (s)
+DURACAO_PADRAO = 10.0
+
+# Quadros mais profundos que isso são cortados (recursão descontrolada)
+PROFUNDIDADE_MAXIMA = 200
+
+AoConcluir = Callable[[str], None]
+
+_trava = threading.Lock()
+_em_andamento: Optional['PerfiladorAmostragem'] = None
+
+
+def _quadro(frame) -> str:
+    """Rótulo de um quadro: 'funcao (arquivo.py:linha)', sem ';' (separador)"""
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{frame.f_lineno})".replace(';', ':')
+
+
+class PerfiladorAmostragem:
+    """Amostra periodicamente as pilhas de todos os threads do processo"""
+
+    def __init__(self, intervalo: float = INTERVALO_PADRAO):
+        """
+        Args:
+            intervalo: Tempo entre amostras (s)
+        """
+        self.intervalo = intervalo
+        self.pilhas: Counter = Counter()
+        self.amostras = 0
+        self.duracao = 0.0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self, segundos: Optional[float] = None,
+                ao_concluir: Optional[Callable[['PerfiladorAmostragem'], None]] = None):
+        """
+        Começa a amostrar em um thread de fundo
+
+        Args:
+            segundos: Para sozinho após este tempo (None = até parar())
+            ao_concluir: Chamado no thread de fundo quando a amostragem termina
+        """
+        if self._thread is not None:
+            raise RuntimeError("Perfilador já iniciado")
+        self._thread = threading.Thread(target=self._amostrar, args=(segundos, ao_concluir),
+                                        name='busync-perfilador', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        """Encerra a amostragem e aguarda o thread de fundo"""
+        self._parar.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _amostrar(self, segundos: Optional[float], ao_concluir):
+        """Thread de fundo: uma leitura das pilhas por intervalo"""
+        proprio = threading.get_ident()
+        inicio = time.perf_counter()
+        limite = inicio + segundos if segundos is not None else None
+        while not self._parar.wait(self.intervalo):
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                quadros = []
+                while frame is not None and len(quadros) < PROFUNDIDADE_MAXIMA:
+                    quadros.append(_quadro(frame))
+                    frame = frame.f_back
+                quadros.append(f"thread:{nomes.get(ident, ident)}")
+                self.pilhas[';'.join(reversed(quadros))] += 1
+            self.amostras += 1
+            if limite is not None and time.perf_counter() >= limite:
+                break
+        self.duracao = time.perf_counter() - inicio
+        if ao_concluir is not None:
+            ao_concluir(self)
+
+    def colapsado(self) -> str:
+        """Pilhas no formato collapsed ('a;b;c contagem' por linha)"""
+        return ''.join(f"{pilha} {contagem}\n" for pilha, contagem in self.pilhas.most_common())
+
+    def gravar(self, caminho: str) -> str:
+        """Grava as pilhas em ``caminho`` e o retorna"""
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(self.colapsado())
+        return caminho
+
+
+def caminho_padrao(diretorio: str = '.') -> str:
+    """Nome do arquivo de perfil: perfil_<pid>_<AAAAMMDD-HHMMSS>.folded"""
+    return os.path.join(diretorio, f"perfil_{os.getpid()}_{time.strftime('%Y%m%d-%H%M%S')}.folded")
+
+
+def perfil_em_andamento() -> bool:
+    """Se há um perfil sendo capturado neste processo"""
+    return _em_andamento is not None
+
+
+def perfilar(segundos: float = DURACAO_PADRAO, caminho: Optional[str] = None,
+             ao_concluir: Optional[AoConcluir] = None, intervalo: float = INTERVALO_PADRAO) -> bool:
+    """
+    Captura um perfil de ``segundos`` sem bloquear quem chamou
+
+    Só um perfil por processo: se já houver um em andamento, nada é feito.
+
+    Args:
+        segundos: Duração da captura
+        caminho: Arquivo de saída (padrão: ver caminho_padrao)
+        ao_concluir: Chamado com o caminho gravado, no thread do perfilador
+            (na interface Tk, repassar ao loop principal com root.after)
+        intervalo: Tempo entre amostras (s)
+
+    Returns:
+        True se a captura começou
+    """
+    global _em_andamento
+    with _trava:
+        if _em_andamento is not None:
+            return False
+        perfilador = _em_andamento = PerfiladorAmostragem(intervalo)
+    caminho = caminho or caminho_padrao()
+
+    def concluir(_):
+        global _em_andamento
+        try:
+            perfilador.gravar(caminho)
+        except OSError as erro:
+            print(f"❌ Perfil não gravado em {caminho}: {erro}", file=sys.stderr)
+            return
+        finally:
+            with _trava:
+                _em_andamento = None
+        print(f"🔥 Perfil gravado: {caminho} ({perfilador.amostras} amostras, {len(perfilador.pilhas)} pilhas)",
+              file=sys.stderr)
+        if ao_concluir is not None:
+            ao_concluir(caminho)
+
+    perfilador.iniciar(segundos, concluir)
+    return True
+
+
+def botao_perfil(root, pai, status_label, segundos: float = DURACAO_PADRAO):
+    """
+    Botão Tk "🔥 Perfilar" para a barra de status de uma janela
+
+    Ao clicar, dispara ``perfilar(segundos)``, desabilita o botão e avisa em
+    ``status_label``; o perfilador grava em seu próprio thread e o Tk só
+    consulta (com root.after) se terminou, para reabilitar o botão.
+
+    Args:
+        root: Janela Tk principal (agenda as consultas)
+        pai: Frame onde o botão é criado (quem chama faz o pack)
+        status_label: Label que recebe as mensagens do perfil
+        segundos: Duração da captura
+
+    Returns:
+        O tk.Button criado
+    """
+    import tkinter as tk
+
+    texto = f"🔥 Perfilar {segundos:.0f}s"
+
+    def verificar(caminho):
+        if perfil_em_andamento():
+            root.after(200, verificar, caminho)
+            return
+        botao.config(text=texto, state=tk.NORMAL)
+        if os.path.exists(caminho):
+            status_label.config(text=f"🔥 Perfil gravado: {os.path.basename(caminho)}")
+        else:
+            status_label.config(text="❌ Perfil não gravado (veja o console)")
+
+    def iniciar():
+        caminho = caminho_padrao()
+        if not perfilar(segundos, caminho):
+            return
+        botao.config(text="🔥 Perfilando...", state=tk.DISABLED)
+        status_label.config(text=f"🔥 Perfilando por {segundos:.0f}s: use o sistema normalmente")
+        root.after(int(segundos * 1000), verificar, caminho)
+
+    botao = tk.Button(pai, text=texto, command=iniciar, font=('Arial', 9),
+                      fg='white', bg='#34495E', relief=tk.FLAT, cursor='hand2')
+    return botao
+
+
+def instalar_sinal(segundos: float = DURACAO_PADRAO, diretorio: str = '.', sinal: Optional[int] = None) -> bool:
+    """
+    Aciona ``perfilar`` ao receber um sinal (padrão SIGUSR2)
+
+    Deve ser chamado no thread principal. O manipulador só dispara a
+    captura; o perfil é gravado em ``diretorio`` ao fim de ``segundos``.
+
+    Returns:
+        False se a plataforma não tem o sinal (Windows)
+    """
+    if sinal is None:
+        sinal = getattr(signal, 'SIGUSR2', None)
+    if sinal is None:
+        return False
+
+    def ao_receber(*_):
+        if not perfilar(segundos, caminho_padrao(diretorio)):
+            print("⚠️ Perfil já em andamento; sinal ignorado", file=sys.stderr)
+
+    signal.signal(sinal, ao_receber)
+    return True
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    from gerador_rede import gerar_rede_sintetica
+
+    sistema = gerar_rede_sintetica(20_000, semente=3)
+    ids = list(sistema.pontos.keys())
+    gerador = random.Random(0)
+    sistema.compilar()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        concluido = threading.Event()
+        caminho = os.path.join(diretorio, 'perfil.folded')
+        perfilar(2.0, caminho, ao_concluir=lambda _: concluido.set())
+        consultas = 0
+        while not concluido.is_set():
+            sistema.calcular_rota(*gerador.sample(ids, 2))
+            consultas += 1
+
+        with open(caminho, encoding='utf-8') as arquivo:
+            linhas = arquivo.read().splitlines()
+        print(f"🔥 {consultas} consultas perfiladas: {len(linhas)} pilhas distintas")
+        print(f"   • Mais frequente: {linhas[0][:160]}...")
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+⏱️ RASTREADOR DE INICIALIZAÇÃO - SISTEMA VERMELINHO
+Busync - Para onde vai o tempo entre abrir o programa e a janela pronta
+
+Um RastreadorInicializacao registra as etapas da abertura (montagem da
+rede, posições do visualizador, janela, cada aba) com time.perf_counter e,
+enquanto ``importacoes()`` estiver ativo, o tempo de importação de cada
+módulo: total (com as dependências que ele puxou) e próprio (só o código
+do módulo), como ``python -X importtime``, mas dentro do processo e junto
+com as demais etapas.
+
+``marcar_pronto()`` fecha a inicialização; etapas registradas depois (abas
+construídas na primeira seleção) aparecem no relatório como adiadas.
+
+Salve como: rastreador_inicializacao.py
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class RastreadorInicializacao:
+    """Etapas e importações da inicialização, em ms desde a criação"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        # (nome, início, duração) em segundos desde self.inicio
+        self.etapas: List[tuple] = []
+        # módulo -> [total, próprio] em segundos
+        self.modulos: Dict[str, List[float]] = {}
+        self.pronto: Optional[float] = None
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede o bloco como a etapa ``nome``"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((nome, inicio - self.inicio, time.perf_counter() - inicio))
+
+    @contextmanager
+    def importacoes(self, nome: str = 'importacoes'):
+        """
+        Mede o bloco como uma etapa e o tempo de cada módulo importado nele
+
+        Só imports novos, feitos no thread que abriu o bloco, são medidos;
+        módulos já carregados seguem direto para o import original.
+        """
+        original = builtins.__import__
+        thread = threading.get_ident()
+        # Tempo dos imports filhos de cada import em andamento
+        pilha: List[float] = []
+
+        def importar(modulo, globais=None, locais=None, lista=(), nivel=0):
+            if nivel or modulo in sys.modules or threading.get_ident() != thread:
+                return original(modulo, globais, locais, lista, nivel)
+            pilha.append(0.0)
+            inicio = time.perf_counter()
+            try:
+                return original(modulo, globais, locais, lista, nivel)
+            finally:
+                total = time.perf_counter() - inicio
+                filhos = pilha.pop()
+                if pilha:
+                    pilha[-1] += total
+                registro = self.modulos.setdefault(modulo, [0.0, 0.0])
+                registro[0] += total
+                registro[1] += total - filhos
+
+        builtins.__import__ = importar
+        try:
+            with self.etapa(nome):
+                yield
+        finally:
+            builtins.__import__ = original
+
+    def marcar_pronto(self):
+        """Fecha a inicialização (a primeira chamada vale)"""
+        if self.pronto is None:
+            self.pronto = time.perf_counter() - self.inicio
+
+    def relatorio(self) -> Dict:
+        """Dicionário serializável: etapas, importações (mais lentas primeiro) e pronto_ms"""
+        pronto = self.pronto if self.pronto is not None else float('inf')
+        return {
+            'pronto_ms': round(self.pronto * 1000, 2) if self.pronto is not None else None,
+            'etapas': [
+                {'nome': nome, 'inicio_ms': round(inicio * 1000, 2), 'duracao_ms': round(duracao * 1000, 2),
+                 'adiada': inicio >= pronto}
+                for nome, inicio, duracao in self.etapas
+            ],
+            'importacoes': {
+                modulo: {'total_ms': round(total * 1000, 2), 'proprio_ms': round(proprio * 1000, 2)}
+                for modulo, (total, proprio) in sorted(self.modulos.items(), key=lambda item: -item[1][0])
+            },
+        }
+
+    def resumo(self) -> str:
+        """Linha legível: tempo até pronto e etapas não adiadas"""
+        relatorio = self.relatorio()
+        etapas = ', '.join(f"{etapa['nome']} {etapa['duracao_ms']:.0f}"
+                           for etapa in relatorio['etapas'] if not etapa['adiada'])
+        pronto = f"{relatorio['pronto_ms']:.0f} ms" if relatorio['pronto_ms'] is not None else "não concluída"
+        return f"Inicialização: {pronto} ({etapas} ms)"
+
+    def tabela(self, modulos: int = 10) -> str:
+        """Etapas e os ``modulos`` imports mais lentos, uma linha cada"""
+        relatorio = self.relatorio()
+        linhas = [f"⏱️ {self.resumo()}"]
+        for etapa in relatorio['etapas']:
+            adiada = ' (adiada)' if etapa['adiada'] else ''
+            linhas.append(f"   • {etapa['nome']:<22} {etapa['duracao_ms']:9.1f} ms  "
+                          f"@ {etapa['inicio_ms']:8.1f} ms{adiada}")
+        for modulo, tempos in list(relatorio['importacoes'].items())[:modulos]:
+            linhas.append(f"   • {'import ' + modulo:<22} {tempos['total_ms']:9.1f} ms  "
+                          f"(próprio {tempos['proprio_ms']:.1f} ms)")
+        return '\n'.join(linhas)
+
+
+# Teste rápido se executado diretamente
+if __name__ == "__main__":
+    rastreador = RastreadorInicializacao()
+    with rastreador.importacoes():
+        from sistema_backend import SistemaVermelhinho
+        from visualizador_grafo import VisualizadorGrafo
+    with rastreador.etapa('backend'):
+        sistema = SistemaVermelhinho()
+    with rastreador.etapa('visualizador'):
+        VisualizadorGrafo(sistema)
+    rastreador.marcar_pronto()
+    with rastreador.etapa('primeira_consulta'):
+        sistema.calcular_rota('RODOVIARIA', 'PRACA_PONTA_NEGRA')
+    print(rastreador.tabela())
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+"""
+💾 RELATÓRIO DE MEMÓRIA - SISTEMA VERMELINHO
+Busync - Quanto cada parte do SistemaVermelhinho ocupa e como isso cresce
+
+Dois instrumentos:
+
+* Tamanho profundo por componente: percorre os objetos de cada parte
+  (grafo NetworkX com seus dicionários de adjacência, TabelaPontos, dicionário
+  linhas_vermelinho, grafo compilado, caches, VisualizadorGrafo e a figura
+  Matplotlib) somando sys.getsizeof e os buffers NumPy. Objetos
+  compartilhados contam só no primeiro componente em que aparecem, na ordem
+  de COMPONENTES. A barra de status da interface mostra cada componente.
+  Os caches são os do backend: instalação mais próxima por tipo
+  (_mais_proximos), centralidade do grafo compilado (analise_rede) e, no
+  sistema da interface Folium, os mapas em cache.
+* Escala: para cada tamanho de rede sintética, tracemalloc mede o que a
+  montagem, a compilação e a visualização alocam de fato, e a contagem de
+  objetos do coletor de lixo mostra quais tipos crescem. O relatório
+  compara bytes por ponto com um orçamento.
+
+Exemplos:
+    python relatorio_memoria.py
+    python relatorio_memoria.py --escala 1000 10000 100000 --visualizador --json
+
+Salve como: relatorio_memoria.py
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from array import array
+from collections import Counter, deque
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from importacao_preguicosa import modulo_disponivel
+
+# Tamanhos padrão do estudo de escala (pontos)
+ESCALAS_PADRAO = [1_000, 10_000, 50_000]
+
+# Orçamento padrão da rede montada e compilada, por ponto (bytes)
+ORCAMENTO_PADRAO_POR_PONTO = 4096
+
+# Tipos que não contêm referências a outros objetos
+_FOLHAS = (str, bytes, int, float, complex, bool, type(None), array, bytearray, range)
+
+# Componentes do sistema, na ordem de atribuição dos objetos compartilhados
+COMPONENTES: Tuple[Tuple[str, Callable], ...] = (
+    ('pontos', lambda sistema: sistema.pontos),
+    ('grafo_networkx', lambda sistema: sistema.grafo),
+    ('linhas_vermelinho', lambda sistema: sistema.linhas_vermelinho),
+    ('grafo_compilado', lambda sistema: getattr(sistema, '_compilado', None)),
+    ('caches', lambda sistema: _caches(sistema)),
+)
+
+# Nomes curtos dos componentes no resumo da barra de status
+ROTULOS_RESUMO = {
+    'pontos': 'pontos', 'grafo_networkx': 'grafo', 'linhas_vermelinho': 'linhas',
+    'grafo_compilado': 'compilado', 'caches': 'caches', 'visualizador': 'visualizador', 'figura': 'figura',
+}
+
+MB = 1024 * 1024
+
+
+def _caches(sistema) -> list:
+    """Caches mantidos para o sistema (os que existirem)"""
+    caches = [getattr(sistema, '_mais_proximos', None), getattr(sistema, 'cache_mapas', None)]
+    # Só consulta analise_rede se já foi importado (não carrega o módulo)
+    analise = sys.modules.get('analise_rede')
+    compilado = getattr(sistema, '_compilado', None)
+    if analise is not None and compilado is not None:
+        caches.append(analise._cache.get(compilado))
+    return [cache for cache in caches if cache is not None]
+
+
+def _tamanho_caches(sistema) -> int:
+    """Número de entradas dos caches (muda quando eles crescem)"""
+    return sum(len(cache) for cache in _caches(sistema) if hasattr(cache, '__len__'))
+
+
+def tamanho_profundo(objeto, vistos: Optional[set] = None) -> int:
+    """
+    Soma sys.getsizeof de um objeto e de tudo o que ele referencia
+
+    Percorre dicionários, sequências, conjuntos, __dict__ e __slots__;
+    arrays NumPy contam o buffer (uma vez, mesmo com várias visões). Tipos,
+    módulos e funções não são percorridos.
+
+    Args:
+        objeto: Raiz da contagem
+        vistos: IDs já contados (compartilhado entre componentes para não
+            contar o mesmo objeto duas vezes)
+
+    Returns:
+        Bytes estimados
+    """
+    vistos = set() if vistos is None else vistos
+    pilha = [objeto]
+    total = 0
+
+    while pilha:
+        atual = pilha.pop()
+        if id(atual) in vistos or atual is None:
+            continue
+        vistos.add(id(atual))
+        if isinstance(atual, (type, type(sys), type(tamanho_profundo), type(len))):
+            continue
+
+        if isinstance(atual, np.ndarray):
+            # getsizeof inclui o buffer só quando o array é dono dos dados
+            total += sys.getsizeof(atual)
+            if atual.base is not None:
+                pilha.append(atual.base)
+            if atual.dtype == object:
+                pilha.extend(atual.ravel().tolist())
+            continue
+        if isinstance(atual, memoryview):
+            total += sys.getsizeof(atual)
+            pilha.append(atual.obj)
+            continue
+
+        total += sys.getsizeof(atual)
+        if isinstance(atual, _FOLHAS):
+            continue
+        if isinstance(atual, dict):
+            pilha.extend(atual.keys())
+            pilha.extend(atual.values())
+        elif isinstance(atual, (list, tuple, set, frozenset, deque)):
+            pilha.extend(atual)
+        else:
+            atributos = getattr(atual, '__dict__', None)
+            if atributos is not None:
+                pilha.append(atributos)
+            for classe in type(atual).__mro__:
+                for nome in getattr(classe, '__slots__', ()):
+                    valor = getattr(atual, nome, None)
+                    if valor is not None:
+                        pilha.append(valor)
+
+    return total
+
+
+def memoria_figura(figura) -> Dict[str, int]:
+    """
+    Estima a memória de uma figura Matplotlib
+
+    Returns:
+        artistas (quantidade), dados (bytes dos arrays dos artistas) e
+        raster (buffer RGBA do canvas Agg, se já desenhado)
+    """
+    dados = 0
+    artistas = figura.findobj()
+    for artista in artistas:
+        for metodo in ('get_offsets', 'get_facecolors', 'get_edgecolors', 'get_sizes', 'get_xydata'):
+            obter = getattr(artista, metodo, None)
+            if obter is not None:
+                try:
+                    dados += np.asarray(obter()).nbytes
+                except (TypeError, ValueError):
+                    pass
+        for caminho in getattr(artista, '_paths', None) or ():
+            dados += caminho.vertices.nbytes
+
+    largura, altura = figura.canvas.get_width_height()
+    raster = largura * altura * 4 if getattr(figura.canvas, 'renderer', None) is not None else 0
+    return {'artistas': len(artistas), 'dados': dados, 'raster': raster}
+
+
+def memoria_visualizador(visualizador, vistos: Optional[set] = None) -> Dict[str, int]:
+    """
+    Memória do VisualizadorGrafo sem contar a rede que ele referencia
+
+    Returns:
+        estado (posições, geometria, estilos por ponto/aresta), figura
+        (dados dos artistas + raster), fundo (cópia do blit) e artistas
+    """
+    vistos = set() if vistos is None else vistos
+    # A rede e a figura são contadas à parte
+    for compartilhado in (visualizador.sistema, visualizador.grafo, visualizador.pontos,
+                          visualizador.fig, visualizador.ax):
+        vistos.add(id(compartilhado))
+    estado = 0
+    for nome, valor in vars(visualizador).items():
+        if not hasattr(valor, 'figure') and not hasattr(valor, 'get_figure'):
+            estado += tamanho_profundo(valor, vistos)
+
+    memoria = {'estado': estado, 'figura': 0, 'fundo': 0, 'artistas': 0}
+    if visualizador.fig is not None:
+        figura = memoria_figura(visualizador.fig)
+        memoria['figura'] = figura['dados'] + figura['raster']
+        memoria['artistas'] = figura['artistas']
+        if visualizador._fundo is not None:
+            largura, altura = visualizador.fig.canvas.get_width_height()
+            memoria['fundo'] = largura * altura * 4
+    return memoria
+
+
+def memoria_componentes(sistema, visualizador=None) -> Dict[str, int]:
+    """
+    Tamanho profundo de cada componente do sistema (bytes)
+
+    Args:
+        sistema: SistemaVermelhinho
+        visualizador: VisualizadorGrafo opcional (estado e figura)
+    """
+    vistos = set()
+    componentes = {nome: tamanho_profundo(obter(sistema), vistos) for nome, obter in COMPONENTES}
+    if visualizador is not None:
+        memoria = memoria_visualizador(visualizador, vistos)
+        componentes['visualizador'] = memoria['estado']
+        componentes['figura'] = memoria['figura'] + memoria['fundo']
+    return componentes
+
+
+def rss_processo() -> Optional[int]:
+    """Memória residente do processo (bytes; None se não for possível ler)"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if modulo_disponivel('psutil'):
+        import psutil
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def contar_objetos() -> Counter:
+    """Objetos rastreados pelo coletor de lixo, por tipo (contêineres, não str/float)"""
+    return Counter(type(objeto).__name__ for objeto in gc.get_objects())
+
+
+def _tamanho_curto(valor: int) -> str:
+    return f"{valor / MB:.1f} MB" if valor >= MB else f"{valor / 1024:.0f} kB"
+
+
+# Último resumo da interface: (chave, componentes)
+_cache_resumo: Optional[Tuple[tuple, Dict[str, int]]] = None
+
+
+def resumo_memoria(sistema, visualizador=None) -> str:
+    """
+    Texto curto para a barra de status com o total e cada componente,
+    ex.: '85.3 MB (pontos 120 kB · grafo 1.2 MB · ... · figura 9.1 MB)'
+
+    Os componentes só são recontados quando a versão da rede, os caches ou
+    a figura do visualizador mudam.
+    """
+    global _cache_resumo
+    figura = getattr(visualizador, 'fig', None)
+    chave = (id(sistema), getattr(sistema, 'versao_rede', 0), _tamanho_caches(sistema), id(visualizador),
+             id(figura),
+             getattr(figura, 'canvas', None) is not None and getattr(figura.canvas, 'renderer', None) is not None)
+    if _cache_resumo is None or _cache_resumo[0] != chave:
+        _cache_resumo = (chave, memoria_componentes(sistema, visualizador))
+    componentes = _cache_resumo[1]
+
+    partes = [f"{ROTULOS_RESUMO.get(nome, nome)} {_tamanho_curto(valor)}" for nome, valor in componentes.items()]
+    rss = rss_processo()
+    total = rss if rss is not None else sum(componentes.values())
+    return f"{total / MB:.1f} MB ({' · '.join(partes)})"
+
+
+# ------------------------------------------------------------------ escala
+
+def medir_escala(total_pontos: int, visualizador: bool = False, objetos: int = 8) -> Dict:
+    """
+    Mede as alocações de uma rede sintética com tracemalloc
+
+    Args:
+        total_pontos: Tamanho da rede
+        visualizador: Se True, também monta e desenha a figura (Agg)
+        objetos: Quantos tipos de objeto listar (os que mais cresceram)
+
+    Returns:
+        Pontos, conexões, bytes alocados por etapa, componentes (tamanho
+        profundo), bytes por ponto e crescimento de objetos por tipo
+    """
+    from gerador_rede import gerar_rede_sintetica
+
+    gc.collect()
+    antes = contar_objetos()
+    tracemalloc.start()
+    try:
+        inicio = tracemalloc.get_traced_memory()[0]
+        sistema = gerar_rede_sintetica(total_pontos, semente=total_pontos)
+        apos_montagem = tracemalloc.get_traced_memory()[0]
+        sistema.compilar()
+        apos_compilacao = tracemalloc.get_traced_memory()[0]
+        # Caches das consultas: instalação mais próxima de cada ponto por tipo
+        sistema.precalcular_mais_proximos()
+        apos_caches = tracemalloc.get_traced_memory()[0]
+        vis = None
+        if visualizador:
+            from visualizador_grafo import VisualizadorGrafo
+            vis = VisualizadorGrafo(sistema)
+            vis.criar_visualizacao()
+            vis.fig.canvas.draw()
+        apos_visualizacao = tracemalloc.get_traced_memory()[0]
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    crescimento = contar_objetos()
+    crescimento.subtract(antes)
+    componentes = memoria_componentes(sistema, vis)
+    pontos = len(sistema.pontos)
+
+    medicao = {
+        'pontos': pontos,
+        'conexoes': sistema.grafo.number_of_edges(),
+        'alocado': {
+            'montagem': apos_montagem - inicio,
+            'compilacao': apos_compilacao - apos_montagem,
+            'caches': apos_caches - apos_compilacao,
+            'visualizacao': apos_visualizacao - apos_caches,
+            'pico': pico - inicio,
+        },
+        'componentes': componentes,
+        'detalhe_pontos': sistema.pontos.memoria_bytes(detalhado=True),
+        'bytes_por_ponto': round((apos_compilacao - inicio) / pontos, 1),
+        'objetos': dict((tipo, quantidade) for tipo, quantidade in crescimento.most_common(objetos)
+                        if quantidade > 0),
+    }
+
+    if vis is not None:
+        from visualizador_grafo import plt
+        plt.close(vis.fig)
+    del sistema, vis
+    gc.collect()
+    return medicao
+
+
+def executar_relatorio(escalas: Sequence[int], visualizador: bool,
+                       orcamento_por_ponto: float) -> Dict:
+    """
+    Relatório da rede real e do estudo de escala
+
+    Returns:
+        Relatório com componentes da rede real, medições por escala e as
+        escalas que estouraram o orçamento de bytes por ponto
+    """
+    from sistema_backend import SistemaVermelhinho
+
+    real = SistemaVermelhinho()
+    real.compilar()
+    real.precalcular_mais_proximos()
+    real.obter_estatisticas(centralidade=True)
+    relatorio = {
+        'rss_inicial': rss_processo(),
+        'real': {'pontos': len(real.pontos), 'componentes': memoria_componentes(real)},
+        'escalas': [],
+        'orcamento_bytes_por_ponto': orcamento_por_ponto,
+        'falhas': [],
+    }
+    for total_pontos in escalas:
+        medicao = medir_escala(total_pontos, visualizador)
+        relatorio['escalas'].append(medicao)
+        if medicao['bytes_por_ponto'] > orcamento_por_ponto:
+            relatorio['falhas'].append(f"{medicao['pontos']:,} pontos: {medicao['bytes_por_ponto']:,.0f} B/ponto "
+                                       f"(orçamento {orcamento_por_ponto:,.0f})")
+    relatorio['rss_final'] = rss_processo()
+    return relatorio
+
+
+def _kb(valor: int) -> str:
+    return f"{valor / 1024:,.0f} kB"
+
+
+def main() -> int:
+    """Gera o relatório pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Relatório de memória do Sistema Vermelinho")
+    parser.add_argument('--escala', type=int, nargs='*', default=ESCALAS_PADRAO,
+                        help="Tamanhos das redes sintéticas medidas (pontos)")
+    parser.add_argument('--visualizador', action='store_true',
+                        help="Inclui VisualizadorGrafo e a figura no estudo de escala")
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO_PADRAO_POR_PONTO,
+                        help="Bytes por ponto permitidos para montar e compilar a rede")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    if args.visualizador:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    relatorio = executar_relatorio(args.escala, args.visualizador, args.orcamento)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+    else:
+        real = relatorio['real']
+        print(f"💾 Rede real ({real['pontos']} pontos):")
+        for nome, valor in real['componentes'].items():
+            print(f"   • {nome:<18} {_kb(valor):>12}")
+
+        if relatorio['escalas']:
+            nomes = list(relatorio['escalas'][0]['componentes'])
+            print("\n📈 Escala (tamanho profundo por componente; alocado = tracemalloc):")
+            print(f"   {'pontos':>9} " + ' '.join(f"{nome:>17}" for nome in nomes) +
+                  f" {'alocado':>12} {'B/ponto':>9}")
+            for medicao in relatorio['escalas']:
+                alocado = medicao['alocado']['montagem'] + medicao['alocado']['compilacao']
+                print(f"   {medicao['pontos']:>9,} " +
+                      ' '.join(f"{_kb(medicao['componentes'][nome]):>17}" for nome in nomes) +
+                      f" {_kb(alocado):>12} {medicao['bytes_por_ponto']:>9,.0f}")
+            maior = relatorio['escalas'][-1]
+            print(f"\n🔢 Objetos criados na maior rede: " +
+                  ', '.join(f"{tipo} {quantidade:,}" for tipo, quantidade in maior['objetos'].items()))
+
+        if relatorio['rss_final'] is not None:
+            print(f"\n🧠 RSS do processo: {relatorio['rss_final'] / MB:,.1f} MB")
+        for falha in relatorio['falhas']:
+            print(f"❌ Orçamento estourado: {falha}")
+        if not relatorio['falhas']:
+            print(f"✅ Dentro do orçamento de {args.orcamento:,.0f} B/ponto")
+
+    return 1 if relatorio['falhas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
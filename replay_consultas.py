@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+🔁 REPLAY DE CONSULTAS - SISTEMA VERMELINHO
+Busync - Reproduz um log de consultas contra o backend ou o serviço HTTP
+
+Lê o JSONL gravado por log_consultas.LogConsultas e dispara as consultas
+respeitando os intervalos originais, acelerados por ``--velocidade`` (1x,
+10x, 100x...; 0 dispara tudo o mais rápido possível). Um despachante agenda
+cada consulta no seu instante e um grupo de ``--concorrencia`` workers as
+executa, em processo (SistemaVermelhinho) ou por HTTP keep-alive contra o
+servidor_http/servidor_prefork.
+
+A carga é de malha aberta: a latência é medida a partir do instante
+agendado, não do instante em que um worker ficou livre. Assim a fila que
+se forma quando o alvo não dá conta aparece na cauda, em vez de ser
+escondida (coordinated omission). O tempo de serviço puro também é
+reportado.
+
+Exemplos:
+    python replay_consultas.py consultas.jsonl --velocidade 10 --concorrencia 8
+    python replay_consultas.py consultas.jsonl --url http://127.0.0.1:8080 --velocidade 100
+
+Salve como: replay_consultas.py
+"""
+
+import argparse
+import http.client
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+from benchmark_suite import resumir
+from log_consultas import ler_log
+
+_FIM = object()
+
+
+def executor_backend(sistema=None) -> Callable[[], Callable[[Dict], bool]]:
+    """
+    Fábrica de executores em processo (um por worker, mesmo sistema)
+
+    Returns:
+        Função que cria o executor de um worker; o executor recebe o
+        registro do log e retorna se a consulta foi atendida sem erro
+    """
+    if sistema is None:
+        from sistema_backend import SistemaVermelhinho
+        sistema = SistemaVermelhinho()
+    sistema.compilar()
+
+    def criar():
+        def executar(registro: Dict) -> bool:
+            resultado = sistema.calcular_rota(registro['origem'], registro['destino'],
+                                              bool(registro.get('acessivel')))
+            return resultado['encontrada'] or not resultado.get('erro', '').startswith("Erro no cálculo")
+        return executar
+
+    return criar
+
+
+def executor_http(url: str, tempo_limite: float = 30.0) -> Callable[[], Callable[[Dict], bool]]:
+    """
+    Fábrica de executores HTTP: cada worker mantém a própria conexão keep-alive
+
+    Args:
+        url: Endereço do servidor (ex.: http://127.0.0.1:8080)
+        tempo_limite: Tempo máximo de cada requisição (s)
+    """
+    partes = urlsplit(url)
+    if partes.scheme not in ('http', ''):
+        raise ValueError(f"Apenas http:// é suportado: {url}")
+    host, porta = partes.hostname or '127.0.0.1', partes.port or 80
+    prefixo = partes.path.rstrip('/')
+
+    def criar():
+        conexao: List[Optional[http.client.HTTPConnection]] = [None]
+
+        def executar(registro: Dict) -> bool:
+            parametros = {'origem': registro['origem'], 'destino': registro['destino']}
+            if registro.get('acessivel'):
+                parametros['acessivel'] = '1'
+            for tentativa in range(2):
+                if conexao[0] is None:
+                    conexao[0] = http.client.HTTPConnection(host, porta, timeout=tempo_limite)
+                try:
+                    conexao[0].request('GET', f"{prefixo}/rota?{urlencode(parametros)}")
+                    resposta = conexao[0].getresponse()
+                    resposta.read()
+                    return resposta.status < 500
+                except (OSError, http.client.HTTPException):
+                    # Conexão keep-alive fechada pelo servidor: reabrir uma vez
+                    conexao[0].close()
+                    conexao[0] = None
+                    if tentativa:
+                        return False
+            return False
+
+        return executar
+
+    return criar
+
+
+def reproduzir(registros: List[Dict], criar_executor: Callable[[], Callable[[Dict], bool]],
+               velocidade: float = 1.0, concorrencia: int = 4) -> Dict:
+    """
+    Dispara os registros no ritmo do log e mede a resposta
+
+    Args:
+        registros: Consultas do log, em ordem de instante
+        criar_executor: Fábrica de executores (um por worker)
+        velocidade: Fator de aceleração (0 = sem esperar entre consultas)
+        concorrencia: Workers executando consultas ao mesmo tempo
+
+    Returns:
+        Relatório com vazão, latência (do instante agendado), tempo de
+        serviço, erros e atraso do despachante
+    """
+    fila: queue.Queue = queue.Queue(maxsize=concorrencia * 4)
+    latencias, servicos = [], []
+    contagem = {'erros': 0}
+    trava = threading.Lock()
+
+    def worker():
+        executar = criar_executor()
+        while True:
+            item = fila.get()
+            if item is _FIM:
+                return
+            agendado_ns, registro = item
+            inicio = time.perf_counter_ns()
+            try:
+                sucesso = executar(registro)
+            except Exception:
+                sucesso = False
+            fim = time.perf_counter_ns()
+            with trava:
+                latencias.append(fim - agendado_ns)
+                servicos.append(fim - inicio)
+                if not sucesso:
+                    contagem['erros'] += 1
+
+    workers = [threading.Thread(target=worker, name=f'replay-{i}', daemon=True) for i in range(concorrencia)]
+    for thread in workers:
+        thread.start()
+
+    inicio_ns = time.perf_counter_ns()
+    primeiro = registros[0].get('ts', 0.0) if registros else 0.0
+    atraso_maximo_ns = 0
+    for registro in registros:
+        if velocidade > 0:
+            agendado_ns = inicio_ns + int((registro.get('ts', primeiro) - primeiro) / velocidade * 1e9)
+            espera = (agendado_ns - time.perf_counter_ns()) / 1e9
+            if espera > 0:
+                time.sleep(espera)
+        else:
+            agendado_ns = time.perf_counter_ns()
+        atraso_maximo_ns = max(atraso_maximo_ns, time.perf_counter_ns() - agendado_ns)
+        fila.put((agendado_ns, registro))
+
+    for _ in workers:
+        fila.put(_FIM)
+    for thread in workers:
+        thread.join()
+    duracao = (time.perf_counter_ns() - inicio_ns) / 1e9
+
+    relatorio = {
+        'consultas': len(registros),
+        'erros': contagem['erros'],
+        'velocidade': velocidade,
+        'concorrencia': concorrencia,
+        'duracao_s': round(duracao, 3),
+        'vazao_consultas_s': round(len(registros) / duracao, 1) if duracao else None,
+        'atraso_maximo_despacho_ms': round(atraso_maximo_ns / 1e6, 3),
+    }
+    if latencias:
+        relatorio['latencia'] = resumir(latencias)
+        relatorio['servico'] = resumir(servicos)
+        relatorio['latencia']['p999_ms'] = round(sorted(latencias)[int(len(latencias) * 0.999)] / 1e6, 4)
+    return relatorio
+
+
+def main() -> int:
+    """Executa o replay pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Reproduz um log de consultas do Sistema Vermelinho")
+    parser.add_argument('log', help="Arquivo JSONL gravado por LogConsultas")
+    parser.add_argument('--url', help="Servidor HTTP alvo (sem isso, roda no backend em processo)")
+    parser.add_argument('--velocidade', type=float, default=1.0,
+                        help="Aceleração em relação ao log (1, 10, 100...; 0 = o mais rápido possível)")
+    parser.add_argument('--concorrencia', type=int, default=4, help="Consultas simultâneas")
+    parser.add_argument('--limite', type=int, help="Reproduz só as N primeiras consultas")
+    parser.add_argument('--json', action='store_true', help="Imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    registros = sorted(ler_log(args.log), key=lambda registro: registro.get('ts', 0.0))
+    if args.limite:
+        registros = registros[:args.limite]
+    if not registros:
+        print(f"❌ Nenhuma consulta em {args.log}", file=sys.stderr)
+        return 2
+
+    # Mensagens de carga vão para stderr para não misturar com o JSON
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    criar_executor = executor_http(args.url) if args.url else executor_backend()
+    sys.stdout = stdout
+    relatorio = reproduzir(registros, criar_executor, args.velocidade, args.concorrencia)
+    relatorio['alvo'] = args.url or 'backend'
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+        return 0
+
+    velocidade = f"{args.velocidade:g}x" if args.velocidade > 0 else 'máxima'
+    print(f"🔁 {relatorio['consultas']} consultas contra {relatorio['alvo']} "
+          f"(velocidade {velocidade}, concorrência {args.concorrencia})")
+    print(f"   • Duração: {relatorio['duracao_s']:.2f} s | vazão: {relatorio['vazao_consultas_s']:,.0f} consultas/s "
+          f"| erros: {relatorio['erros']}")
+    latencia, servico = relatorio['latencia'], relatorio['servico']
+    print(f"   • Latência: p50 {latencia['p50_ms']:.2f} ms | p90 {latencia['p90_ms']:.2f} ms | "
+          f"p99 {latencia['p99_ms']:.2f} ms | p99.9 {latencia['p999_ms']:.2f} ms | máx {latencia['max_ms']:.2f} ms")
+    print(f"   • Serviço:  p50 {servico['p50_ms']:.2f} ms | p99 {servico['p99_ms']:.2f} ms")
+    if relatorio['atraso_maximo_despacho_ms'] > 100:
+        print(f"⚠️ Despachante atrasou até {relatorio['atraso_maximo_despacho_ms']:.0f} ms: "
+              f"a fila de workers encheu (alvo saturado ou concorrência baixa)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+🧾 RESULTADO DE ROTA - SISTEMA VERMELINHO
+Busync - Resultado compacto e preguiçoso de calcular_rota
+
+Guarda só o caminho (array de índices), o tempo total e referências à
+rede. Os campos do dicionário de sempre (origem, destino, pontos, status,
+detalhes...) são calculados no primeiro acesso e mantidos em cache. O
+objeto se comporta como um Mapping (``resultado['pontos']``,
+``resultado.get('erro')``, ``'detalhes' in resultado``) e converte para o
+dicionário/JSON completo com para_dict()/para_json().
+
+Salve como: resultado_rota.py
+"""
+
+import json
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Campos na mesma ordem do dicionário que calcular_rota sempre devolveu
+CAMPOS = ('encontrada', 'origem', 'destino', 'pontos', 'tempo_total', 'distancia_estimada',
+          'numero_paradas', 'acessivel', 'linhas_utilizadas', 'status', 'detalhes')
+
+
+class ResultadoRota(Mapping):
+    """Rota encontrada, com detalhes calculados sob demanda"""
+
+    __slots__ = ('_pontos', '_compilado', '_indices', 'tempo_total', 'apenas_acessivel', '_trechos', '_cache')
+
+    def __init__(self, pontos, compilado, indices: List[int], tempo_total: float,
+                 apenas_acessivel: bool = False):
+        """
+        Args:
+            pontos: TabelaPontos da rede (nomes, tipos, linhas)
+            compilado: GrafoCompilado usado na busca (IDs, arestas, acessibilidade)
+            indices: Caminho em índices de pontos
+            tempo_total: Tempo total da rota (min)
+            apenas_acessivel: Se a busca usou o filtro de acessibilidade
+        """
+        self._pontos = pontos
+        self._compilado = compilado
+        self._indices = array('i', indices)
+        self.tempo_total = tempo_total
+        self.apenas_acessivel = apenas_acessivel
+        self._trechos: Optional[List[Optional[Tuple[float, Optional[str]]]]] = None
+        # Campos já calculados e campos extras gravados por quem usa o resultado
+        self._cache: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------- Mapping
+
+    def __getitem__(self, chave: str):
+        cache = self._cache
+        if cache is not None and chave in cache:
+            return cache[chave]
+        if chave not in CAMPOS:
+            raise KeyError(chave)
+        if chave in ('encontrada', 'tempo_total'):
+            return getattr(self, chave)
+        return self._campo(chave, self._cache_campos())
+
+    def _cache_campos(self) -> Dict[str, Any]:
+        if self._cache is None:
+            self._cache = {}
+        return self._cache
+
+    def _campo(self, chave: str, cache: Dict[str, Any]):
+        """
+        Valor de um campo, lendo e gravando em ``cache``
+
+        Campos que dependem de outros (status, detalhes) os buscam no mesmo
+        cache, então cada campo é calculado uma vez por cache.
+        """
+        if chave in cache:
+            return cache[chave]
+        calcular = getattr(self, f'_calcular_{chave}', None)
+        valor = calcular(cache) if calcular is not None else getattr(self, chave)
+        if chave not in ('encontrada', 'tempo_total'):
+            cache[chave] = valor
+        return valor
+
+    def __setitem__(self, chave: str, valor):
+        """Permite anexar campos (ex.: 'consulta' no roteamento em lote)"""
+        self._cache_campos()[chave] = valor
+
+    def __iter__(self) -> Iterator[str]:
+        yield from CAMPOS
+        if self._cache:
+            yield from (chave for chave in self._cache if chave not in CAMPOS)
+
+    def __len__(self) -> int:
+        extras = sum(1 for chave in self._cache if chave not in CAMPOS) if self._cache else 0
+        return len(CAMPOS) + extras
+
+    def __contains__(self, chave) -> bool:
+        return chave in CAMPOS or (self._cache is not None and chave in self._cache)
+
+    def __repr__(self):
+        return (f"<ResultadoRota {self.pontos[0]} → {self.pontos[-1]}: "
+                f"{self.tempo_total:.1f} min, {len(self._indices)} pontos>")
+
+    # -------------------------------------------------------------- campos
+
+    @property
+    def encontrada(self) -> bool:
+        return True
+
+    @property
+    def indices(self) -> array:
+        """Caminho em índices de pontos (sem cópia)"""
+        return self._indices
+
+    @property
+    def pontos(self) -> List[str]:
+        """IDs dos pontos do caminho"""
+        return [self._compilado.id_do_indice(indice) for indice in self._indices]
+
+    @property
+    def origem(self) -> str:
+        return self._pontos.vista(self._indices[0]).nome
+
+    @property
+    def destino(self) -> str:
+        return self._pontos.vista(self._indices[-1]).nome
+
+    @property
+    def distancia_estimada(self) -> float:
+        return self.tempo_total * 0.42  # Estimativa: 25 km/h média
+
+    @property
+    def numero_paradas(self) -> int:
+        # Excluir origem e destino (a rota de um ponto só, já no destino, tem 0)
+        return max(0, len(self._indices) - 2)
+
+    @property
+    def acessivel(self) -> bool:
+        """Se todos os pontos da rota são acessíveis"""
+        return self._compilado.caminho_acessivel(self._indices)
+
+    def _segmentos(self) -> List[Optional[Tuple[float, Optional[str]]]]:
+        """(peso, linha) de cada trecho, calculado uma vez"""
+        if self._trechos is None:
+            self._trechos = self._compilado.segmentos(self._indices)
+        return self._trechos
+
+    @property
+    def linhas_utilizadas(self) -> List[str]:
+        """Linhas usadas, na ordem em que aparecem na rota"""
+        return list(dict.fromkeys(linha for _, linha in filter(None, self._segmentos()) if linha))
+
+    @property
+    def status(self) -> str:
+        return self._calcular_status(self._cache_campos())
+
+    def _calcular_status(self, cache: Dict[str, Any]) -> str:
+        if self._campo('acessivel', cache):
+            status = "✅ Rota totalmente acessível"
+        elif self.apenas_acessivel:
+            status = "✅ Rota com filtro de acessibilidade"
+        else:
+            status = "⚠️ Rota com pontos não acessíveis"
+
+        linhas = self._campo('linhas_utilizadas', cache)
+        if linhas:
+            status += f" | 🚌 Linhas: {', '.join(sorted(linhas))}"
+        return status
+
+    @property
+    def detalhes(self) -> dict:
+        """Detalhes por ponto e por trecho (o antigo _obter_detalhes_rota)"""
+        return self._calcular_detalhes(self._cache_campos())
+
+    def _calcular_detalhes(self, cache: Dict[str, Any]) -> dict:
+        detalhes = {
+            'pontos_detalhados': [],
+            'tempos_segmentos': [],
+            'tipos_pontos': {},
+            'coordenadas': [],
+            'linhas_por_segmento': []
+        }
+        pontos = self._pontos
+        ids = self._campo('pontos', cache)
+
+        for posicao, indice in enumerate(self._indices):
+            ponto = pontos.vista(indice)
+            detalhes['pontos_detalhados'].append({
+                'id': ids[posicao],
+                'nome': ponto.nome,
+                'endereco': ponto.endereco,
+                'posicao': posicao + 1,
+                'acessivel': ponto.acessivel,
+                'tipo': ponto.tipo,
+                'linhas_disponiveis': ponto.linhas
+            })
+            detalhes['coordenadas'].append({
+                'lat': ponto.latitude,
+                'lng': ponto.longitude
+            })
+            detalhes['tipos_pontos'][ponto.tipo] = detalhes['tipos_pontos'].get(ponto.tipo, 0) + 1
+
+        for segmento in self._segmentos():
+            if segmento is not None:
+                detalhes['tempos_segmentos'].append(segmento[0])
+                detalhes['linhas_por_segmento'].append(segmento[1] or 'Integração')
+
+        return detalhes
+
+    # ---------------------------------------------------------- conversão
+
+    def para_dict(self) -> dict:
+        """Dicionário completo, no formato histórico de calcular_rota"""
+        # Cache local: campos usados por outros (pontos, acessivel...) são
+        # calculados uma vez, sem ficarem presos ao objeto nem alterá-lo
+        # (vários threads podem serializar o mesmo resultado)
+        cache = dict(self._cache) if self._cache else {}
+        chaves = list(CAMPOS) + [chave for chave in cache if chave not in CAMPOS]
+        return {chave: self._campo(chave, cache) for chave in chaves}
+
+    def para_json(self, **opcoes) -> str:
+        """JSON completo (UTF-8 legível por padrão)"""
+        opcoes.setdefault('ensure_ascii', False)
+        return json.dumps(self.para_dict(), default=serializar_json, **opcoes)
+
+
+def serializar_json(objeto):
+    """
+    Hook ``default`` de json.dumps para resultados de rota e números/arrays do NumPy
+
+    Raises:
+        TypeError: Para qualquer outro tipo (como espera json.dumps), em vez
+            de gravar uma representação em texto sem sentido
+    """
+    if isinstance(objeto, ResultadoRota):
+        return objeto.para_dict()
+    if isinstance(objeto, (np.generic, np.ndarray, array)):
+        return objeto.tolist()
+    raise TypeError(f"Objeto do tipo {type(objeto).__name__} não é serializável em JSON")
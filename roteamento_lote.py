@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+📦 ROTEAMENTO EM LOTE - SISTEMA VERMELINHO
+Busync - Consultas origem-destino em massa, sem interface gráfica
+
+Lê pares origem-destino de um CSV (ou da entrada padrão) e escreve uma
+linha JSON por consulta, no mesmo formato de SistemaVermelhinho.calcular_rota
+acrescido do campo ``consulta``. A entrada é processada em lotes: dentro
+de cada lote as consultas com a mesma origem viram uma única busca de
+Dijkstra para vários destinos. A memória não depende do tamanho da entrada.
+
+Formatos de CSV aceitos (cabeçalho opcional; ``acessivel`` é opcional):
+    origem,destino,acessivel
+    origem_lat,origem_lon,destino_lat,destino_lon,acessivel
+Uma coluna ``id`` no cabeçalho é repetida no campo ``consulta``; sem ela,
+``consulta`` é o número da linha de dados. Coordenadas a mais de
+``--distancia-maxima`` km de qualquer ponto (fora da área da rede) geram
+a linha de erro "Pontos não encontrados".
+
+Exemplos:
+    python roteamento_lote.py consultas.csv -o rotas.jsonl
+    cat consultas.csv | python roteamento_lote.py --workers 4 > rotas.jsonl
+
+Salve como: roteamento_lote.py
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from indice_espacial import DISTANCIA_MAXIMA_KM
+from perfilador import instalar_sinal
+from resultado_rota import serializar_json
+from sistema_backend import SistemaVermelhinho
+
+# Consultas por lote (cada lote é roteado e escrito antes do próximo)
+TAMANHO_LOTE_PADRAO = 2000
+
+# Lotes em andamento por worker (limita a memória com workers lentos)
+LOTES_POR_WORKER = 2
+
+VALORES_VERDADEIROS = {'1', 'true', 'sim', 's', 'yes', 'x'}
+
+COLUNAS_ID = ('origem', 'destino')
+COLUNAS_COORDENADAS = ('origem_lat', 'origem_lon', 'destino_lat', 'destino_lon')
+
+
+@dataclass
+class Consulta:
+    """Uma linha da entrada, já resolvida para índices do grafo"""
+    consulta: str
+    origem: Optional[int]
+    destino: Optional[int]
+    acessivel: bool
+    erro: Optional[str] = None
+
+
+class LeitorConsultas:
+    """Lê o CSV de consultas linha a linha, detectando o formato"""
+
+    def __init__(self, arquivo, sistema: SistemaVermelhinho, distancia_maxima_km: float = DISTANCIA_MAXIMA_KM):
+        """
+        Args:
+            arquivo: Arquivo de texto aberto (ou sys.stdin)
+            sistema: Sistema usado para resolver IDs e coordenadas
+            distancia_maxima_km: Distância máxima de uma coordenada ao ponto
+                associado a ela
+        """
+        self._linhas = csv.reader(arquivo)
+        self.sistema = sistema
+        self.distancia_maxima_km = distancia_maxima_km
+        self._grade = None
+        self._mascara_acessivel = None
+        self._colunas: Optional[Dict[str, int]] = None
+        self._numero = 0
+
+    def _grade_espacial(self):
+        """Índice espacial criado só se houver consultas por coordenada"""
+        if self._grade is None:
+            from indice_espacial import GradeEspacial
+            compilado = self.sistema.compilar()
+            self._grade = GradeEspacial(compilado.latitudes, compilado.longitudes)
+            self._mascara_acessivel = compilado.acessivel.astype(bool)
+        return self._grade
+
+    def _detectar_colunas(self, primeira: List[str]) -> bool:
+        """
+        Define o mapa de colunas a partir da primeira linha
+
+        Returns:
+            True se a primeira linha era cabeçalho
+        """
+        nomes = [campo.strip().lower() for campo in primeira]
+        if all(coluna in nomes for coluna in COLUNAS_COORDENADAS) or all(coluna in nomes for coluna in COLUNAS_ID):
+            self._colunas = {nome: posicao for posicao, nome in enumerate(nomes)}
+            return True
+
+        # Sem cabeçalho: 4 ou 5 colunas numéricas são coordenadas
+        try:
+            [float(campo) for campo in primeira[:4]]
+            coordenadas = len(primeira) >= 4
+        except ValueError:
+            coordenadas = False
+        ordem = COLUNAS_COORDENADAS if coordenadas else COLUNAS_ID
+        self._colunas = {nome: posicao for posicao, nome in enumerate(ordem + ('acessivel',))}
+        return False
+
+    def _resolver(self, linha: List[str]) -> Consulta:
+        """Converte uma linha do CSV em Consulta (IDs ou ponto mais próximo)"""
+        colunas = self._colunas
+
+        def campo(nome: str) -> str:
+            posicao = colunas.get(nome)
+            return linha[posicao].strip() if posicao is not None and posicao < len(linha) else ''
+
+        self._numero += 1
+        consulta = campo('id') or str(self._numero)
+        acessivel = campo('acessivel').lower() in VALORES_VERDADEIROS
+
+        if 'origem_lat' in colunas:
+            try:
+                coordenadas = [float(campo(nome)) for nome in COLUNAS_COORDENADAS]
+            except ValueError:
+                return Consulta(consulta, None, None, acessivel, "Coordenadas inválidas")
+            grade = self._grade_espacial()
+            mascara = self._mascara_acessivel if acessivel else None
+            origem = grade.mais_proximo(coordenadas[0], coordenadas[1], mascara, self.distancia_maxima_km)
+            destino = grade.mais_proximo(coordenadas[2], coordenadas[3], mascara, self.distancia_maxima_km)
+            if origem is None or destino is None:
+                return Consulta(consulta, None, None, acessivel, "Pontos não encontrados")
+            origem_id = self.sistema.pontos.id_do_indice(origem[0])
+            destino_id = self.sistema.pontos.id_do_indice(destino[0])
+        else:
+            origem_id, destino_id = campo('origem'), campo('destino')
+
+        erro = self.sistema.validar_consulta(origem_id, destino_id, acessivel)
+        if erro:
+            return Consulta(consulta, None, None, acessivel, erro)
+        return Consulta(consulta, self.sistema.pontos.indice(origem_id),
+                        self.sistema.pontos.indice(destino_id), acessivel)
+
+    def __iter__(self) -> Iterator[Consulta]:
+        for linha in self._linhas:
+            if not linha or not any(campo.strip() for campo in linha):
+                continue
+            if self._colunas is None and self._detectar_colunas(linha):
+                continue
+            yield self._resolver(linha)
+
+
+def agrupar_por_origem(consultas: List[Consulta]) -> List[Tuple[int, bool, List[int]]]:
+    """Agrupa as consultas válidas de um lote em (origem, acessível, destinos)"""
+    grupos: Dict[Tuple[int, bool], List[int]] = {}
+    for consulta in consultas:
+        if consulta.erro is None:
+            grupos.setdefault((consulta.origem, consulta.acessivel), []).append(consulta.destino)
+    return [(origem, acessivel, destinos) for (origem, acessivel), destinos in grupos.items()]
+
+
+def rotear_grupos(grafo, grupos: List[Tuple[int, bool, List[int]]]) -> Dict[Tuple[int, bool, int], Optional[Tuple[List[int], float]]]:
+    """
+    Uma busca de Dijkstra por origem, para todos os destinos do grupo
+
+    Returns:
+        Resultado de cada (origem, acessível, destino)
+    """
+    resultados = {}
+    for origem, acessivel, destinos in grupos:
+        for destino, busca in grafo.menores_caminhos(origem, destinos, acessivel).items():
+            resultados[(origem, acessivel, destino)] = busca
+    return resultados
+
+
+def _rotear_no_worker(grupos):
+    """Tarefa dos workers: usa o grafo anexado da memória compartilhada"""
+    from memoria_compartilhada import grafo_do_worker
+    return rotear_grupos(grafo_do_worker(), grupos)
+
+
+class RoteadorLote:
+    """Roteia lotes de consultas no processo atual ou em um Pool de workers"""
+
+    def __init__(self, sistema: SistemaVermelhinho, saida, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 workers: int = 0):
+        """
+        Args:
+            sistema: Sistema com a rede carregada
+            saida: Arquivo de texto onde as linhas JSON são escritas
+            tamanho_lote: Consultas por lote
+            workers: Processos de roteamento (0 roteia no processo atual)
+        """
+        self.sistema = sistema
+        self.saida = saida
+        self.tamanho_lote = tamanho_lote
+        self.workers = workers
+        self.estatisticas = {'consultas': 0, 'encontradas': 0, 'erros': 0, 'buscas': 0}
+
+    def _escrever(self, lote: List[Consulta], resultados: Dict):
+        """Formata os resultados no formato de calcular_rota, na ordem da entrada"""
+        for consulta in lote:
+            if consulta.erro is not None:
+                resultado = self.sistema.resultado_erro(consulta.erro)
+            else:
+                busca = resultados[(consulta.origem, consulta.acessivel, consulta.destino)]
+                resultado = self.sistema.resultado_da_busca(busca, consulta.acessivel)
+            resultado['consulta'] = consulta.consulta
+            self.saida.write(json.dumps(resultado, ensure_ascii=False, default=serializar_json))
+            self.saida.write('\n')
+
+            self.estatisticas['consultas'] += 1
+            self.estatisticas['encontradas' if resultado['encontrada'] else 'erros'] += 1
+
+    def _lotes(self, consultas: Iterator[Consulta]) -> Iterator[List[Consulta]]:
+        while True:
+            lote = list(islice(consultas, self.tamanho_lote))
+            if not lote:
+                return
+            yield lote
+
+    def executar(self, consultas: Iterator[Consulta]):
+        """Roteia e escreve todas as consultas"""
+        if self.workers > 0:
+            self._executar_em_workers(consultas)
+            return
+
+        grafo = self.sistema.compilar()
+        for lote in self._lotes(consultas):
+            grupos = agrupar_por_origem(lote)
+            self.estatisticas['buscas'] += len(grupos)
+            self._escrever(lote, rotear_grupos(grafo, grupos))
+
+    def _executar_em_workers(self, consultas: Iterator[Consulta]):
+        """
+        Distribui os lotes entre workers anexados à memória compartilhada
+
+        No máximo workers * LOTES_POR_WORKER lotes ficam em andamento; a
+        saída é escrita na ordem da entrada à medida que os lotes terminam.
+        """
+        from multiprocessing import Pool
+
+        from memoria_compartilhada import RedeCompartilhada, inicializar_worker
+
+        limite = self.workers * LOTES_POR_WORKER
+        with RedeCompartilhada(self.sistema.compilar()) as rede:
+            with Pool(self.workers, initializer=inicializar_worker, initargs=(rede.descritor,)) as pool:
+                pendentes = deque()
+                for lote in self._lotes(consultas):
+                    grupos = agrupar_por_origem(lote)
+                    self.estatisticas['buscas'] += len(grupos)
+                    pendentes.append((lote, pool.apply_async(_rotear_no_worker, (grupos,))))
+                    if len(pendentes) >= limite:
+                        lote_pronto, tarefa = pendentes.popleft()
+                        self._escrever(lote_pronto, tarefa.get())
+                while pendentes:
+                    lote_pronto, tarefa = pendentes.popleft()
+                    self._escrever(lote_pronto, tarefa.get())
+
+
+def carregar_sistema(args) -> SistemaVermelhinho:
+    """Carrega a rede escolhida na linha de comando"""
+    if args.gtfs:
+        from importador_gtfs import importar_gtfs
+        return importar_gtfs(args.gtfs)
+    if args.sintetica:
+        from gerador_rede import gerar_rede_sintetica
+        return gerar_rede_sintetica(args.sintetica)
+    return SistemaVermelhinho()
+
+
+def main() -> int:
+    """Executa o roteamento em lote pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Roteamento em lote: CSV de consultas → JSONL de rotas")
+    parser.add_argument('entrada', nargs='?', default='-', help="CSV de consultas ('-' para entrada padrão)")
+    parser.add_argument('-o', '--saida', default='-', help="Arquivo JSONL de saída ('-' para saída padrão)")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO, help="Consultas por lote")
+    parser.add_argument('--workers', type=int, default=0, help="Processos de roteamento (0 = processo atual)")
+    parser.add_argument('--gtfs', help="Carrega a rede de um feed GTFS (diretório ou .zip)")
+    parser.add_argument('--sintetica', type=int, help="Usa uma rede sintética com N pontos")
+    parser.add_argument('--distancia-maxima', type=float, default=DISTANCIA_MAXIMA_KM,
+                        help="Distância máxima (km) entre uma coordenada e o ponto associado a ela")
+    args = parser.parse_args()
+    # kill -USR2 <pid> grava um perfil das pilhas de roteamento (ver perfilador.py)
+    instalar_sinal()
+
+    # Mensagens de carga vão para stderr para não misturar com o JSONL
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    sistema = carregar_sistema(args)
+    sys.stdout = stdout
+
+    entrada = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='') if args.entrada == '-' \
+        else open(args.entrada, encoding='utf-8-sig', newline='')
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8', buffering=1 << 16)
+
+    inicio = time.perf_counter()
+    roteador = RoteadorLote(sistema, saida, args.lote, args.workers)
+    try:
+        roteador.executar(iter(LeitorConsultas(entrada, sistema, args.distancia_maxima)))
+    except BrokenPipeError:
+        # Leitor da saída fechou (ex.: "| head"): o flush final vai para /dev/null
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        saida.flush()
+        if saida is not sys.stdout:
+            saida.close()
+        if args.entrada != '-':
+            entrada.close()
+
+    duracao = time.perf_counter() - inicio
+    estatisticas = roteador.estatisticas
+    print(f"✅ {estatisticas['consultas']} consultas ({estatisticas['encontradas']} rotas, "
+          f"{estatisticas['erros']} erros, {estatisticas['buscas']} buscas) em {duracao:.2f}s "
+          f"({estatisticas['consultas'] / max(duracao, 1e-9):.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
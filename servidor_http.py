@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+🌐 SERVIDOR HTTP DE ROTAS - SISTEMA VERMELINHO
+Busync - Serviço JSON assíncrono para quiosques e backend mobile
+
+Uma única rede carregada atende todas as conexões. As buscas rodam em um
+executor para não travar o loop de eventos, e requisições idênticas que
+chegam enquanto a primeira ainda está em cálculo aguardam o mesmo resultado.
+
+Endpoints (GET, respostas em JSON):
+    /rota?origem=RODOVIARIA&destino=PRACA_PONTA_NEGRA&acessivel=1
+    /mais_proximo?origem=PRACA_PONTA_NEGRA&tipo=terminal&acessivel=1
+    /estatisticas
+    /linhas/<linha_id>
+    /pontos/<ponto_id>/linhas
+    /saude
+    /metrics        (formato texto do Prometheus)
+    /perfil?segundos=10   (inicia um perfil por amostragem; ver perfilador.py)
+
+Salve como: servidor_http.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import perfilador
+from metricas import TIPO_CONTEUDO as TIPO_PROMETHEUS
+from resultado_rota import serializar_json
+from sistema_backend import SistemaVermelhinho
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8080
+
+# Conexões keep-alive sem atividade são encerradas após este tempo (s)
+TEMPO_OCIOSO = 15.0
+
+# Tamanho máximo do corpo aceito em uma requisição
+TAMANHO_MAXIMO_CORPO = 64 * 1024
+
+VALORES_VERDADEIROS = {'1', 'true', 'sim', 's', 'yes'}
+
+TIPO_JSON = 'application/json; charset=utf-8'
+
+# Duração máxima de um perfil pedido por /perfil (s)
+DURACAO_MAXIMA_PERFIL = 60.0
+
+
+class ErroHTTP(Exception):
+    """Erro que vira uma resposta HTTP com o status indicado"""
+
+    def __init__(self, status: HTTPStatus, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+class ServidorRotas:
+    """Servidor HTTP/1.1 (keep-alive) sobre asyncio para o SistemaVermelhinho"""
+
+    def __init__(self, sistema: Optional[SistemaVermelhinho] = None,
+                 host: str = HOST_PADRAO, porta: int = PORTA_PADRAO,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            sistema: Rede já carregada (se None, carrega a rede padrão)
+            host: Endereço de escuta
+            porta: Porta de escuta (0 escolhe uma porta livre)
+            max_workers: Threads do executor de buscas
+        """
+        self.sistema = sistema or SistemaVermelhinho()
+        self.host = host
+        self.porta = porta
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4),
+                                            thread_name_prefix='rotas')
+        # Buscas em andamento, por chave da requisição
+        self._em_andamento: Dict[Tuple, asyncio.Future] = {}
+        self._estatisticas: Optional[bytes] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self.contadores = {'requisicoes': 0, 'buscas': 0, 'coalescidas': 0, 'conexoes': 0}
+
+    # ------------------------------------------------------------- execução
+
+    async def _executar(self, chave: Tuple, funcao: Callable, *args):
+        """
+        Executa funcao(*args) no executor, reaproveitando uma execução
+        idêntica que ainda esteja em andamento
+        """
+        futuro = self._em_andamento.get(chave)
+        self._registrar_cache('busca_em_andamento', futuro is not None)
+        if futuro is not None:
+            self.contadores['coalescidas'] += 1
+            return await asyncio.shield(futuro)
+
+        loop = asyncio.get_running_loop()
+        futuro = loop.run_in_executor(self._executor, funcao, *args)
+        self._em_andamento[chave] = futuro
+        futuro.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        self.contadores['buscas'] += 1
+        return await asyncio.shield(futuro)
+
+    def _registrar_cache(self, cache: str, acerto: bool):
+        if self.sistema.metricas is not None:
+            self.sistema.metricas.registrar_cache(cache, acerto)
+
+    # ------------------------------------------------------------ endpoints
+
+    async def _rota(self, parametros: Dict[str, str]) -> Dict:
+        """GET /rota"""
+        origem = parametros.get('origem')
+        destino = parametros.get('destino')
+        if not origem or not destino:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Informe 'origem' e 'destino'")
+        acessivel = parametros.get('acessivel', '').lower() in VALORES_VERDADEIROS
+        return await self._executar(('rota', origem, destino, acessivel),
+                                    self.sistema.calcular_rota, origem, destino, acessivel)
+
+    async def _mais_proximo(self, parametros: Dict[str, str]) -> Dict:
+        """GET /mais_proximo (rota até o ponto do tipo mais próximo)"""
+        origem = parametros.get('origem')
+        tipo = parametros.get('tipo')
+        if not origem or not tipo:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Informe 'origem' e 'tipo'")
+        acessivel = parametros.get('acessivel', '').lower() in VALORES_VERDADEIROS
+        return await self._executar(('mais_proximo', origem, tipo, acessivel),
+                                    self.sistema.ponto_mais_proximo_por_tipo, origem, tipo, acessivel)
+
+    async def _estatisticas_json(self) -> bytes:
+        """GET /estatisticas (a rede não muda, então o JSON é calculado uma vez)"""
+        self._registrar_cache('estatisticas', self._estatisticas is not None)
+        if self._estatisticas is None:
+            estatisticas = await self._executar(('estatisticas',), self.sistema.obter_estatisticas)
+            self._estatisticas = self._codificar(estatisticas)
+        return self._estatisticas
+
+    async def _linha(self, linha_id: str) -> Dict:
+        """GET /linhas/<linha_id>"""
+        informacoes = self.sistema.obter_informacoes_linha(linha_id)
+        if 'erro' in informacoes:
+            raise ErroHTTP(HTTPStatus.NOT_FOUND, informacoes['erro'])
+        return informacoes
+
+    async def _linhas_do_ponto(self, ponto_id: str) -> Dict:
+        """GET /pontos/<ponto_id>/linhas"""
+        if ponto_id not in self.sistema.pontos:
+            raise ErroHTTP(HTTPStatus.NOT_FOUND, "Ponto não encontrado")
+        return {'ponto': ponto_id, 'linhas': self.sistema.buscar_linhas_por_ponto(ponto_id)}
+
+    def _metricas(self) -> bytes:
+        """GET /metrics"""
+        if self.sistema.metricas is None:
+            raise ErroHTTP(HTTPStatus.NOT_FOUND, "Métricas desligadas")
+        return self.sistema.metricas.registro.exportar().encode('utf-8')
+
+    def _perfil(self, parametros: Dict[str, str]) -> Dict:
+        """GET /perfil?segundos=N (a captura segue em fundo; a resposta não espera)"""
+        try:
+            segundos = float(parametros.get('segundos', perfilador.DURACAO_PADRAO))
+        except ValueError:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "'segundos' deve ser um número")
+        if not 0 < segundos <= DURACAO_MAXIMA_PERFIL:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, f"'segundos' deve estar entre 0 e {DURACAO_MAXIMA_PERFIL:g}")
+        caminho = perfilador.caminho_padrao()
+        if not perfilador.perfilar(segundos, caminho):
+            raise ErroHTTP(HTTPStatus.CONFLICT, "Já há um perfil em andamento")
+        return {'arquivo': caminho, 'segundos': segundos, 'pid': os.getpid()}
+
+    async def _despachar(self, metodo: str, alvo: str) -> Tuple[bytes, str]:
+        """Encaminha a requisição para o endpoint e devolve (corpo, Content-Type)"""
+        if metodo not in ('GET', 'HEAD'):
+            raise ErroHTTP(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET")
+
+        url = urlsplit(alvo)
+        partes = [unquote(parte) for parte in url.path.strip('/').split('/') if parte]
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+
+        if partes == ['rota']:
+            return self._codificar(await self._rota(parametros)), TIPO_JSON
+        if partes == ['mais_proximo']:
+            return self._codificar(await self._mais_proximo(parametros)), TIPO_JSON
+        if partes == ['estatisticas']:
+            return await self._estatisticas_json(), TIPO_JSON
+        if len(partes) == 2 and partes[0] == 'linhas':
+            return self._codificar(await self._linha(partes[1])), TIPO_JSON
+        if len(partes) == 3 and partes[0] == 'pontos' and partes[2] == 'linhas':
+            return self._codificar(await self._linhas_do_ponto(partes[1])), TIPO_JSON
+        if partes == ['saude']:
+            return self._codificar({'status': 'ok', **self.contadores}), TIPO_JSON
+        if partes == ['metrics']:
+            return self._metricas(), TIPO_PROMETHEUS
+        if partes == ['perfil']:
+            return self._codificar(self._perfil(parametros)), TIPO_JSON
+        raise ErroHTTP(HTTPStatus.NOT_FOUND, "Endpoint não encontrado")
+
+    # ------------------------------------------------------------- protocolo
+
+    @staticmethod
+    def _codificar(dados) -> bytes:
+        """Serializa a resposta em JSON UTF-8"""
+        return json.dumps(dados, ensure_ascii=False, default=serializar_json).encode('utf-8')
+
+    @staticmethod
+    def _resposta(status: HTTPStatus, corpo: bytes, manter_conexao: bool, incluir_corpo: bool = True,
+                  tipo: str = TIPO_JSON) -> bytes:
+        """Monta a resposta HTTP/1.1 completa"""
+        cabecalho = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        return cabecalho + corpo if incluir_corpo else cabecalho
+
+    @staticmethod
+    async def _ler_linha(reader: asyncio.StreamReader) -> bytes:
+        """Uma linha da requisição; linhas acima do limite do StreamReader viram 400"""
+        try:
+            return await reader.readline()
+        except ValueError:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Linha de requisição ou cabeçalho muito longo")
+
+    async def _ler_requisicao(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        """
+        Lê linha de requisição, cabeçalhos e corpo
+
+        Returns:
+            (método, alvo, versão, cabeçalhos) ou None se o cliente fechou
+        """
+        linha = await asyncio.wait_for(self._ler_linha(reader), TEMPO_OCIOSO)
+        if not linha:
+            return None
+        try:
+            metodo, alvo, versao = linha.decode('latin-1').split()
+        except ValueError:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Linha de requisição inválida")
+
+        cabecalhos = {}
+        while True:
+            linha = await self._ler_linha(reader)
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        # Corpo é descartado (todos os endpoints são GET), mas precisa ser lido
+        try:
+            tamanho = int(cabecalhos.get('content-length', 0) or 0)
+        except ValueError:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if tamanho < 0:
+            raise ErroHTTP(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ErroHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corpo muito grande")
+        if tamanho:
+            await reader.readexactly(tamanho)
+
+        return metodo.upper(), alvo, versao, cabecalhos
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão, processando requisições em sequência (keep-alive)"""
+        self.contadores['conexoes'] += 1
+        try:
+            while True:
+                try:
+                    requisicao = await self._ler_requisicao(reader)
+                except ErroHTTP as erro:
+                    writer.write(self._resposta(erro.status, self._codificar({'erro': erro.mensagem}), False))
+                    break
+                if requisicao is None:
+                    break
+
+                metodo, alvo, versao, cabecalhos = requisicao
+                conexao = cabecalhos.get('connection', '').lower()
+                manter_conexao = conexao != 'close' and (versao == 'HTTP/1.1' or conexao == 'keep-alive')
+                self.contadores['requisicoes'] += 1
+
+                tipo = TIPO_JSON
+                try:
+                    status, (corpo, tipo) = HTTPStatus.OK, await self._despachar(metodo, alvo)
+                except ErroHTTP as erro:
+                    status, corpo = erro.status, self._codificar({'erro': erro.mensagem})
+                except Exception as erro:
+                    status, corpo = HTTPStatus.INTERNAL_SERVER_ERROR, self._codificar({'erro': str(erro)})
+
+                writer.write(self._resposta(status, corpo, manter_conexao, metodo != 'HEAD', tipo))
+                await writer.drain()
+                if not manter_conexao:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    # ------------------------------------------------------------- ciclo de vida
+
+    def preaquecer(self):
+        """
+        Compila a rede e calcula as estatísticas antes de atender
+
+        Feito de forma síncrona (sem o executor) para poder rodar no processo
+        pai do servidor pré-fork, antes de qualquer thread existir.
+        """
+        self.sistema.compilar()
+        if self._estatisticas is None:
+            self._estatisticas = self._codificar(self.sistema.obter_estatisticas())
+
+    async def iniciar(self, sock: Optional[socket.socket] = None) -> asyncio.AbstractServer:
+        """
+        Abre o socket de escuta e retorna o servidor asyncio
+
+        Args:
+            sock: Socket já em escuta (compartilhado entre processos no modo pré-fork)
+        """
+        if sock is not None:
+            self._servidor = await asyncio.start_server(self._atender, sock=sock)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, self.host, self.porta,
+                                                        reuse_address=True, backlog=1024)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        return self._servidor
+
+    async def servir(self, sock: Optional[socket.socket] = None):
+        """Atende requisições até ser cancelado"""
+        if self._servidor is None:
+            await self.iniciar(sock)
+        print(f"🌐 Servidor de rotas em http://{self.host}:{self.porta} (pid {os.getpid()})")
+        try:
+            async with self._servidor:
+                await self._servidor.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    """Inicia o servidor pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de rotas do Vermelinho")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--workers', type=int, default=None, help="Threads do executor de buscas")
+    parser.add_argument('--gtfs', help="Carrega a rede de um feed GTFS (diretório ou .zip)")
+    parser.add_argument('--log-consultas', help="Registra cada consulta neste arquivo JSONL (para replay)")
+    args = parser.parse_args()
+
+    sistema = None
+    if args.gtfs:
+        from importador_gtfs import importar_gtfs
+        sistema = importar_gtfs(args.gtfs)
+
+    servidor = ServidorRotas(sistema, args.host, args.porta, args.workers)
+    perfilador.instalar_sinal()
+    if args.log_consultas:
+        from log_consultas import LogConsultas
+        servidor.sistema.log_consultas = LogConsultas(args.log_consultas)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado")
+    finally:
+        if servidor.sistema.log_consultas is not None:
+            servidor.sistema.log_consultas.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+🍴 SERVIDOR PRÉ-FORK - SISTEMA VERMELINHO
+Busync - Vários processos atendendo a mesma rede por copy-on-write
+
+O processo pai carrega a rede uma única vez, compila o grafo em arrays
+planos (grafo_compilado), calcula as estatísticas, congela o coletor de
+lixo (gc.freeze) e só então cria os workers com os.fork. Os workers
+herdam o socket de escuta e as páginas da rede sem copiá-las: a busca lê
+apenas buffers NumPy, então as páginas continuam compartilhadas e a
+memória total fica perto de 1x o tamanho da rede. Cada worker roda o
+ServidorRotas (servidor_http) em um núcleo.
+
+Disponível apenas em sistemas com os.fork (Linux, macOS).
+
+Salve como: servidor_prefork.py
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+from perfilador import instalar_sinal
+from servidor_http import HOST_PADRAO, PORTA_PADRAO, ServidorRotas
+from sistema_backend import SistemaVermelhinho
+
+# Threads de busca em cada worker (o paralelismo real vem dos processos)
+THREADS_POR_WORKER = 4
+
+# Intervalo mínimo entre reinícios de um worker que morreu (s)
+INTERVALO_REINICIO = 1.0
+
+
+def memoria_processo(pid: int) -> Dict[str, int]:
+    """
+    Lê o uso de memória de um processo em /proc/<pid>/smaps_rollup
+
+    Returns:
+        Dicionário em kB com rss, pss, compartilhada e privada_suja
+        (vazio se o sistema não expõe smaps_rollup)
+    """
+    campos = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'compartilhada',
+              'Shared_Dirty': 'compartilhada', 'Private_Dirty': 'privada_suja'}
+    memoria = {'rss': 0, 'pss': 0, 'compartilhada': 0, 'privada_suja': 0}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as arquivo:
+            for linha in arquivo:
+                nome, _, valor = linha.partition(':')
+                if nome in campos:
+                    memoria[campos[nome]] += int(valor.split()[0])
+    except OSError:
+        return {}
+    return memoria
+
+
+class ServidorPreFork:
+    """Processo pai que prepara a rede e supervisiona N workers"""
+
+    def __init__(self, sistema: SistemaVermelhinho, host: str = HOST_PADRAO,
+                 porta: int = PORTA_PADRAO, workers: Optional[int] = None,
+                 threads_por_worker: int = THREADS_POR_WORKER):
+        """
+        Args:
+            sistema: Rede carregada (compartilhada com todos os workers)
+            host: Endereço de escuta
+            porta: Porta de escuta (0 escolhe uma porta livre)
+            workers: Número de processos (padrão: um por núcleo)
+            threads_por_worker: Threads do executor de buscas em cada worker
+        """
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("O modo pré-fork exige os.fork (Linux/macOS)")
+
+        self.sistema = sistema
+        self.host = host
+        self.porta = porta
+        self.total_workers = workers or os.cpu_count() or 1
+        self.threads_por_worker = threads_por_worker
+        self.workers: List[int] = []
+        self._socket: Optional[socket.socket] = None
+        self._servidor: Optional[ServidorRotas] = None
+        self._encerrando = False
+
+    def preparar(self):
+        """Abre o socket, compila a rede e congela o GC antes do fork"""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.porta))
+        self._socket.listen(1024)
+        self._socket.setblocking(False)
+        self.porta = self._socket.getsockname()[1]
+
+        self._servidor = ServidorRotas(self.sistema, self.host, self.porta, self.threads_por_worker)
+        self._servidor.preaquecer()
+
+        # Objetos congelados não são percorridos pelo GC nos workers, então
+        # seus cabeçalhos não são escritos e as páginas seguem compartilhadas
+        gc.collect()
+        gc.freeze()
+
+    def _iniciar_worker(self) -> int:
+        """Cria um worker; no filho, atende requisições até receber SIGTERM"""
+        pid = os.fork()
+        if pid:
+            return pid
+
+        # Processo filho: os manipuladores do pai foram herdados. Sem a lista
+        # de workers, um sinal que chegue antes da troca não é repassado
+        self.workers = []
+        # Ctrl+C é tratado pelo pai, que repassa SIGTERM
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if hasattr(signal, 'SIGUSR1'):
+            # O relatório de memória é do pai; no worker o sinal é ignorado
+            signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        instalar_sinal()
+        codigo = 0
+        try:
+            asyncio.run(self._servidor.servir(self._socket))
+        except Exception as erro:
+            print(f"❌ Worker {os.getpid()} falhou: {erro}", file=sys.stderr)
+            codigo = 1
+        finally:
+            os._exit(codigo)
+
+    def relatorio_memoria(self) -> Dict[int, Dict[str, int]]:
+        """Memória do pai e de cada worker (kB)"""
+        return {pid: memoria_processo(pid) for pid in [os.getpid()] + self.workers}
+
+    def _imprimir_memoria(self, *_):
+        """Imprime o relatório de memória (acionado por SIGUSR1)"""
+        relatorio = self.relatorio_memoria()
+        print("📊 Memória (kB): pid | rss | pss | privada suja")
+        for pid, memoria in relatorio.items():
+            if memoria:
+                print(f"   • {pid:>7} | {memoria['rss']:>8} | {memoria['pss']:>8} | {memoria['privada_suja']:>8}")
+        print(f"   • PSS total: {sum(m.get('pss', 0) for m in relatorio.values()):,} kB")
+
+    def _repassar_perfil(self, *_):
+        """Pede um perfil a cada worker (acionado por SIGUSR2; um .folded por pid)"""
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGUSR2)
+            except ProcessLookupError:
+                pass
+
+    def _encerrar(self, *_):
+        """Pede o encerramento dos workers"""
+        self._encerrando = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def executar(self):
+        """Prepara a rede, cria os workers e os reinicia se morrerem"""
+        self.preparar()
+
+        # Manipuladores instalados antes do fork: um sinal que chegue
+        # enquanto os workers são criados não derruba o pai nem os workers
+        signal.signal(signal.SIGTERM, self._encerrar)
+        signal.signal(signal.SIGINT, self._encerrar)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self._imprimir_memoria)
+            signal.signal(signal.SIGUSR2, self._repassar_perfil)
+
+        for _ in range(self.total_workers):
+            if self._encerrando:
+                break
+            self.workers.append(self._iniciar_worker())
+        print(f"🍴 {self.total_workers} workers em http://{self.host}:{self.porta} "
+              f"(rede compilada: {self.sistema.compilar().memoria_bytes() / 1024:,.0f} kB)")
+
+        while self.workers:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if pid not in self.workers:
+                continue
+            self.workers.remove(pid)
+            if not self._encerrando:
+                print(f"⚠️ Worker {pid} terminou; reiniciando", file=sys.stderr)
+                time.sleep(INTERVALO_REINICIO)
+                self.workers.append(self._iniciar_worker())
+
+        self._socket.close()
+        print("👋 Servidor pré-fork encerrado")
+
+
+def main():
+    """Inicia o servidor pré-fork pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Servidor de rotas pré-fork (um processo por núcleo)")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: núcleos da máquina)")
+    parser.add_argument('--threads', type=int, default=THREADS_POR_WORKER, help="Threads de busca por worker")
+    parser.add_argument('--gtfs', help="Carrega a rede de um feed GTFS (diretório ou .zip)")
+    parser.add_argument('--sintetica', type=int, help="Usa uma rede sintética com N pontos")
+    args = parser.parse_args()
+
+    if args.gtfs:
+        from importador_gtfs import importar_gtfs
+        sistema = importar_gtfs(args.gtfs)
+    elif args.sintetica:
+        from gerador_rede import gerar_rede_sintetica
+        sistema = gerar_rede_sintetica(args.sintetica)
+    else:
+        sistema = SistemaVermelhinho()
+
+    ServidorPreFork(sistema, args.host, args.porta, args.workers, args.threads).executar()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,19 @@ Salve como: sistema_backend.py
 
 import networkx as nx
 import heapq
+import numpy as np
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 import math
+import threading
+import time
+
+import analise_rede
+from grafo_compilado import BuscaCancelada, GrafoCompilado
+from instrumentacao import AoMedir, MedicaoConsulta
+from metricas import METRICAS, MetricasRotas
+from resultado_rota import ResultadoRota
+from tabela_pontos import TabelaPontos
 
 @dataclass
 class PontoOnibus:
@@ -29,15 +39,44 @@ class PontoOnibus:
         if self.linhas is None:
             self.linhas = []
 
+# Erro de consulta sem caminho (as métricas o separam dos pontos inválidos)
+ERRO_SEM_CAMINHO = "Não existe caminho entre os pontos"
+
 class SistemaVermelhinho:
     """Sistema principal de cálculo de rotas usando Dijkstra com dados reais do Vermelinho"""
     
-    def __init__(self):
-        self.pontos: Dict[str, PontoOnibus] = {}
+    def __init__(self, carregar_rede_padrao: bool = True):
+        """
+        Inicializa o sistema
+        
+        Args:
+            carregar_rede_padrao: Se False, cria o sistema vazio para ser
+                preenchido por um importador (ex.: importador_gtfs)
+        """
+        # Pontos ficam em colunas compactas; pontos[id] devolve uma VistaPonto
+        # com os mesmos atributos de PontoOnibus
+        self.pontos = TabelaPontos()
         self.grafo = nx.Graph()
         self.linhas_vermelinho = {}
-        self._criar_mapa_vermelinho_real()
-        print(f"✅ Sistema Vermelinho iniciado com {len(self.pontos)} pontos e {self.grafo.number_of_edges()} conexões")
+        # Versão da rede: o grafo compilado é refeito quando ela muda
+        self.versao_rede = 0
+        self._compilado: Optional[GrafoCompilado] = None
+        self._trava_compilacao = threading.Lock()
+        # Callback opcional chamado com a MedicaoConsulta de cada rota
+        # (liga a instrumentação de calcular_rota)
+        self.ao_medir: Optional[AoMedir] = None
+        # Métricas do processo (None desliga a contagem das consultas)
+        self.metricas: Optional[MetricasRotas] = METRICAS
+        # Log opcional de cada consulta (ver log_consultas.LogConsultas)
+        self.log_consultas = None
+        # Instalação mais próxima de cada ponto: (tipo, perfil) -> (versão, tempos, instalação, próximo)
+        self._mais_proximos: Dict[Tuple[str, bool], tuple] = {}
+        if carregar_rede_padrao:
+            inicio = time.perf_counter()
+            self._criar_mapa_vermelinho_real()
+            if self.metricas is not None:
+                self.metricas.registrar_construcao('montagem', time.perf_counter() - inicio)
+            print(f"✅ Sistema Vermelinho iniciado com {len(self.pontos)} pontos e {self.grafo.number_of_edges()} conexões")
     
     def _criar_mapa_vermelinho_real(self):
         """Cria o mapa real do Sistema Vermelinho de Maricá"""
@@ -139,17 +178,15 @@ class SistemaVermelhinho:
         
         # Criar pontos
         for dados in pontos_sistema:
-            ponto = PontoOnibus(
+            self.pontos.adicionar(
                 id=dados[0],
                 nome=dados[1],
                 endereco=dados[2],
                 latitude=dados[3],
                 longitude=dados[4],
                 acessivel=dados[5],
-                tipo=dados[6],
-                linhas=[]
+                tipo=dados[6]
             )
-            self.pontos[dados[0]] = ponto
             self.grafo.add_node(dados[0])
         
         # Definir as linhas do Vermelinho com seus itinerários
@@ -353,8 +390,8 @@ class SistemaVermelhinho:
         for linha_id, linha_info in self.linhas_vermelinho.items():
             for ponto_id in linha_info["ida"] + linha_info["volta"]:
                 if ponto_id in self.pontos:
-                    if linha_id not in self.pontos[ponto_id].linhas:
-                        self.pontos[ponto_id].linhas.append(linha_id)
+                    self.pontos.vincular_linha(ponto_id, linha_id)
+        self.pontos.compactar()
     
     def _criar_conexoes_linhas(self):
         """Cria conexões entre pontos baseadas nas linhas do Vermelinho"""
@@ -432,7 +469,7 @@ class SistemaVermelhinho:
                 if not self.grafo.has_edge(ponto1, ponto2):
                     self.grafo.add_edge(ponto1, ponto2, weight=tempo, tipo="compartilhada")
     
-    def _calcular_distancia(self, ponto1: PontoOnibus, ponto2: PontoOnibus) -> float:
+    def _calcular_distancia(self, ponto1, ponto2) -> float:
         """Calcula distância entre dois pontos em km"""
         lat1, lon1 = math.radians(ponto1.latitude), math.radians(ponto1.longitude)
         lat2, lon2 = math.radians(ponto2.latitude), math.radians(ponto2.longitude)
@@ -445,7 +482,48 @@ class SistemaVermelhinho:
         
         return 6371 * c  # Raio da Terra em km
     
-    def calcular_rota(self, origem: str, destino: str, apenas_acessivel: bool = False) -> dict:
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_trava_compilacao']
+        estado['_compilado'] = None  # recompilado sob demanda
+        estado['_mais_proximos'] = {}  # idem
+        estado['ao_medir'] = None  # callbacks valem só no processo de origem
+        estado['log_consultas'] = None  # o arquivo e o thread de gravação também
+        # Cada processo conta nas próprias métricas; só o liga/desliga viaja
+        estado['metricas'] = self.metricas is not None
+        return estado
+    
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.metricas = METRICAS if estado.get('metricas', True) else None
+        self._trava_compilacao = threading.Lock()
+    
+    def marcar_rede_alterada(self):
+        """Avisa que pontos ou conexões mudaram (invalida o grafo compilado)"""
+        self.versao_rede += 1
+    
+    def compilar(self) -> GrafoCompilado:
+        """
+        Retorna a rede em formato CSR, compilando apenas quando a versão muda
+        
+        Returns:
+            GrafoCompilado usado pelo cálculo de rotas
+        """
+        compilado = self._compilado
+        if compilado is None or compilado.versao != self.versao_rede:
+            with self._trava_compilacao:
+                compilado = self._compilado
+                if compilado is None or compilado.versao != self.versao_rede:
+                    inicio = time.perf_counter()
+                    compilado = GrafoCompilado.de_sistema(self)
+                    self._compilado = compilado
+                    if self.metricas is not None:
+                        self.metricas.registrar_construcao('compilacao', time.perf_counter() - inicio)
+                        self.metricas.registrar_rede(len(compilado), self.grafo.number_of_edges())
+        return compilado
+    
+    def calcular_rota(self, origem: str, destino: str, apenas_acessivel: bool = False, cancelado=None,
+                      instrumentar: bool = False):
         """
         Calcula a rota ótima usando algoritmo de Dijkstra
         
@@ -453,44 +531,143 @@ class SistemaVermelhinho:
             origem: ID do ponto de origem
             destino: ID do ponto de destino  
             apenas_acessivel: Se True, usa apenas pontos acessíveis
+            cancelado: threading.Event opcional; acionado, interrompe a busca
+            instrumentar: Se True, mede cada etapa e anexa o resultado em
+                ``resultado['medicao']`` (também ligado por ``ao_medir``)
             
         Returns:
-            dict: Resultado da rota com detalhes completos
+            ResultadoRota (acessado como dict) ou dict de erro
+
+        Raises:
+            BuscaCancelada: Se ``cancelado`` for acionado durante a busca
         """
+        executar = (self._calcular_rota_medida if instrumentar or self.ao_medir is not None
+                    else self._calcular_rota_simples)
+        if self.metricas is None and self.log_consultas is None:
+            return executar(origem, destino, apenas_acessivel, cancelado)
         
+        instante, inicio = time.time(), time.perf_counter()
         try:
-            # Validar pontos
-            if origem not in self.pontos or destino not in self.pontos:
-                return self._resultado_erro("Pontos não encontrados")
-            
-            if origem == destino:
-                return self._resultado_erro("Origem e destino são iguais")
+            resultado = executar(origem, destino, apenas_acessivel, cancelado)
+        except BuscaCancelada:
+            self._contabilizar(origem, destino, apenas_acessivel, 'cancelada', instante, inicio)
+            raise
+        self._contabilizar(origem, destino, apenas_acessivel, self._classificar_resultado(resultado),
+                           instante, inicio)
+        return resultado
+    
+    def _contabilizar(self, origem: str, destino: str, apenas_acessivel: bool, classificacao: str,
+                      instante: float, inicio: float):
+        """Conta a consulta nas métricas e a acrescenta ao log de consultas"""
+        duracao = time.perf_counter() - inicio
+        if self.metricas is not None:
+            self.metricas.registrar_consulta(classificacao, apenas_acessivel, duracao)
+        if self.log_consultas is not None:
+            self.log_consultas.registrar(origem, destino, apenas_acessivel, duracao, classificacao, instante)
+    
+    @staticmethod
+    def _classificar_resultado(resultado) -> str:
+        """Resultado da consulta para as métricas e o log de consultas"""
+        if resultado['encontrada']:
+            return 'encontrada'
+        erro = resultado['erro']
+        if erro == ERRO_SEM_CAMINHO:
+            return 'sem_caminho'
+        if erro.startswith("Erro no cálculo"):
+            return 'erro'
+        return 'ponto_invalido'
+    
+    def _calcular_rota_simples(self, origem: str, destino: str, apenas_acessivel: bool, cancelado):
+        """calcular_rota sem instrumentação"""
+        try:
+            erro = self.validar_consulta(origem, destino, apenas_acessivel)
+            if erro:
+                return self.resultado_erro(erro)
             
-            # Criar subgrafo se necessário filtrar acessibilidade
-            grafo_calculo = self.grafo
-            if apenas_acessivel:
-                pontos_acessiveis = [id_ponto for id_ponto, ponto in self.pontos.items() 
-                                   if ponto.acessivel]
-                grafo_calculo = self.grafo.subgraph(pontos_acessiveis)
+            # Dijkstra sobre o grafo compilado (CSR); o filtro de
+            # acessibilidade é aplicado durante a busca (sem subgrafo)
+            busca = self.compilar().menor_caminho(self.pontos.indice(origem), self.pontos.indice(destino),
+                                                  apenas_acessivel, cancelado)
+            return self.resultado_da_busca(busca, apenas_acessivel)
                 
-                if origem not in pontos_acessiveis or destino not in pontos_acessiveis:
-                    return self._resultado_erro("Pontos não acessíveis com filtro ativo")
-            
-            # Calcular rota usando Dijkstra do NetworkX
-            try:
-                caminho = nx.shortest_path(grafo_calculo, origem, destino, weight='weight')
-                tempo_total = nx.shortest_path_length(grafo_calculo, origem, destino, weight='weight')
+        except BuscaCancelada:
+            raise
+        except Exception as e:
+            return self.resultado_erro(f"Erro no cálculo: {str(e)}")
+    
+    def _calcular_rota_medida(self, origem: str, destino: str, apenas_acessivel: bool, cancelado):
+        """calcular_rota com tempo por etapa e contadores da busca (ver instrumentacao.py)"""
+        medicao = MedicaoConsulta(origem, destino, apenas_acessivel)
+        
+        try:
+            erro = self.validar_consulta(origem, destino, apenas_acessivel)
+            medicao.marcar('validacao')
+            if erro:
+                resultado = self.resultado_erro(erro)
+            else:
+                # Perfil: grafo compilado da versão atual e índices dos pontos
+                compilado = self.compilar()
+                indice_origem, indice_destino = self.pontos.indice(origem), self.pontos.indice(destino)
+                medicao.marcar('perfil')
                 
-                return self._formatar_resultado_sucesso(caminho, tempo_total, apenas_acessivel)
+                busca = compilado.menor_caminho(indice_origem, indice_destino, apenas_acessivel,
+                                                cancelado, medicao.contadores)
+                medicao.marcar('busca')
                 
-            except nx.NetworkXNoPath:
-                return self._resultado_erro("Não existe caminho entre os pontos")
+                resultado = self.resultado_da_busca(busca, apenas_acessivel)
+                medicao.marcar('formatacao')
                 
+                if resultado['encontrada']:
+                    resultado['detalhes']  # Calculado sob demanda; fica em cache no resultado
+                    medicao.marcar('detalhes')
+        
+        except BuscaCancelada:
+            raise
         except Exception as e:
-            return self._resultado_erro(f"Erro no cálculo: {str(e)}")
+            resultado = self.resultado_erro(f"Erro no cálculo: {str(e)}")
+        
+        resultado['medicao'] = medicao.para_dict()
+        if self.ao_medir is not None:
+            self.ao_medir(medicao)
+        return resultado
+    
+    def validar_consulta(self, origem: str, destino: str, apenas_acessivel: bool = False) -> Optional[str]:
+        """
+        Valida uma consulta sem calcular a rota (usado também pelo roteamento em lote)
+        
+        Returns:
+            Mensagem de erro, como em calcular_rota, ou None se a consulta é válida
+        """
+        if origem not in self.pontos or destino not in self.pontos:
+            return "Pontos não encontrados"
+        
+        if origem == destino:
+            return "Origem e destino são iguais"
+        
+        if apenas_acessivel:
+            acessivel = self.compilar().acessivel
+            if not (acessivel[self.pontos.indice(origem)] and acessivel[self.pontos.indice(destino)]):
+                return "Pontos não acessíveis com filtro ativo"
+        
+        return None
+    
+    def resultado_da_busca(self, busca: Optional[Tuple[List[int], float]], apenas_acessivel: bool = False):
+        """
+        Resultado de calcular_rota para uma busca feita direto no grafo compilado
+        
+        Args:
+            busca: (caminho em índices, tempo) de GrafoCompilado.menor_caminho ou
+                menores_caminhos; None se não há caminho
+            apenas_acessivel: Se a busca usou o filtro de acessibilidade
+        """
+        if busca is None:
+            return self.resultado_erro(ERRO_SEM_CAMINHO)
+        
+        indices, tempo_total = busca
+        return self._formatar_resultado_sucesso(indices, tempo_total, apenas_acessivel)
     
-    def _resultado_erro(self, mensagem: str) -> dict:
-        """Retorna resultado de erro padronizado"""
+    def resultado_erro(self, mensagem: str) -> dict:
+        """Retorna resultado de erro padronizado (mesmo formato de calcular_rota)"""
         return {
             'encontrada': False,
             'erro': mensagem,
@@ -501,106 +678,102 @@ class SistemaVermelhinho:
             'status': f"❌ {mensagem}"
         }
     
-    def _formatar_resultado_sucesso(self, caminho: List[str], tempo_total: float, apenas_acessivel: bool) -> dict:
-        """Formata resultado de sucesso"""
-        
-        # Verificar se rota é totalmente acessível
-        rota_acessivel = all(self.pontos[ponto_id].acessivel for ponto_id in caminho)
-        
-        # Identificar linhas utilizadas
-        linhas_utilizadas = set()
-        for i in range(len(caminho) - 1):
-            if self.grafo.has_edge(caminho[i], caminho[i + 1]):
-                edge_data = self.grafo[caminho[i]][caminho[i + 1]]
-                if 'linha' in edge_data:
-                    linhas_utilizadas.add(edge_data['linha'])
-        
-        # Status da rota
-        if rota_acessivel:
-            status = "✅ Rota totalmente acessível"
-        elif apenas_acessivel:
-            status = "✅ Rota com filtro de acessibilidade"
-        else:
-            status = "⚠️ Rota com pontos não acessíveis"
-        
-        if linhas_utilizadas:
-            linhas_str = ", ".join(sorted(linhas_utilizadas))
-            status += f" | 🚌 Linhas: {linhas_str}"
+    def _formatar_resultado_sucesso(self, indices: List[int], tempo_total: float,
+                                    apenas_acessivel: bool) -> ResultadoRota:
+        """
+        Formata resultado de sucesso
         
-        return {
-            'encontrada': True,
-            'origem': self.pontos[caminho[0]].nome,
-            'destino': self.pontos[caminho[-1]].nome,
-            'pontos': caminho,
-            'tempo_total': tempo_total,
-            'distancia_estimada': tempo_total * 0.42,  # Estimativa: 25 km/h média
-            'numero_paradas': len(caminho) - 2,  # Excluir origem e destino
-            'acessivel': rota_acessivel,
-            'linhas_utilizadas': list(linhas_utilizadas),
-            'status': status,
-            'detalhes': self._obter_detalhes_rota(caminho, tempo_total)
-        }
+        O ResultadoRota guarda só o caminho em índices; nomes, status e
+        detalhes são montados quando lidos (ver resultado_rota.py).
+        """
+        return ResultadoRota(self.pontos, self.compilar(), indices, tempo_total, apenas_acessivel)
     
-    def _obter_detalhes_rota(self, caminho: List[str], tempo_total: float) -> dict:
-        """Obtém detalhes adicionais da rota"""
-        detalhes = {
-            'pontos_detalhados': [],
-            'tempos_segmentos': [],
-            'tipos_pontos': {},
-            'coordenadas': [],
-            'linhas_por_segmento': []
-        }
+    def _tabela_mais_proximos(self, tipo: str, apenas_acessivel: bool) -> Optional[tuple]:
+        """
+        (tempos, instalação, próximo) de todos os pontos até o ``tipo`` mais
+        próximo, calculados por uma busca com várias origens e guardados até
+        a rede mudar (None se o tipo não existe)
+        """
+        chave = (tipo, apenas_acessivel)
+        tabela = self._mais_proximos.get(chave)
+        if tabela is not None and tabela[0] == self.versao_rede:
+            return tabela[1:]
+        
+        tipos = self.pontos.tipos
+        if tipo not in tipos:
+            return None
+        versao, compilado = self.versao_rede, self.compilar()
+        instalacoes = np.flatnonzero(self.pontos.codigos_tipo == tipos.index(tipo))
+        tabela = (versao,) + compilado.mais_proximos(instalacoes.tolist(), apenas_acessivel)
+        self._mais_proximos[chave] = tabela
+        return tabela[1:]
+    
+    def precalcular_mais_proximos(self, apenas_acessivel: bool = False) -> Dict[str, Dict[str, Tuple[Optional[str], float]]]:
+        """
+        Instalação mais próxima de cada tipo para todos os pontos da rede
         
-        # Detalhes de cada ponto
-        for i, ponto_id in enumerate(caminho):
-            ponto = self.pontos[ponto_id]
-            
-            detalhes['pontos_detalhados'].append({
-                'id': ponto_id,
-                'nome': ponto.nome,
-                'endereco': ponto.endereco,
-                'posicao': i + 1,
-                'acessivel': ponto.acessivel,
-                'tipo': ponto.tipo,
-                'linhas_disponiveis': ponto.linhas
-            })
+        Uma busca de Dijkstra com várias origens por tipo (não uma por ponto);
+        as tabelas ficam em cache para ponto_mais_proximo_por_tipo.
+        
+        Args:
+            apenas_acessivel: Se True, considera só pontos acessíveis
             
-            detalhes['coordenadas'].append({
-                'lat': ponto.latitude,
-                'lng': ponto.longitude
-            })
+        Returns:
+            {tipo: {ponto_id: (ID da instalação mais próxima ou None, tempo em min)}}
+        """
+        ids = list(self.pontos)
+        resultado = {}
+        for tipo in self.pontos.tipos:
+            tempos, instalacao, _ = self._tabela_mais_proximos(tipo, apenas_acessivel)
+            resultado[tipo] = {
+                ponto_id: (ids[indice] if indice >= 0 else None, tempo)
+                for ponto_id, indice, tempo in zip(ids, instalacao.tolist(), tempos.tolist())
+            }
+        return resultado
+    
+    def ponto_mais_proximo_por_tipo(self, origem: str, tipo: str, apenas_acessivel: bool = False):
+        """
+        Rota até o ponto do ``tipo`` mais próximo (ex.: o terminal mais perto)
+        
+        Se a própria origem é do tipo, ela mesma é a resposta (tempo 0).
+        
+        Args:
+            origem: ID do ponto de origem
+            tipo: Tipo do ponto procurado (parada, terminal, estacao...)
+            apenas_acessivel: Se True, usa apenas pontos acessíveis
             
-            # Tempo e linha entre segmentos
-            if i < len(caminho) - 1:
-                if self.grafo.has_edge(ponto_id, caminho[i + 1]):
-                    edge_data = self.grafo[ponto_id][caminho[i + 1]]
-                    tempo_segmento = edge_data['weight']
-                    linha_segmento = edge_data.get('linha', 'Integração')
-                    
-                    detalhes['tempos_segmentos'].append(tempo_segmento)
-                    detalhes['linhas_por_segmento'].append(linha_segmento)
-        
-        # Tipos de pontos na rota
-        for ponto_id in caminho:
-            tipo = self.pontos[ponto_id].tipo
-            if tipo not in detalhes['tipos_pontos']:
-                detalhes['tipos_pontos'][tipo] = 0
-            detalhes['tipos_pontos'][tipo] += 1
-        
-        return detalhes
+        Returns:
+            ResultadoRota até o ponto encontrado ou dict de erro
+        """
+        if origem not in self.pontos:
+            return self.resultado_erro("Pontos não encontrados")
+        tabela = self._tabela_mais_proximos(tipo, apenas_acessivel)
+        if tabela is None:
+            return self.resultado_erro(f"Nenhum ponto do tipo '{tipo}'")
+        
+        tempos, instalacao, proximo = tabela
+        indice = self.pontos.indice(origem)
+        if apenas_acessivel and not self.compilar().acessivel[indice]:
+            return self.resultado_erro("Pontos não acessíveis com filtro ativo")
+        if instalacao[indice] < 0:
+            return self.resultado_erro(ERRO_SEM_CAMINHO)
+        caminho = GrafoCompilado.caminho_ate_origem(proximo, indice)
+        return self._formatar_resultado_sucesso(caminho, float(tempos[indice]), apenas_acessivel)
     
-    def obter_estatisticas(self) -> dict:
-        """Retorna estatísticas do sistema"""
-        total_pontos = len(self.pontos)
-        pontos_acessiveis = sum(1 for p in self.pontos.values() if p.acessivel)
-        tipos_pontos = {}
+    def obter_estatisticas(self, centralidade: bool = False) -> dict:
+        """
+        Retorna estatísticas do sistema
         
-        for ponto in self.pontos.values():
-            if ponto.tipo not in tipos_pontos:
-                tipos_pontos[ponto.tipo] = 0
-            tipos_pontos[ponto.tipo] += 1
+        Args:
+            centralidade: Se True, inclui os pontos e trechos mais críticos
+                (betweenness; exato em redes pequenas, amostrado nas grandes,
+                ver analise_rede.py)
+        """
+        total_pontos = len(self.pontos)
+        pontos_acessiveis = self.pontos.total_acessiveis()
+        tipos_pontos = self.pontos.contagem_tipos()
         
-        return {
+        estatisticas = {
             'total_pontos': total_pontos,
             'pontos_acessiveis': pontos_acessiveis,
             'percentual_acessivel': (pontos_acessiveis / total_pontos) * 100,
@@ -611,6 +784,11 @@ class SistemaVermelhinho:
             'densidade_grafo': nx.density(self.grafo),
             'conectividade': nx.is_connected(self.grafo)
         }
+        if centralidade:
+            compilado = self.compilar()
+            analise = analise_rede.centralidade(compilado)
+            estatisticas['centralidade'] = analise.para_dict(compilado, quantidade=5)
+        return estatisticas
     
     def obter_informacoes_linha(self, linha_id: str) -> dict:
         """Retorna informações detalhadas de uma linha"""
@@ -649,6 +827,8 @@ if __name__ == "__main__":
     print(f"   • Conexões: {stats['total_conexoes']}")
     print(f"   • Linhas: {stats['total_linhas']} ({', '.join(stats['linhas_ativas'])})")
     print(f"   • Conectado: {'✅' if stats['conectividade'] else '❌'}")
+    criticos = sistema.obter_estatisticas(centralidade=True)['centralidade']['pontos_criticos']
+    print(f"   • Pontos críticos: {', '.join(sistema.pontos[c['ponto']].nome for c in criticos[:3])}")
     
     # Teste de rota com pontos reais
     resultado = sistema.calcular_rota("RODOVIARIA", "PRACA_PONTA_NEGRA")
@@ -659,4 +839,13 @@ if __name__ == "__main__":
         print(f"   • Paradas: {resultado['numero_paradas']}")
         print(f"   • Linhas: {', '.join(resultado['linhas_utilizadas'])}")
     
+    # Terminal mais próximo (uma busca com várias origens para a rede toda)
+    proximo = sistema.ponto_mais_proximo_por_tipo("PRACA_PONTA_NEGRA", "terminal", apenas_acessivel=True)
+    print(f"\n🏁 Terminal mais próximo da Praça Ponta Negra: {proximo['destino']} "
+          f"({proximo['tempo_total']:.1f} min)")
+    # Origem já é do tipo pedido: rota de um ponto só, sem paradas
+    no_terminal = sistema.ponto_mais_proximo_por_tipo("RODOVIARIA", "terminal")
+    assert no_terminal['pontos'] == ["RODOVIARIA"] and no_terminal['numero_paradas'] == 0
+    assert no_terminal['tempo_total'] == 0
+    
     print("✅ Sistema Vermelinho Real funcionando!")
\ No newline at end of file
@@ -8,14 +8,24 @@ Salve como: interface_completa_melhorada.py
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import threading
 import webbrowser
 from datetime import datetime
 import urllib.parse
 import json
 import os
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.pyplot as plt
+
+from benchmark_suite import ARQUIVO_RELATORIO, carregar_relatorio
+from comparacao_motores import ARQUIVO_COMPARACAO
+from executor_gui import ExecutorGUI
+from instrumentacao import resumir_medicao
+from relatorio_memoria import resumo_memoria
+from rastreador_inicializacao import RastreadorInicializacao
+from perfilador import botao_perfil
+from importacao_preguicosa import ModuloPreguicoso
+
+# Matplotlib só é carregado quando um gráfico é desenhado
+plt = ModuloPreguicoso('matplotlib.pyplot')
+backend_tkagg = ModuloPreguicoso('matplotlib.backends.backend_tkagg')
 
 # Importar sistema backend e visualizador
 try:
@@ -23,16 +33,29 @@ try:
     from visualizador_grafo import VisualizadorGrafo, criar_grafico_complexidade
     print("✅ Módulos importados com sucesso")
 except ImportError as e:
+    # Propagar em vez de encerrar o processo de quem importou este módulo
     print(f"❌ Erro ao importar: {e}")
-    exit()
+    raise
 
 class InterfaceProfissionalMelhorada:
     """Interface Gráfica Profissional com Melhorias"""
     
-    def __init__(self):
-        self.sistema = SistemaVermelhinho()
-        self.visualizador = VisualizadorGrafo(self.sistema)
-        self.root = tk.Tk()
+    def __init__(self, rastreador=None):
+        """
+        Args:
+            rastreador: RastreadorInicializacao de quem abriu o programa (um novo se omitido)
+        """
+        self.rastreador = rastreador or RastreadorInicializacao()
+        with self.rastreador.etapa('backend'):
+            self.sistema = SistemaVermelhinho()
+        with self.rastreador.etapa('visualizador'):
+            self.visualizador = VisualizadorGrafo(self.sistema)
+        with self.rastreador.etapa('janela'):
+            self.root = tk.Tk()
+        
+        # Worker único para os cálculos (resultados obsoletos são descartados)
+        self.executor = ExecutorGUI(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
         
         # Variáveis de controle
         self.tema_escuro = tk.BooleanVar(value=False)
@@ -63,10 +86,16 @@ class InterfaceProfissionalMelhorada:
             }
         }
         
+        # Abas construídas só na primeira seleção: caminho do frame -> (nome, frame, criar)
+        self._abas_pendentes = {}
+        
         self.configurar_janela()
         self.criar_interface()
         self.carregar_configuracoes()
         
+        # Pronto quando o Tk ficar ocioso pela primeira vez (janela desenhada)
+        self.root.after_idle(self._inicializacao_concluida)
+        
     def configurar_janela(self):
         """Configura a janela principal"""
         self.root.title("🚌 BuSync - Sistema Inteligente de Transporte")
@@ -136,32 +165,60 @@ class InterfaceProfissionalMelhorada:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Aba 1: Planejamento de Rota
+        # Aba 1: Planejamento de Rota (a única construída na abertura)
         self.aba_rota = ttk.Frame(self.notebook)
         self.notebook.add(self.aba_rota, text="🗺️ Planejamento de Rota")
-        self.criar_aba_rota()
+        with self.rastreador.etapa('aba:rota'):
+            self.criar_aba_rota()
         
-        # Aba 2: Visualização do Grafo
+        # Aba 2: Visualização do Grafo (desenho da rede completa)
         self.aba_grafo = ttk.Frame(self.notebook)
         self.notebook.add(self.aba_grafo, text="📊 Visualização do Grafo")
-        self.criar_aba_grafo()
+        self._adiar_aba('grafo', self.aba_grafo, self.criar_aba_grafo)
         
-        # Aba 3: Dashboard e Estatísticas
+        # Aba 3: Dashboard e Estatísticas (figura com quatro gráficos)
         self.aba_dashboard = ttk.Frame(self.notebook)
         self.notebook.add(self.aba_dashboard, text="📈 Dashboard")
-        self.criar_aba_dashboard()
+        self._adiar_aba('dashboard', self.aba_dashboard, self.criar_aba_dashboard)
         
         # Aba 4: Documentação
         self.aba_docs = ttk.Frame(self.notebook)
         self.notebook.add(self.aba_docs, text="📚 Documentação")
-        self.criar_aba_documentacao()
+        self._adiar_aba('documentacao', self.aba_docs, self.criar_aba_documentacao)
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self._ao_trocar_aba)
         
         # Status bar melhorada
-        self.criar_status_bar_melhorada()
+        with self.rastreador.etapa('status_bar'):
+            self.criar_status_bar_melhorada()
         
         # Aplicar tema inicial
         self.aplicar_tema()
     
+    def _adiar_aba(self, nome, aba, criar):
+        """Registra uma aba para ser construída na primeira vez que for selecionada"""
+        self._abas_pendentes[str(aba)] = (nome, aba, criar)
+    
+    def _ao_trocar_aba(self, event=None):
+        """Constrói a aba selecionada se ela ainda estiver pendente"""
+        self._construir_aba(self.notebook.select())
+    
+    def _construir_aba(self, aba):
+        """Constrói uma aba adiada (nada se já construída) e aplica o tema atual"""
+        pendente = self._abas_pendentes.pop(str(aba), None)
+        if pendente is None:
+            return
+        nome, frame, criar = pendente
+        with self.rastreador.etapa(f'aba:{nome}'):
+            criar()
+            cores = self.temas['escuro' if self.tema_escuro.get() else 'claro']
+            self._aplicar_tema_recursivo(frame, cores)
+    
+    def _inicializacao_concluida(self):
+        """Fecha a medição da abertura (ver rastreador_inicializacao.py)"""
+        self.rastreador.marcar_pronto()
+        print(f"⏱️ {self.rastreador.resumo()}")
+    
     def criar_header_melhorado(self):
         """Cria header profissional melhorado"""
         self.header_frame = tk.Frame(self.root, bg='#2C3E50', height=100)
@@ -251,6 +308,8 @@ class InterfaceProfissionalMelhorada:
         ttk.Label(left_frame, text="🎯 Ponto de Destino:", font=('Arial', 12, 'bold')).pack(anchor=tk.W, pady=(0, 5))
         self.combo_destino = ttk.Combobox(left_frame, width=35, state="readonly", font=('Arial', 11))
         self.combo_destino.pack(fill=tk.X, pady=(0, 15))
+        self.combo_origem.bind('<<ComboboxSelected>>', self._ao_alterar_selecao)
+        self.combo_destino.bind('<<ComboboxSelected>>', self._ao_alterar_selecao)
         
         # Filtros avançados
         filtros_frame = ttk.LabelFrame(left_frame, text="🔧 Filtros Avançados", padding="10")
@@ -259,6 +318,7 @@ class InterfaceProfissionalMelhorada:
         self.var_acessivel = tk.BooleanVar()
         ttk.Checkbutton(filtros_frame, text="♿ Apenas rotas acessíveis",
                        variable=self.var_acessivel).pack(anchor=tk.W)
+        self.var_acessivel.trace_add('write', self._ao_alterar_selecao)
         
         self.var_terminal = tk.BooleanVar()
         ttk.Checkbutton(filtros_frame, text="🚌 Priorizar terminais",
@@ -421,6 +481,28 @@ class InterfaceProfissionalMelhorada:
         # Criar visualização inicial
         self.atualizar_grafo()
     
+    def atualizar_grafo(self, rota=None):
+        """
+        Atualiza a aba do grafo
+        
+        Com uma rota e o grafo já na tela, só a camada da rota é trocada
+        (blitting); sem rota (botão Atualizar), a rede é redesenhada.
+        """
+        if rota and self.canvas_grafo is not None:
+            self.visualizador.destacar_rota(rota)
+            return
+        
+        if self.canvas_grafo is not None:
+            self.canvas_grafo.get_tk_widget().destroy()
+        self.visualizador.criar_visualizacao(tamanho_figura=(12, 8))
+        self.canvas_grafo = self.visualizador.integrar_com_tkinter(self.grafo_frame)
+        if rota:
+            self.visualizador.destacar_rota(rota)
+    
+    def resetar_zoom(self):
+        """Volta o grafo para a vista completa (roda do mouse dá zoom)"""
+        self.visualizador.resetar_zoom()
+    
     def criar_aba_dashboard(self):
         """Cria aba de dashboard com estatísticas"""
         # Frame principal com scroll
@@ -524,37 +606,61 @@ class InterfaceProfissionalMelhorada:
         ax2.set_xlabel('Linha')
         ax2.set_ylabel('Número de Pontos')
         
-        # Gráfico 3: Análise de complexidade
-        tamanhos = [10, 20, 50, 100, 200]
-        tempos_teoricos = [(n + n*2) * np.log2(n) / 1000 for n in tamanhos]
-        
-        ax3.plot(tamanhos, tempos_teoricos, 'bo-', linewidth=2, markersize=8)
-        ax3.set_title('Complexidade do Algoritmo Dijkstra')
-        ax3.set_xlabel('Número de Vértices')
-        ax3.set_ylabel('Complexidade O((V+E)log V)')
+        # Gráfico 3: Comparação dos motores de rota (ou a suíte de benchmarks)
+        comparacao = carregar_relatorio(ARQUIVO_COMPARACAO)
+        relatorio = carregar_relatorio(ARQUIVO_RELATORIO)
+        if comparacao and comparacao.get('motores'):
+            medidas = comparacao['motores']
+            titulo = f"Motores de rota ({comparacao['rede']['pontos']:,} pontos)"
+        else:
+            medidas = (relatorio or {}).get('resultados', {}).get('real', {})
+            medidas = {nome: medidas[nome] for nome in ('consulta', 'consulta_acessivel', 'snapshot')
+                       if nome in medidas}
+            titulo = f"Benchmarks ({relatorio['gerado_em']})" if medidas else 'Benchmarks'
+        if medidas:
+            nomes = list(medidas)
+            p50 = [medidas[nome]['p50_ms'] for nome in nomes]
+            p99 = [medidas[nome]['p99_ms'] for nome in nomes]
+            ax3.bar(nomes, p50, color='steelblue', label='p50')
+            ax3.errorbar(nomes, p50, yerr=[[0] * len(nomes), [b - a for a, b in zip(p50, p99)]],
+                         fmt='none', ecolor='black', capsize=5, label='até p99')
+            ax3.set_ylabel('Tempo (ms)')
+            ax3.legend()
+        else:
+            ax3.text(0.5, 0.5, "Sem medições.\nExecute: python comparacao_motores.py",
+                     ha='center', va='center', transform=ax3.transAxes)
+        ax3.set_title(titulo)
         ax3.grid(True, alpha=0.3)
         
-        # Gráfico 4: Histórico de uso (simulado)
-        import random
-        dias = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-        uso = [random.randint(50, 150) for _ in dias]
-        
-        ax4.plot(dias, uso, 'go-', linewidth=2, markersize=8)
-        ax4.fill_between(range(len(dias)), uso, alpha=0.3, color='green')
-        ax4.set_title('Uso do Sistema por Dia')
-        ax4.set_xlabel('Dia da Semana')
+        # Gráfico 4: Consultas desta sessão por resultado e perfil (métricas do backend)
+        metricas = self.sistema.metricas
+        contagens = metricas.consultas.valores() if metricas is not None else {}
+        resultados = ['encontrada', 'sem_caminho', 'ponto_invalido', 'erro', 'cancelada']
+        padrao = [contagens.get((resultado, 'padrao'), 0) for resultado in resultados]
+        acessivel = [contagens.get((resultado, 'acessivel'), 0) for resultado in resultados]
+        
+        ax4.bar(resultados, padrao, color='green', alpha=0.7, label='Padrão')
+        ax4.bar(resultados, acessivel, bottom=padrao, color='orange', alpha=0.7, label='Acessível')
+        ax4.set_title('Consultas da Sessão por Resultado')
+        ax4.set_xlabel('Resultado')
         ax4.set_ylabel('Rotas Calculadas')
+        ax4.tick_params(axis='x', labelrotation=20)
+        latencia = metricas.latencia.resumo('csr', 'padrao') if metricas is not None else None
+        if latencia:
+            ax4.text(0.98, 0.95, f"média {latencia['media'] * 1000:.2f} ms", ha='right', va='top',
+                     transform=ax4.transAxes)
+        ax4.legend()
         ax4.grid(True, alpha=0.3)
         
         plt.tight_layout()
         
         # Integrar com tkinter
-        canvas = FigureCanvasTkAgg(fig, master=graphs_container)
+        canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=graphs_container)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Toolbar
-        toolbar = NavigationToolbar2Tk(canvas, graphs_container)
+        toolbar = backend_tkagg.NavigationToolbar2Tk(canvas, graphs_container)
         toolbar.update()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
@@ -1002,6 +1108,10 @@ BuSync v1.0 - Tornando o transporte público mais inteligente 🚌
                                       fg='#2ECC71', bg='#34495E')
         self.activity_label.pack(side=tk.LEFT, padx=10)
         
+        # Perfil sob demanda (pilhas de roteamento e renderização)
+        self.btn_perfil = botao_perfil(self.root, self.status_frame, self.status_label)
+        self.btn_perfil.pack(side=tk.LEFT, padx=10)
+        
         # Versão
         tk.Label(self.status_frame,
                 text="v1.0.0",
@@ -1082,45 +1192,68 @@ Desenvolvido com ❤️ pela equipe BuSync
         self.atualizar_status("🔍 Calculando rota otimizada...")
         self.activity_label.config(text="⚡ Processando", fg='#F39C12')
         
-        # Thread para não travar
-        thread = threading.Thread(target=self._calcular_rota_thread, 
-                                 args=(origem, destino))
-        thread.daemon = True
-        thread.start()
+        # Variáveis Tk são lidas aqui; o worker só recebe valores prontos.
+        # Um novo pedido cancela o anterior, cujo resultado é descartado.
+        apenas_acessivel = self.var_acessivel.get()
+        self.executor.enviar(
+            'rota',
+            lambda cancelado: self._calcular_rota_worker(origem, destino, apenas_acessivel, cancelado),
+            lambda retorno: self._mostrar_resultado(*retorno),
+            lambda erro: self._mostrar_erro(str(erro))
+        )
+    
+    def _ao_alterar_selecao(self, *_):
+        """Recalcula (com debounce) quando origem, destino ou filtro mudam"""
+        # Só recalcula sozinho depois que o usuário já pediu uma rota
+        if self.ultima_rota is None:
+            return
+        origem = self.combo_origem.get()
+        destino = self.combo_destino.get()
+        if origem and destino and origem != destino:
+            self.executor.agendar('rota', self.calcular_rota)
+    
+    def _calcular_rota_worker(self, origem, destino, apenas_acessivel, cancelado):
+        """Executado no worker do ExecutorGUI (não acessa widgets)"""
+        import time
+        inicio = time.time()
+        
+        # Buscar IDs
+        id_origem = None
+        id_destino = None
+        
+        for id_ponto, ponto in self.sistema.pontos.items():
+            if ponto.nome == origem:
+                id_origem = id_ponto
+            if ponto.nome == destino:
+                id_destino = id_ponto
+        
+        if not id_origem or not id_destino:
+            raise Exception("Pontos não encontrados")
+        
+        # Calcular rota (interrompida se um pedido mais novo chegar)
+        resultado = self.sistema.calcular_rota(
+            id_origem, 
+            id_destino, 
+            apenas_acessivel=apenas_acessivel,
+            cancelado=cancelado,
+            instrumentar=True
+        )
+        
+        tempo_calc = (time.time() - inicio) * 1000
+        return resultado, tempo_calc
     
-    def _calcular_rota_thread(self, origem, destino):
-        """Thread para calcular rota"""
+    def _get_memory_usage(self):
+        """Memória do processo e de cada componente para a barra de status (ver relatorio_memoria.py)"""
         try:
-            import time
-            inicio = time.time()
-            
-            # Buscar IDs
-            id_origem = None
-            id_destino = None
-            
-            for id_ponto, ponto in self.sistema.pontos.items():
-                if ponto.nome == origem:
-                    id_origem = id_ponto
-                if ponto.nome == destino:
-                    id_destino = id_ponto
-            
-            if not id_origem or not id_destino:
-                raise Exception("Pontos não encontrados")
-            
-            # Calcular rota
-            resultado = self.sistema.calcular_rota(
-                id_origem, 
-                id_destino, 
-                apenas_acessivel=self.var_acessivel.get()
-            )
-            
-            tempo_calc = (time.time() - inicio) * 1000
-            
-            # Atualizar interface
-            self.root.after(0, self._mostrar_resultado, resultado, tempo_calc)
-            
+            return resumo_memoria(self.sistema, self.visualizador)
         except Exception as e:
-            self.root.after(0, self._mostrar_erro, str(e))
+            print(f"⚠️ Erro ao medir memória: {e}")
+            return "? MB"
+    
+    def fechar(self):
+        """Encerra o worker e fecha a janela"""
+        self.executor.encerrar()
+        self.root.destroy()
     
     def _mostrar_resultado(self, resultado, tempo_calc):
         """Mostra o resultado do cálculo"""
@@ -1150,7 +1283,9 @@ Desenvolvido com ❤️ pela equipe BuSync
         
         # Atualizar status e performance
         self.atualizar_status(f"✅ Rota calculada em {tempo_calc:.1f}ms")
-        self.perf_label.config(text=f"💾 {self._get_memory_usage()} MB | ⚙️ {tempo_calc:.1f} ms")
+        busca_ms = resultado['medicao']['etapas_ms'].get('busca', 0)
+        self.perf_label.config(text=f"💾 {self._get_memory_usage()} | ⚙️ {tempo_calc:.1f} ms "
+                                    f"(🔎 busca {busca_ms:.1f} ms)")
     
     def _formatar_resultado_completo(self, resultado, tempo_calc):
         """Formata resultado completo com estilo melhorado"""
@@ -1175,6 +1310,7 @@ Desenvolvido com ❤️ pela equipe BuSync
 • Rota calculada usando grafo com {len(self.sistema.pontos)} vértices e {self.sistema.grafo.number_of_edges()} arestas
 • Algoritmo garantiu a rota matematicamente ótima
 • Tempo de processamento: {tempo_calc:.2f} milissegundos
+• Etapas: {resumir_medicao(resultado['medicao'])}
 • Complexidade: O((V+E)log V) = O(({len(self.sistema.pontos)}+{self.sistema.grafo.number_of_edges()})log {len(self.sistema.pontos)})
 
 🎯 PRÓXIMAS AÇÕES
@@ -1316,7 +1452,8 @@ Sistema Inteligente de Transporte
             messagebox.showwarning("Atenção", "Calcule uma rota primeiro!")
             return
         
-        # Mudar para aba do grafo
+        # Mudar para aba do grafo (construindo-a antes, se ainda não foi aberta)
+        self._construir_aba(self.aba_grafo)
         self.notebook.select(1)  # Índice da aba do grafo
         
         # Atualizar visualização com rota
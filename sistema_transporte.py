@@ -4,8 +4,6 @@
 Busync - GUI Moderna para o Sistema de Transporte de Maricá
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
 import threading
 import webbrowser
 import os
@@ -15,13 +13,33 @@ import networkx as nx
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
-# Tentar importar Folium
-try:
-    import folium
-    from folium.plugins import Fullscreen, MeasureControl, MiniMap
-    FOLIUM_DISPONIVEL = True
-except ImportError:
-    FOLIUM_DISPONIVEL = False
+from cache_mapas import CacheMapas, geojson_rota
+from importacao_preguicosa import ModuloPreguicoso, modulo_disponivel
+from perfilador import botao_perfil
+from tabela_pontos import TabelaPontos
+
+# Tkinter só é carregado quando a interface é criada
+tk = ModuloPreguicoso('tkinter')
+ttk = ModuloPreguicoso('tkinter.ttk')
+messagebox = ModuloPreguicoso('tkinter.messagebox')
+scrolledtext = ModuloPreguicoso('tkinter.scrolledtext')
+
+# Folium é verificado sem importar; a importação ocorre ao gerar o mapa
+FOLIUM_DISPONIVEL = modulo_disponivel('folium')
+
+# Acima deste número de pontos o mapa usa agrupamento no navegador
+# (FastMarkerCluster) em vez de um folium.Marker por ponto
+LIMITE_MARCADORES_INDIVIDUAIS = 300
+
+# Desenho de cada ponto agrupado: row = [lat, lon, nome, cor, acessível]
+CALLBACK_PONTO_AGRUPADO = """
+function (row) {
+    var marcador = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                  {radius: 6, color: row[3], weight: 2, fillOpacity: 0.8});
+    marcador.bindTooltip('🚌 ' + row[2] + (row[4] ? '' : ' ⚠️'));
+    return marcador;
+}
+"""
 
 @dataclass
 class PontoTransporte:
@@ -38,9 +56,17 @@ class SistemaVermelhinho:
     """Sistema do Vermelinho - Backend"""
     
     def __init__(self):
-        self.pontos: Dict[str, PontoTransporte] = {}
+        # Mesma tabela compacta do backend; a descrição vai na coluna de endereço
+        self.pontos = TabelaPontos()
         self.grafo = nx.Graph()
+        # Mapa base reaproveitado enquanto a rede não mudar
+        self.versao_rede = 0
+        self.cache_mapas = CacheMapas()
         self.configurar_dados_marica()
+    
+    def marcar_rede_alterada(self):
+        """Avisa que pontos ou conexões mudaram (invalida o mapa base)"""
+        self.versao_rede += 1
         
     def configurar_dados_marica(self):
         """Configura dados reais de Maricá"""
@@ -200,15 +226,39 @@ class SistemaVermelhinho:
         return detalhes
     
     def criar_mapa_interativo(self, caminho: List[str] = None) -> str:
-        """Cria mapa interativo usando Folium"""
+        """
+        Retorna o mapa interativo (Folium), com a rota se fornecida
+        
+        O mapa base é montado uma vez por versão da rede; a rota entra como
+        uma camada GeoJSON sobre uma cópia dele, gravada em mapa/ e
+        reaproveitada enquanto estiver no cache.
+        
+        Returns:
+            Caminho do arquivo HTML ou None se o Folium não estiver instalado
+        """
         if not FOLIUM_DISPONIVEL:
             return None
+        
+        pontos_rota = [(self.pontos[ponto_id].latitude, self.pontos[ponto_id].longitude, self.pontos[ponto_id].nome)
+                       for ponto_id in (caminho or []) if ponto_id in self.pontos]
+        if len(pontos_rota) > 1:
+            return self.cache_mapas.mapa_rota(self.versao_rede, self._construir_mapa_base,
+                                              list(caminho), geojson_rota(pontos_rota))
+        return self.cache_mapas.mapa_base(self.versao_rede, self._construir_mapa_base)
+    
+    def _construir_mapa_base(self) -> Tuple[str, str]:
+        """Monta o mapa Folium com todos os pontos; devolve (HTML, variável JS do mapa)"""
+        import folium
+        from folium.plugins import FastMarkerCluster, Fullscreen, MiniMap
+        
+        agrupar = len(self.pontos) > LIMITE_MARCADORES_INDIVIDUAIS
             
-        # Centro do mapa em Maricá
+        # Centro do mapa em Maricá (canvas em vez de SVG para redes grandes)
         mapa = folium.Map(
             location=[-22.9400, -42.8400],
             zoom_start=11,
-            tiles=None
+            tiles=None,
+            prefer_canvas=agrupar
         )
         
         # Adicionar camadas de mapa
@@ -235,56 +285,34 @@ class SistemaVermelhinho:
             'parque': {'cor': 'darkgreen', 'icone': 'tree'}
         }
         
-        # Adicionar pontos
-        for ponto_id, ponto in self.pontos.items():
-            config = config_tipos.get(ponto.tipo, {'cor': 'gray', 'icone': 'info-sign'})
-            
-            popup_html = f"""
-            <div style="width: 300px;">
-                <h3 style="color: {config['cor']};">🚌 {ponto.nome}</h3>
-                <p><strong>Tipo:</strong> {ponto.tipo.title()}</p>
-                <p><strong>Acessibilidade:</strong> 
-                {'<span style="color: green;">✅ Acessível</span>' if ponto.acessivel else '<span style="color: red;">⚠️ Limitado</span>'}</p>
-                <p><strong>Descrição:</strong> {ponto.descricao}</p>
-                <p><strong>Coordenadas:</strong> {ponto.latitude:.6f}, {ponto.longitude:.6f}</p>
-            </div>
-            """
+        # Adicionar pontos. Redes grandes: um único array, agrupado por zoom
+        # no navegador; redes pequenas: um marcador com popup completo por ponto
+        if agrupar:
+            dados = [[ponto.latitude, ponto.longitude, ponto.nome,
+                      config_tipos.get(ponto.tipo, {'cor': 'gray'})['cor'], ponto.acessivel]
+                     for ponto in self.pontos.values()]
+            FastMarkerCluster(dados, callback=CALLBACK_PONTO_AGRUPADO,
+                              name='🚏 Pontos de ônibus').add_to(mapa)
+        else:
+            for ponto_id, ponto in self.pontos.items():
+                config = config_tipos.get(ponto.tipo, {'cor': 'gray', 'icone': 'info-sign'})
             
-            folium.Marker(
-                location=[ponto.latitude, ponto.longitude],
-                popup=folium.Popup(popup_html, max_width=320),
-                tooltip=f"🚌 {ponto.nome}",
-                icon=folium.Icon(color=config['cor'], icon=config['icone'], prefix='fa')
-            ).add_to(mapa)
-        
-        # Adicionar rota se fornecida
-        if caminho and len(caminho) > 1:
-            coordenadas_rota = []
-            for ponto_id in caminho:
-                if ponto_id in self.pontos:
-                    ponto = self.pontos[ponto_id]
-                    coordenadas_rota.append([ponto.latitude, ponto.longitude])
+                popup_html = f"""
+                <div style="width: 300px;">
+                    <h3 style="color: {config['cor']};">🚌 {ponto.nome}</h3>
+                    <p><strong>Tipo:</strong> {ponto.tipo.title()}</p>
+                    <p><strong>Acessibilidade:</strong> 
+                    {'<span style="color: green;">✅ Acessível</span>' if ponto.acessivel else '<span style="color: red;">⚠️ Limitado</span>'}</p>
+                    <p><strong>Descrição:</strong> {ponto.descricao}</p>
+                    <p><strong>Coordenadas:</strong> {ponto.latitude:.6f}, {ponto.longitude:.6f}</p>
+                </div>
+                """
             
-            if coordenadas_rota:
-                folium.PolyLine(
-                    locations=coordenadas_rota,
-                    color='red',
-                    weight=6,
-                    opacity=0.9,
-                    popup='🚌 Rota Mais Rápida do Vermelinho'
-                ).add_to(mapa)
-                
-                # Marcadores de origem e destino
                 folium.Marker(
-                    location=coordenadas_rota[0],
-                    popup='🏁 ORIGEM',
-                    icon=folium.Icon(color='green', icon='play', prefix='fa')
-                ).add_to(mapa)
-                
-                folium.Marker(
-                    location=coordenadas_rota[-1],
-                    popup='🎯 DESTINO',
-                    icon=folium.Icon(color='red', icon='flag-checkered', prefix='fa')
+                    location=[ponto.latitude, ponto.longitude],
+                    popup=folium.Popup(popup_html, max_width=320),
+                    tooltip=f"🚌 {ponto.nome}",
+                    icon=folium.Icon(color=config['cor'], icon=config['icone'], prefix='fa')
                 ).add_to(mapa)
         
         # Adicionar plugins
@@ -292,12 +320,7 @@ class SistemaVermelhinho:
         MiniMap(toggle_display=True).add_to(mapa)
         folium.LayerControl().add_to(mapa)
         
-        # Salvar mapa
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo = f"mapa_vermelinho_{timestamp}.html"
-        mapa.save(nome_arquivo)
-        
-        return nome_arquivo
+        return mapa.get_root().render(), mapa.get_name()
 
 class InterfaceProfissional:
     """Interface Gráfica Profissional"""
@@ -520,6 +543,10 @@ class InterfaceProfissional:
                                     fg='white', bg='#34495E')
         self.status_label.pack(side=tk.LEFT, padx=10, pady=5)
         
+        # Perfil das pilhas sob demanda (ver perfilador.py)
+        self.btn_perfil = botao_perfil(self.root, self.status_frame, self.status_label)
+        self.btn_perfil.pack(side=tk.LEFT, padx=10)
+        
         # Data e hora
         self.data_label = tk.Label(self.status_frame,
                                   text=datetime.now().strftime("📅 %d/%m/%Y %H:%M"),
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+🗃️ TABELA DE PONTOS - SISTEMA VERMELINHO
+Busync - Armazenamento compacto (struct-of-arrays) dos pontos de ônibus
+
+Salve como: tabela_pontos.py
+"""
+
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# Capacidade inicial das colunas; dobra sempre que enche
+CAPACIDADE_INICIAL = 64
+
+
+class VistaPonto:
+    """
+    Visão leve de uma linha da TabelaPontos
+
+    Expõe os mesmos atributos de PontoOnibus (id, nome, endereco, latitude,
+    longitude, acessivel, tipo, linhas) sem guardar dados próprios: cada
+    acesso lê as colunas da tabela. ``linhas`` devolve uma lista nova.
+    """
+
+    __slots__ = ('_tabela', '_indice')
+
+    def __init__(self, tabela: 'TabelaPontos', indice: int):
+        self._tabela = tabela
+        self._indice = indice
+
+    @property
+    def indice(self) -> int:
+        return self._indice
+
+    @property
+    def id(self) -> str:
+        return self._tabela._ids[self._indice]
+
+    @property
+    def nome(self) -> str:
+        return self._tabela._textos[self._tabela._nome[self._indice]]
+
+    @property
+    def endereco(self) -> str:
+        return self._tabela._textos[self._tabela._endereco[self._indice]]
+
+    @property
+    def descricao(self) -> str:
+        """Alias de endereco usado pelos pontos da interface (sistema_transporte)"""
+        return self.endereco
+
+    @property
+    def latitude(self) -> float:
+        return float(self._tabela._lat[self._indice])
+
+    @property
+    def longitude(self) -> float:
+        return float(self._tabela._lon[self._indice])
+
+    @property
+    def acessivel(self) -> bool:
+        return bool(self._tabela._acessivel[self._indice])
+
+    @property
+    def tipo(self) -> str:
+        return self._tabela._tipos[self._tabela._tipo[self._indice]]
+
+    @property
+    def linhas(self) -> List[str]:
+        return self._tabela.linhas_do_indice(self._indice)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, VistaPonto):
+            return NotImplemented
+        return self._tabela is outro._tabela and self._indice == outro._indice
+
+    def __hash__(self):
+        return hash((id(self._tabela), self._indice))
+
+    def __repr__(self):
+        return (f"VistaPonto(id={self.id!r}, nome={self.nome!r}, endereco={self.endereco!r}, "
+                f"latitude={self.latitude}, longitude={self.longitude}, acessivel={self.acessivel}, "
+                f"tipo={self.tipo!r}, linhas={self.linhas!r})")
+
+
+class TabelaPontos(Mapping):
+    """
+    Tabela de pontos em colunas paralelas
+
+    - latitude/longitude/acessibilidade/código do tipo em arrays NumPy
+    - nome e endereço como índices de uma tabela de textos internados
+    - linhas de cada ponto em formato CSR (ponteiros + índices de linhas)
+
+    Implementa a interface de dicionário somente leitura (``pontos[id]``,
+    ``in``, ``len``, ``items()``, ``values()``) devolvendo VistaPonto, e
+    aceita ``pontos[id] = PontoOnibus(...)`` para manter o código de
+    construção existente funcionando.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_INICIAL):
+        self._total = 0
+        self._ids: List[str] = []
+        self._indice: Dict[str, int] = {}
+
+        capacidade = max(1, capacidade)
+        self._lat = np.empty(capacidade, dtype=np.float64)
+        self._lon = np.empty(capacidade, dtype=np.float64)
+        self._acessivel = np.empty(capacidade, dtype=np.bool_)
+        self._tipo = np.empty(capacidade, dtype=np.uint8)
+        self._nome = np.empty(capacidade, dtype=np.int32)
+        self._endereco = np.empty(capacidade, dtype=np.int32)
+
+        # Textos internados (nomes e endereços se repetem muito)
+        self._textos: List[str] = []
+        self._indice_textos: Dict[str, int] = {}
+
+        # Tipos de ponto (parada, terminal, ...) codificados em uint8
+        self._tipos: List[str] = []
+        self._indice_tipos: Dict[str, int] = {}
+
+        # Linhas: vínculos pendentes e a forma compacta CSR
+        self._linhas: List[str] = []
+        self._indice_linhas: Dict[str, int] = {}
+        self._pares_ponto = array('i')
+        self._pares_linha = array('i')
+        self._linhas_ptr = np.zeros(1, dtype=np.int32)
+        self._linhas_idx = np.zeros(0, dtype=np.int32)
+        self._csr_sujo = False
+        self._trava = threading.Lock()
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_trava']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+
+    # ----------------------------------------------------------- construção
+
+    @classmethod
+    def de_pontos(cls, pontos) -> 'TabelaPontos':
+        """Cria a tabela a partir de um iterável de objetos com atributos de PontoOnibus"""
+        pontos = list(pontos)
+        tabela = cls(capacidade=len(pontos))
+        for ponto in pontos:
+            tabela[ponto.id] = ponto
+        tabela.compactar()
+        return tabela
+
+    def _internar(self, texto: str) -> int:
+        """Retorna o índice do texto na tabela de textos, inserindo se necessário"""
+        indice = self._indice_textos.get(texto)
+        if indice is None:
+            indice = self._indice_textos[texto] = len(self._textos)
+            self._textos.append(texto)
+        return indice
+
+    def _codigo_tipo(self, tipo: str) -> int:
+        """Retorna o código numérico do tipo de ponto"""
+        codigo = self._indice_tipos.get(tipo)
+        if codigo is None:
+            if len(self._tipos) > np.iinfo(np.uint8).max:
+                raise ValueError("A tabela suporta no máximo 256 tipos de ponto")
+            codigo = self._indice_tipos[tipo] = len(self._tipos)
+            self._tipos.append(tipo)
+        return codigo
+
+    def _garantir_capacidade(self, necessaria: int):
+        """Dobra as colunas quando não há espaço para mais pontos"""
+        capacidade = len(self._lat)
+        if necessaria <= capacidade:
+            return
+        while capacidade < necessaria:
+            capacidade *= 2
+        for nome in ('_lat', '_lon', '_acessivel', '_tipo', '_nome', '_endereco'):
+            antiga = getattr(self, nome)
+            nova = np.empty(capacidade, dtype=antiga.dtype)
+            nova[:self._total] = antiga[:self._total]
+            setattr(self, nome, nova)
+
+    def adicionar(self, id: str, nome: str, endereco: str = "", latitude: float = -22.9194,
+                  longitude: float = -42.8186, acessivel: bool = True, tipo: str = "parada") -> int:
+        """
+        Adiciona (ou sobrescreve) um ponto
+
+        Returns:
+            Índice do ponto na tabela
+        """
+        indice = self._indice.get(id)
+        if indice is None:
+            indice = self._total
+            self._garantir_capacidade(indice + 1)
+            self._ids.append(id)
+            self._indice[id] = indice
+            self._total += 1
+            self._csr_sujo = True
+
+        self._lat[indice] = latitude
+        self._lon[indice] = longitude
+        self._acessivel[indice] = acessivel
+        self._tipo[indice] = self._codigo_tipo(tipo)
+        self._nome[indice] = self._internar(nome)
+        self._endereco[indice] = self._internar(endereco or nome)
+        return indice
+
+    def __setitem__(self, ponto_id: str, ponto):
+        """Aceita PontoOnibus, PontoTransporte ou qualquer objeto com os mesmos atributos"""
+        endereco = getattr(ponto, 'endereco', None) or getattr(ponto, 'descricao', "")
+        self.adicionar(ponto_id, ponto.nome, endereco, ponto.latitude, ponto.longitude,
+                       ponto.acessivel, ponto.tipo)
+        for linha_id in getattr(ponto, 'linhas', None) or []:
+            self.vincular_linha(ponto_id, linha_id)
+
+    def vincular_linha(self, ponto_id: str, linha_id: str):
+        """
+        Registra que a linha passa pelo ponto
+
+        Vínculos repetidos são descartados na compactação, mantendo a ordem
+        da primeira ocorrência (mesmo comportamento da antiga lista por ponto).
+        """
+        codigo = self._indice_linhas.get(linha_id)
+        if codigo is None:
+            codigo = self._indice_linhas[linha_id] = len(self._linhas)
+            self._linhas.append(linha_id)
+        self._pares_ponto.append(self._indice[ponto_id])
+        self._pares_linha.append(codigo)
+        self._csr_sujo = True
+
+    def compactar(self):
+        """Monta o CSR ponto -> linhas a partir dos vínculos registrados"""
+        with self._trava:
+            if not self._csr_sujo:
+                return
+
+            pontos = np.frombuffer(self._pares_ponto, dtype=np.int32) if self._pares_ponto else np.zeros(0, np.int32)
+            linhas = np.frombuffer(self._pares_linha, dtype=np.int32) if self._pares_linha else np.zeros(0, np.int32)
+
+            # Remove vínculos repetidos preservando a ordem de inserção
+            chaves = pontos.astype(np.int64) * max(1, len(self._linhas)) + linhas
+            _, primeiros = np.unique(chaves, return_index=True)
+            primeiros.sort()
+            pontos, linhas = pontos[primeiros], linhas[primeiros]
+
+            ordem = np.argsort(pontos, kind='stable')
+            ponteiros = np.zeros(self._total + 1, dtype=np.int32)
+            np.cumsum(np.bincount(pontos, minlength=self._total), out=ponteiros[1:])
+
+            self._linhas_ptr = ponteiros
+            self._linhas_idx = linhas[ordem].astype(np.int32)
+            self._pares_ponto = array('i', pontos.tobytes())
+            self._pares_linha = array('i', linhas.tobytes())
+            self._csr_sujo = False
+
+    # -------------------------------------------------------------- leitura
+
+    def __getitem__(self, ponto_id: str) -> VistaPonto:
+        return VistaPonto(self, self._indice[ponto_id])
+
+    def __contains__(self, ponto_id) -> bool:
+        return ponto_id in self._indice
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def indice(self, ponto_id: str) -> int:
+        """Índice numérico do ponto (posição nas colunas)"""
+        return self._indice[ponto_id]
+
+    def id_do_indice(self, indice: int) -> str:
+        """ID do ponto na posição indicada"""
+        return self._ids[indice]
+
+    def vista(self, indice: int) -> VistaPonto:
+        """Visão do ponto na posição indicada"""
+        return VistaPonto(self, indice)
+
+    def linhas_do_indice(self, indice: int) -> List[str]:
+        """Linhas que passam pelo ponto na posição indicada"""
+        if self._csr_sujo:
+            self.compactar()
+        inicio, fim = self._linhas_ptr[indice], self._linhas_ptr[indice + 1]
+        return [self._linhas[codigo] for codigo in self._linhas_idx[inicio:fim]]
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        """Coluna de latitudes (visão somente dos pontos existentes)"""
+        return self._lat[:self._total]
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        """Coluna de longitudes"""
+        return self._lon[:self._total]
+
+    @property
+    def acessiveis(self) -> np.ndarray:
+        """Coluna de acessibilidade"""
+        return self._acessivel[:self._total]
+
+    @property
+    def codigos_tipo(self) -> np.ndarray:
+        """Coluna com o código do tipo de cada ponto"""
+        return self._tipo[:self._total]
+
+    @property
+    def tipos(self) -> List[str]:
+        """Tipos conhecidos, na ordem dos códigos"""
+        return list(self._tipos)
+
+    def total_acessiveis(self) -> int:
+        """Quantidade de pontos acessíveis"""
+        return int(self.acessiveis.sum())
+
+    def contagem_tipos(self) -> Dict[str, int]:
+        """Quantidade de pontos por tipo"""
+        contagem = np.bincount(self.codigos_tipo, minlength=len(self._tipos))
+        return {tipo: int(contagem[codigo]) for codigo, tipo in enumerate(self._tipos) if contagem[codigo]}
+
+    def memoria_bytes(self, detalhado: bool = False):
+        """
+        Estima a memória ocupada pelas colunas, textos e CSR
+
+        Args:
+            detalhado: Se True, retorna um dicionário por componente
+        """
+        colunas = sum(getattr(self, nome)[:self._total].nbytes
+                      for nome in ('_lat', '_lon', '_acessivel', '_tipo', '_nome', '_endereco'))
+        textos = sum(sys.getsizeof(texto) for texto in self._textos) + sys.getsizeof(self._textos)
+        ids = sum(sys.getsizeof(i) for i in self._ids) + sys.getsizeof(self._ids) + sys.getsizeof(self._indice)
+        csr = self._linhas_ptr.nbytes + self._linhas_idx.nbytes + \
+            self._pares_ponto.buffer_info()[1] * self._pares_ponto.itemsize * 2
+
+        partes = {'colunas': colunas, 'textos': textos, 'ids': ids, 'linhas_csr': csr}
+        return partes if detalhado else sum(partes.values())
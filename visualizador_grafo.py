@@ -6,14 +6,66 @@ BuSync - Visualização da rede de transporte com Matplotlib
 Salve como: visualizador_grafo.py
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch
 import networkx as nx
 import numpy as np
 from typing import List, Dict, Optional, Tuple
-import tkinter as tk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from importacao_preguicosa import ModuloPreguicoso
+
+# Dependências de visualização carregadas apenas no primeiro uso
+plt = ModuloPreguicoso('matplotlib.pyplot')
+patches = ModuloPreguicoso('matplotlib.patches')
+tk = ModuloPreguicoso('tkinter')
+backend_tkagg = ModuloPreguicoso('matplotlib.backends.backend_tkagg')
+collections = ModuloPreguicoso('matplotlib.collections')
+cores = ModuloPreguicoso('matplotlib.colors')
+markers = ModuloPreguicoso('matplotlib.markers')
+artist = ModuloPreguicoso('matplotlib.artist')
+
+# Estilo das arestas por tipo: (cor, largura, transparência). Arestas de
+# linha usam a cor de VisualizadorGrafo.cores_linhas quando houver.
+ESTILOS_ARESTA = {
+    'linha': ('#666666', 1.0, 0.5),
+    'compartilhada': ('#555555', 1.5, 0.5),
+    'integracao': ('#888888', 1.0, 0.4),
+}
+
+# Estilo dos nós por tipo de ponto: (cor, tamanho, marcador)
+ESTILOS_PONTO = {
+    'terminal': ('#4169E1', 500, '^'),
+    'padrao': ('#87CEEB', 200, 'o'),
+}
+
+# Nível de detalhe: acima deste número de pontos visíveis, a vista mostra
+# agrupamentos em grade em vez de pontos individuais
+LIMITE_PONTOS_DETALHE = 1500
+
+# Células da grade de agrupamento na largura da vista
+CELULAS_POR_VISTA = 48
+
+# Nomes de terminais só a partir deste zoom e até este número na vista
+ZOOM_ROTULOS = 1.0
+LIMITE_ROTULOS = 40
+
+# Limites da vista completa (coordenadas de calcular_posicoes)
+LIMITES_PADRAO = ((-0.5, 10.5), (-0.5, 8.5))
+
+def _gatilho_desenho(funcao):
+    """
+    Artista invisível da figura que chama ``funcao`` no início de cada desenho
+
+    Com o menor zorder da figura, é desenhado antes dos eixos, então o que
+    ``funcao`` alterar nos eixos (inclusive artistas novos) já entra no
+    mesmo desenho.
+    """
+    class Gatilho(artist.Artist):
+        def draw(self, renderer):
+            funcao()
+
+    gatilho = Gatilho()
+    gatilho.set_zorder(float('-inf'))
+    gatilho.set_in_layout(False)
+    return gatilho
 
 class VisualizadorGrafo:
     """Classe para visualizar o grafo do sistema de transporte"""
@@ -31,6 +83,18 @@ class VisualizadorGrafo:
         self.fig = None
         self.ax = None
         self.pos = None
+        # Camada da rota destacada (artistas animados, desenhados por blitting)
+        self._destaque = None
+        self._artistas_rota = []
+        self._fundo = None
+        self._salvando = False
+        # Cor opcional por linha (ID da linha -> cor) para as arestas
+        self.cores_linhas: Dict[str, str] = {}
+        self._geometria = None
+        # Ícone e nome de cada terminal, criados só quando aparecem na vista
+        self._rotulos: Dict[int, tuple] = {}
+        # Vista em que o nível de detalhe foi calculado pela última vez
+        self._vista_detalhe: Optional[Tuple[float, float, float, float]] = None
         self.calcular_posicoes()
         
     def calcular_posicoes(self):
@@ -50,16 +114,59 @@ class VisualizadorGrafo:
             x = (ponto.longitude - lon_min) / (lon_max - lon_min) * 10
             y = (lat_max - ponto.latitude) / (lat_max - lat_min) * 8
             self.pos[ponto_id] = (x, y)
+        self._geometria = None
+    
+    def geometria(self) -> Dict[str, np.ndarray]:
+        """
+        Coordenadas da rede em arrays NumPy, montadas uma vez a partir de self.pos
+        
+        Returns:
+            Dicionário com 'ids', 'xy' (N x 2), 'tipo_ponto' e 'terminal' (N), 'extremos'
+            (E x 2, índices dos pontos), 'segmentos' (E x 2 x 2), 'tipo_aresta'
+            e 'linha_aresta' (um rótulo por aresta)
+        """
+        if self._geometria is None:
+            ids = list(self.pos)
+            indice = {ponto_id: i for i, ponto_id in enumerate(ids)}
+            xy = np.array([self.pos[ponto_id] for ponto_id in ids], dtype=np.float64).reshape(-1, 2)
+            
+            origens, destinos, tipos, linhas = [], [], [], []
+            for u, v, dados in self.grafo.edges(data=True):
+                origens.append(indice[u])
+                destinos.append(indice[v])
+                tipos.append(dados.get('tipo', 'linha'))
+                linhas.append(dados.get('linha', ''))
+            extremos = np.array([origens, destinos], dtype=np.int64).T.reshape(-1, 2)
+            
+            geometria = {
+                'ids': ids,
+                'xy': xy,
+                'tipo_ponto': np.array([self.pontos[ponto_id].tipo for ponto_id in ids], dtype=object),
+                'extremos': extremos,
+                'segmentos': xy[extremos],
+                'tipo_aresta': np.array(tipos, dtype=object),
+                'linha_aresta': np.array(linhas, dtype=object),
+            }
+            geometria['terminal'] = geometria['tipo_ponto'] == "terminal"
+            self._geometria = geometria
+        return self._geometria
     
     def criar_visualizacao(self, rota_destacada: Optional[List[str]] = None, 
                           tamanho_figura: Tuple[int, int] = (16, 12)):
         """
         Cria a visualização do grafo
         
+        A rede (áreas, arestas, nós, legenda e estatísticas) é desenhada uma
+        única vez; a rota fica em uma camada separada, trocada depois por
+        destacar_rota sem redesenhar a rede.
+        
         Args:
             rota_destacada: Lista de IDs dos pontos da rota a destacar
             tamanho_figura: Tupla (largura, altura) da figura
         """
+        if self.fig is not None:
+            plt.close(self.fig)
+        
         # Criar figura
         self.fig, self.ax = plt.subplots(figsize=tamanho_figura)
         self.fig.patch.set_facecolor('#f0f0f0')
@@ -71,29 +178,45 @@ class VisualizadorGrafo:
         
         # Desenhar componentes
         self._desenhar_areas_geograficas()
-        self._desenhar_arestas(rota_destacada)
-        self._desenhar_nos(rota_destacada)
+        self._desenhar_arestas()
+        self._desenhar_nos()
         self._adicionar_legenda()
         self._adicionar_estatisticas()
+        self._criar_camada_destaque()
         
         # Ajustes finais
-        self.ax.set_xlim(-0.5, 10.5)
-        self.ax.set_ylim(-0.5, 8.5)
+        self.ax.set_xlim(*LIMITES_PADRAO[0])
+        self.ax.set_ylim(*LIMITES_PADRAO[1])
         self.ax.axis('off')
         
         plt.tight_layout()
         
+        # Nível de detalhe de acordo com o zoom: recalculado no início do
+        # desenho, não a cada set_xlim/set_ylim (um zoom muda os dois)
+        self._rotulos = {}
+        self._vista_detalhe = None
+        self._atualizar_nivel_detalhe()
+        self.fig.add_artist(_gatilho_desenho(self._atualizar_nivel_detalhe))
+        self.fig.canvas.mpl_connect('scroll_event', self._ao_rolar)
+        
+        # O fundo (rede sem rota) é capturado a cada desenho completo
+        self._fundo = None
+        self.fig.canvas.mpl_connect('draw_event', self._ao_desenhar)
+        
+        if rota_destacada:
+            self.destacar_rota(rota_destacada)
+        
     def _desenhar_areas_geograficas(self):
         """Desenha áreas geográficas de fundo"""
         # Área do mar (direita - leste)
-        mar = FancyBboxPatch((9, -0.5), 2, 9, 
+        mar = patches.FancyBboxPatch((9, -0.5), 2, 9, 
                              boxstyle="round,pad=0.1",
                              facecolor='#87CEEB', alpha=0.3,
                              edgecolor='none')
         self.ax.add_patch(mar)
         self.ax.text(10, 8, '🌊 OCEANO\nATLÂNTICO', 
                     ha='center', va='top', fontsize=10,
-                    style='italic', alpha=0.6)
+                    style='italic', alpha=0.6, clip_on=True)
         
         # Áreas dos bairros principais
         areas = [
@@ -106,118 +229,309 @@ class VisualizadorGrafo:
         ]
         
         for x, y, w, h, cor, nome in areas:
-            area = FancyBboxPatch((x, y), w, h,
+            area = patches.FancyBboxPatch((x, y), w, h,
                                  boxstyle="round,pad=0.1",
                                  facecolor=cor, alpha=0.2,
                                  edgecolor='gray', linestyle='--')
             self.ax.add_patch(area)
             self.ax.text(x + w/2, y + h - 0.2, nome,
                         ha='center', va='top', fontsize=9,
-                        style='italic', alpha=0.7)
+                        style='italic', alpha=0.7, clip_on=True)
     
-    def _desenhar_arestas(self, rota_destacada: Optional[List[str]] = None):
-        """Desenha as arestas (conexões) do grafo"""
-        # Preparar arestas da rota se houver
-        arestas_rota = set()
-        if rota_destacada:
-            for i in range(len(rota_destacada) - 1):
-                arestas_rota.add((rota_destacada[i], rota_destacada[i + 1]))
-                arestas_rota.add((rota_destacada[i + 1], rota_destacada[i]))
-        
-        # Desenhar todas as arestas
-        for (u, v, data) in self.grafo.edges(data=True):
-            x1, y1 = self.pos[u]
-            x2, y2 = self.pos[v]
-            
-            # Verificar se é aresta da rota
-            if (u, v) in arestas_rota:
-                cor = '#FF0000'
-                largura = 4
-                alpha = 1.0
-                zorder = 10
-                # Adicionar seta para indicar direção
-                self.ax.annotate('', xy=(x2, y2), xytext=(x1, y1),
-                               arrowprops=dict(arrowstyle='->', lw=largura,
-                                             color=cor, alpha=alpha),
-                               zorder=zorder)
-            else:
-                cor = '#666666'
-                largura = 1
-                alpha = 0.5
-                zorder = 1
-                self.ax.plot([x1, x2], [y1, y2], 
-                           color=cor, linewidth=largura, 
-                           alpha=alpha, zorder=zorder)
-            
-            # Adicionar tempo de viagem no meio da aresta (apenas para rotas)
-            if (u, v) in arestas_rota and 'weight' in data:
-                xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
-                self.ax.text(xm, ym, f"{data['weight']}'", 
-                           ha='center', va='center',
-                           bbox=dict(boxstyle="round,pad=0.3", 
-                                   facecolor='yellow', alpha=0.8),
-                           fontsize=8, zorder=15)
-    
-    def _desenhar_nos(self, rota_destacada: Optional[List[str]] = None):
-        """Desenha os nós (pontos de parada) do grafo"""
-        # Preparar nós da rota
-        nos_rota = set(rota_destacada) if rota_destacada else set()
-        
-        for ponto_id, (x, y) in self.pos.items():
-            ponto = self.pontos[ponto_id]
-            
-            # Definir aparência baseada no tipo e se está na rota
-            if ponto_id in nos_rota:
-                if rota_destacada and ponto_id == rota_destacada[0]:
-                    cor = '#00FF00'  # Verde para origem
-                    tamanho = 1000
-                    marcador = 'o'
-                    borda = 'darkgreen'
-                elif rota_destacada and ponto_id == rota_destacada[-1]:
-                    cor = '#FF0000'  # Vermelho para destino
-                    tamanho = 1000
-                    marcador = 's'
-                    borda = 'darkred'
-                else:
-                    cor = '#FFA500'  # Laranja para intermediários
-                    tamanho = 600
-                    marcador = 'o'
-                    borda = 'darkorange'
-                zorder = 20
-            else:
-                # Cor baseada no tipo
-                if ponto.tipo == "terminal":
-                    cor = '#4169E1'
-                    tamanho = 500
-                    marcador = '^'
-                else:
-                    cor = '#87CEEB'
-                    tamanho = 200
-                    marcador = 'o'
-                borda = 'black'
-                zorder = 5
-            
-            # Desenhar nó
-            self.ax.scatter(x, y, c=cor, s=tamanho, marker=marcador,
-                          edgecolors=borda, linewidths=2, zorder=zorder)
-            
-            # Adicionar ícone para terminais
-            if ponto.tipo == "terminal":
-                self.ax.text(x, y, '🚌', ha='center', va='center',
-                           fontsize=12, zorder=zorder + 1)
+    def _desenhar_arestas(self):
+        """Desenha todas as arestas (conexões) em uma única LineCollection"""
+        geometria = self.geometria()
+        
+        # Um código de estilo por aresta (tipo, ou linha com cor própria);
+        # cores e larguras saem de uma tabela pequena indexada pelo código
+        chaves = [linha if tipo == 'linha' and linha in self.cores_linhas else tipo
+                  for tipo, linha in zip(geometria['tipo_aresta'], geometria['linha_aresta'])]
+        estilos = {chave: codigo for codigo, chave in enumerate(dict.fromkeys(chaves))}
+        codigos = np.fromiter((estilos[chave] for chave in chaves), dtype=np.int64, count=len(chaves))
+        
+        tabela_cor = np.zeros((len(estilos), 4))
+        tabela_largura = np.zeros(len(estilos))
+        for chave, codigo in estilos.items():
+            cor, largura, alpha = ESTILOS_ARESTA.get(chave, ESTILOS_ARESTA['linha'])
+            tabela_cor[codigo] = cores.to_rgba(self.cores_linhas.get(chave, cor), alpha)
+            tabela_largura[codigo] = largura
+        
+        # Os segmentos visíveis são preenchidos pelo nível de detalhe
+        self._cores_arestas = tabela_cor[codigos]
+        self._larguras_arestas = tabela_largura[codigos]
+        self.arestas = collections.LineCollection([], zorder=1)
+        self.ax.add_collection(self.arestas, autolim=False)
+        
+        # Conexões agrupadas (vista afastada)
+        self.arestas_agrupadas = collections.LineCollection([], colors='#666666', alpha=0.6, zorder=1)
+        self.ax.add_collection(self.arestas_agrupadas, autolim=False)
+    
+    def _desenhar_nos(self):
+        """Desenha todos os nós (pontos de parada) em um único scatter"""
+        geometria = self.geometria()
+        
+        # Tabela de estilo por tipo de ponto, indexada por um código por ponto
+        tipos, codigos = np.unique(geometria['tipo_ponto'].astype(str), return_inverse=True)
+        estilos = [ESTILOS_PONTO.get(tipo, ESTILOS_PONTO['padrao']) for tipo in tipos]
+        
+        # Um marcador por ponto: o PathCollection aceita um path para cada offset
+        caminhos = np.empty(len(estilos), dtype=object)
+        for codigo, (_, _, marcador) in enumerate(estilos):
+            estilo = markers.MarkerStyle(marcador)
+            caminhos[codigo] = estilo.get_path().transformed(estilo.get_transform())
+        
+        # Os pontos visíveis são preenchidos pelo nível de detalhe
+        self._cores_nos = np.array([cores.to_rgba(cor) for cor, _, _ in estilos]).reshape(-1, 4)[codigos]
+        self._tamanhos_nos = np.array([tamanho for _, tamanho, _ in estilos], dtype=np.float64)[codigos]
+        self._caminhos_nos = caminhos[codigos]
+        self.nos = self.ax.scatter(np.empty(0), np.empty(0), edgecolors='black', linewidths=2, zorder=5)
+        
+        # Agrupamentos de pontos (vista afastada)
+        self.nos_agrupados = self.ax.scatter(np.empty(0), np.empty(0), marker='o',
+                                             edgecolors='black', linewidths=1, zorder=5)
+    
+    def _rotulo_ponto(self, ponto_id: str, zorder: int, animado: bool = False):
+        """Nome curto do ponto logo abaixo do nó"""
+        x, y = self.pos[ponto_id]
+        nome_curto = self.pontos[ponto_id].nome.split('(')[0].strip()
+        if len(nome_curto) > 15:
+            nome_curto = nome_curto[:12] + '...'
+        
+        return self.ax.text(x, y - 0.3, nome_curto,
+                          ha='center', va='top', fontsize=8,
+                          bbox=dict(boxstyle="round,pad=0.2",
+                                  facecolor='white', alpha=0.8),
+                          zorder=zorder, animated=animado, clip_on=True)
+    
+    # ------------------------------------------------- nível de detalhe
+    
+    def _vista(self) -> Tuple[float, float, float, float]:
+        """Limites atuais da vista: (x0, x1, y0, y1)"""
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        return x0, x1, y0, y1
+    
+    def _atualizar_nivel_detalhe(self):
+        """
+        Escolhe o nível de detalhe da vista atual
+        
+        Com poucos pontos visíveis, desenha só os pontos e arestas da vista;
+        com muitos, troca por agrupamentos em grade. Nos dois casos o número
+        de elementos desenhados fica limitado, não importa o tamanho da rede.
+        Chamado antes de cada desenho; se a vista não mudou, nada é refeito.
+        """
+        vista = self._vista()
+        if vista == self._vista_detalhe:
+            return
+        self._vista_detalhe = vista
+        geometria = self.geometria()
+        xy, segmentos = geometria['xy'], geometria['segmentos']
+        x0, x1, y0, y1 = vista
+        
+        visiveis = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+        self.detalhado = int(visiveis.sum()) <= LIMITE_PONTOS_DETALHE
+        
+        if self.detalhado:
+            # Arestas cuja caixa envolvente toca a vista
+            cruzam = ((segmentos[:, :, 0].max(axis=1) >= x0) & (segmentos[:, :, 0].min(axis=1) <= x1) &
+                      (segmentos[:, :, 1].max(axis=1) >= y0) & (segmentos[:, :, 1].min(axis=1) <= y1))
+            self.arestas.set_segments(segmentos[cruzam])
+            self.arestas.set_color(self._cores_arestas[cruzam])
+            self.arestas.set_linewidth(self._larguras_arestas[cruzam])
             
-            # Label do ponto (simplificado)
-            nome_curto = ponto.nome.split('(')[0].strip()
-            if len(nome_curto) > 15:
-                nome_curto = nome_curto[:12] + '...'
+            indices = np.flatnonzero(visiveis)
+            self.nos.set_offsets(xy[indices])
+            self.nos.set_facecolor(self._cores_nos[indices])
+            self.nos.set_sizes(self._tamanhos_nos[indices])
+            self.nos.set_paths(list(self._caminhos_nos[indices]))
             
-            # Mostrar nome apenas para pontos importantes ou na rota
-            if ponto.tipo == "terminal" or ponto_id in nos_rota:
-                self.ax.text(x, y - 0.3, nome_curto,
-                           ha='center', va='top', fontsize=8,
-                           bbox=dict(boxstyle="round,pad=0.2",
-                                   facecolor='white', alpha=0.8),
-                           zorder=zorder + 1)
+            self.arestas_agrupadas.set_segments([])
+            self.nos_agrupados.set_offsets(np.empty((0, 2)))
+        else:
+            self.arestas.set_segments([])
+            self.nos.set_offsets(np.empty((0, 2)))
+            self.nos.set_paths([])
+            self._agrupar(x0, x1, y0, y1)
+        
+        self._atualizar_rotulos(visiveis, x1 - x0)
+    
+    def _agrupar(self, x0: float, x1: float, y0: float, y1: float):
+        """Agrupa pontos em células da grade e funde arestas entre as mesmas células"""
+        geometria = self.geometria()
+        xy = geometria['xy']
+        tamanho = (x1 - x0) / CELULAS_POR_VISTA
+        
+        # Pontos da vista e de uma margem ao redor (para as arestas que saem dela)
+        largura, altura = x1 - x0, y1 - y0
+        perto = np.flatnonzero((xy[:, 0] >= x0 - largura) & (xy[:, 0] <= x1 + largura) &
+                               (xy[:, 1] >= y0 - altura) & (xy[:, 1] <= y1 + altura))
+        coluna = np.floor((xy[perto, 0] - x0) / tamanho).astype(np.int64)
+        linha = np.floor((xy[perto, 1] - y0) / tamanho).astype(np.int64)
+        coluna -= coluna.min(initial=0)
+        linha -= linha.min(initial=0)
+        chaves = coluna * (int(linha.max(initial=0)) + 1) + linha
+        _, grupo, contagem = np.unique(chaves, return_inverse=True, return_counts=True)
+        
+        centros = np.column_stack([np.bincount(grupo, weights=xy[perto, 0], minlength=len(contagem)),
+                                   np.bincount(grupo, weights=xy[perto, 1], minlength=len(contagem))])
+        centros /= np.maximum(contagem, 1)[:, None]
+        com_terminal = np.bincount(grupo, weights=geometria['terminal'][perto], minlength=len(contagem)) > 0
+        
+        cor_terminal, _, _ = ESTILOS_PONTO['terminal']
+        cor_padrao, _, _ = ESTILOS_PONTO['padrao']
+        self.nos_agrupados.set_offsets(centros)
+        self.nos_agrupados.set_sizes(np.minimum(40 + 25 * np.sqrt(contagem), 600))
+        self.nos_agrupados.set_facecolor(np.where(com_terminal[:, None],
+                                                  cores.to_rgba(cor_terminal), cores.to_rgba(cor_padrao)))
+        
+        # Arestas paralelas entre o mesmo par de células viram uma só
+        celula = np.full(len(xy), -1, dtype=np.int64)
+        celula[perto] = grupo
+        a, b = celula[geometria['extremos'][:, 0]], celula[geometria['extremos'][:, 1]]
+        validas = (a >= 0) & (b >= 0) & (a != b)
+        pares = np.column_stack([np.minimum(a[validas], b[validas]), np.maximum(a[validas], b[validas])])
+        pares, multiplicidade = np.unique(pares.reshape(-1, 2), axis=0, return_counts=True)
+        self.arestas_agrupadas.set_segments(centros[pares])
+        self.arestas_agrupadas.set_linewidth(np.minimum(0.5 + np.log2(multiplicidade), 5))
+    
+    def _atualizar_rotulos(self, visiveis: np.ndarray, largura_vista: float):
+        """Mostra nomes de terminais só com zoom suficiente e poucos na vista"""
+        geometria = self.geometria()
+        zoom = (LIMITES_PADRAO[0][1] - LIMITES_PADRAO[0][0]) / largura_vista
+        terminais = np.flatnonzero(visiveis & geometria['terminal'])
+        mostrar = set()
+        if self.detalhado and zoom >= ZOOM_ROTULOS and len(terminais) <= LIMITE_ROTULOS:
+            mostrar = set(terminais.tolist())
+        
+        for indice in mostrar - self._rotulos.keys():
+            ponto_id = geometria['ids'][indice]
+            x, y = self.pos[ponto_id]
+            icone = self.ax.text(x, y, '🚌', ha='center', va='center', fontsize=12, zorder=6, clip_on=True)
+            self._rotulos[indice] = (icone, self._rotulo_ponto(ponto_id, zorder=6))
+        for indice, textos in self._rotulos.items():
+            for texto in textos:
+                texto.set_visible(indice in mostrar)
+    
+    def _ao_rolar(self, evento):
+        """Zoom com a roda do mouse, centrado no cursor"""
+        if evento.inaxes is not self.ax or evento.xdata is None:
+            return
+        fator = 1 / 1.25 if evento.button == 'up' else 1.25
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        self.ax.set_xlim(evento.xdata - (evento.xdata - x0) * fator, evento.xdata + (x1 - evento.xdata) * fator)
+        self.ax.set_ylim(evento.ydata - (evento.ydata - y0) * fator, evento.ydata + (y1 - evento.ydata) * fator)
+        self.fig.canvas.draw_idle()
+    
+    def resetar_zoom(self):
+        """Volta para a vista completa da rede"""
+        if self.fig is None:
+            return
+        self.ax.set_xlim(*LIMITES_PADRAO[0])
+        self.ax.set_ylim(*LIMITES_PADRAO[1])
+        self.fig.canvas.draw_idle()
+    
+    # ------------------------------------------------- destaque da rota
+    
+    def _criar_camada_destaque(self):
+        """Cria (vazios) os artistas que mostram a rota sobre a rede"""
+        vazio = np.empty((0, 2))
+        linha, = self.ax.plot([], [], color='#FF0000', linewidth=4,
+                              zorder=10, animated=True)
+        self._destaque = {
+            'linha': linha,
+            'intermediarios': self.ax.scatter(vazio[:, 0], vazio[:, 1], c='#FFA500', s=600, marker='o',
+                                              edgecolors='darkorange', linewidths=2, zorder=20, animated=True),
+            'origem': self.ax.scatter(vazio[:, 0], vazio[:, 1], c='#00FF00', s=1000, marker='o',
+                                      edgecolors='darkgreen', linewidths=2, zorder=20, animated=True),
+            'destino': self.ax.scatter(vazio[:, 0], vazio[:, 1], c='#FF0000', s=1000, marker='s',
+                                       edgecolors='darkred', linewidths=2, zorder=20, animated=True),
+            'info': self.ax.text(0.02, 0.02, '', transform=self.ax.transAxes,
+                                 fontsize=10, verticalalignment='bottom',
+                                 horizontalalignment='left', family='monospace',
+                                 bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen',
+                                           alpha=0.9, edgecolor='darkgreen', linewidth=2),
+                                 visible=False, zorder=30, animated=True),
+        }
+        self._artistas_rota = []
+    
+    def destacar_rota(self, rota: Optional[List[str]] = None, info: Optional[str] = None):
+        """
+        Troca a rota destacada sem redesenhar a rede
+        
+        Só os artistas da rota (linha, nós, setas e rótulos) são atualizados
+        e desenhados por cima do fundo em cache (blitting).
+        
+        Args:
+            rota: Lista de IDs dos pontos da rota (None limpa o destaque)
+            info: Texto opcional da caixa de informações da rota
+        """
+        if self.fig is None:
+            self.criar_visualizacao()
+        
+        for artista in self._artistas_rota:
+            artista.remove()
+        self._artistas_rota = []
+        
+        rota = [ponto_id for ponto_id in (rota or []) if ponto_id in self.pos]
+        coordenadas = np.array([self.pos[ponto_id] for ponto_id in rota]).reshape(-1, 2)
+        self._destaque['linha'].set_data(coordenadas[:, 0], coordenadas[:, 1])
+        self._destaque['origem'].set_offsets(coordenadas[:1])
+        self._destaque['destino'].set_offsets(coordenadas[-1:] if len(rota) > 1 else coordenadas[:0])
+        self._destaque['intermediarios'].set_offsets(coordenadas[1:-1])
+        self._destaque['info'].set_text(info or '')
+        self._destaque['info'].set_visible(bool(info))
+        
+        for u, v in zip(rota, rota[1:]):
+            (x1, y1), (x2, y2) = self.pos[u], self.pos[v]
+            # Seta para indicar direção
+            self._artistas_rota.append(self.ax.annotate(
+                '', xy=(x2, y2), xytext=(x1, y1),
+                arrowprops=dict(arrowstyle='->', lw=4, color='#FF0000'),
+                zorder=10, animated=True, annotation_clip=True, clip_on=True))
+            # Tempo de viagem no meio da aresta
+            dados = self.grafo.get_edge_data(u, v) or {}
+            if 'weight' in dados:
+                self._artistas_rota.append(self.ax.text(
+                    (x1 + x2) / 2, (y1 + y2) / 2, f"{dados['weight']}'",
+                    ha='center', va='center',
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor='yellow', alpha=0.8),
+                    fontsize=8, zorder=15, animated=True, clip_on=True))
+        
+        # Nomes dos pontos da rota (terminais já têm rótulo na rede)
+        for ponto_id in rota:
+            if self.pontos[ponto_id].tipo != "terminal":
+                self._artistas_rota.append(self._rotulo_ponto(ponto_id, zorder=21, animado=True))
+        
+        self._blit()
+    
+    def _artistas_animados(self) -> list:
+        """Artistas da camada da rota, na ordem de desenho"""
+        artistas = list(self._destaque.values()) + self._artistas_rota
+        return sorted(artistas, key=lambda artista: artista.get_zorder())
+    
+    def _ao_desenhar(self, evento):
+        """Após um desenho completo: guarda o fundo e repõe a rota por cima"""
+        if self._salvando:
+            return
+        canvas = self.fig.canvas
+        if canvas.supports_blit:
+            self._fundo = canvas.copy_from_bbox(self.fig.bbox)
+        for artista in self._artistas_animados():
+            self.fig.draw_artist(artista)
+    
+    def _blit(self):
+        """Redesenha só a camada da rota sobre o fundo em cache"""
+        canvas = self.fig.canvas
+        if self._fundo is None or not canvas.supports_blit:
+            # Primeiro desenho (ou backend sem blit): desenho completo
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._fundo)
+        for artista in self._artistas_animados():
+            self.fig.draw_artist(artista)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
     
     def _adicionar_legenda(self):
         """Adiciona legenda ao gráfico"""
@@ -262,7 +576,7 @@ Conectividade: {'✅ Total' if stats['conectividade'] else '❌ Parcial'}"""
                     family='monospace')
     
     def visualizar_rota(self, origem: str, destino: str, 
-                       apenas_acessivel: bool = False) -> Optional[plt.Figure]:
+                       apenas_acessivel: bool = False) -> Optional['plt.Figure']:
         """
         Visualiza uma rota específica no grafo
         
@@ -281,8 +595,9 @@ Conectividade: {'✅ Total' if stats['conectividade'] else '❌ Parcial'}"""
             print(f"❌ Erro ao calcular rota: {resultado.get('erro', 'Desconhecido')}")
             return None
         
-        # Criar visualização com rota destacada
-        self.criar_visualizacao(rota_destacada=resultado['pontos'])
+        # Reaproveitar a rede já desenhada; só a rota muda
+        if self.fig is None:
+            self.criar_visualizacao()
         
         # Adicionar informações da rota
         info_rota = f"""🚌 ROTA CALCULADA
@@ -294,12 +609,7 @@ Distância: {resultado['distancia_estimada']:.1f} km
 Paradas: {resultado['numero_paradas']}
 Linhas: {', '.join(resultado['linhas_utilizadas'])}"""
         
-        props = dict(boxstyle='round,pad=0.5', facecolor='lightgreen',
-                    alpha=0.9, edgecolor='darkgreen', linewidth=2)
-        self.ax.text(0.02, 0.02, info_rota, transform=self.ax.transAxes,
-                    fontsize=10, verticalalignment='bottom',
-                    horizontalalignment='left', bbox=props,
-                    family='monospace')
+        self.destacar_rota(resultado['pontos'], info_rota)
         
         return self.fig
     
@@ -313,13 +623,26 @@ Linhas: {', '.join(resultado['linhas_utilizadas'])}"""
             dpi: Resolução da imagem
         """
         if self.fig:
-            self.fig.savefig(nome_arquivo, dpi=dpi, bbox_inches='tight',
-                           facecolor=self.fig.get_facecolor())
+            # Artistas animados ficam fora do savefig: incluir a rota no arquivo
+            animados = self._artistas_animados()
+            for artista in animados:
+                artista.set_animated(False)
+            self._salvando = True
+            try:
+                self.fig.savefig(nome_arquivo, dpi=dpi, bbox_inches='tight',
+                               facecolor=self.fig.get_facecolor())
+            finally:
+                self._salvando = False
+                for artista in animados:
+                    artista.set_animated(True)
+                # O savefig desenha em outra resolução: capturar o fundo de novo
+                self._fundo = None
+                self.fig.canvas.draw_idle()
             print(f"✅ Visualização salva em: {nome_arquivo}")
         else:
             print("❌ Nenhuma visualização criada ainda")
     
-    def integrar_com_tkinter(self, parent_frame: tk.Frame) -> FigureCanvasTkAgg:
+    def integrar_com_tkinter(self, parent_frame: 'tk.Frame') -> 'backend_tkagg.FigureCanvasTkAgg':
         """
         Integra a visualização com uma janela Tkinter
         
@@ -332,79 +655,63 @@ Linhas: {', '.join(resultado['linhas_utilizadas'])}"""
         if not self.fig:
             self.criar_visualizacao()
         
-        canvas = FigureCanvasTkAgg(self.fig, master=parent_frame)
+        canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=parent_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         return canvas
 
 # Funções auxiliares para análise de complexidade
-def analisar_complexidade_dijkstra(tamanhos: List[int]) -> Dict[str, List[float]]:
+def analisar_complexidade_dijkstra(tamanhos: List[int], consultas: int = 50) -> Dict[str, List[float]]:
     """
-    Analisa a complexidade do algoritmo de Dijkstra
+    Mede o tempo das consultas de rota em redes sintéticas de vários tamanhos
+    
+    Usa o caso 'consulta' da suíte de benchmarks (aquecimento, pares
+    origem-destino com semente fixa, perf_counter_ns), então os números são
+    os mesmos que benchmark_suite.py reporta.
     
     Args:
         tamanhos: Lista com diferentes tamanhos de grafo para testar
+        consultas: Consultas medidas por tamanho
         
     Returns:
-        Dicionário com tempos de execução
+        Dicionário com vértices, arestas e p50/p90/p99 das consultas (ms)
     """
-    import time
-    import random
+    from benchmark_suite import ConfiguracaoSuite, caso_consulta
+    from gerador_rede import gerar_rede_sintetica
     
-    resultados = {
-        'vertices': tamanhos,
-        'tempos': [],
-        'teorico': []
-    }
+    config = ConfiguracaoSuite(consultas=consultas, aquecimento=min(10, consultas))
+    resultados = {'vertices': [], 'arestas': [], 'p50_ms': [], 'p90_ms': [], 'p99_ms': []}
     
     for n in tamanhos:
-        # Criar grafo aleatório
-        G = nx.erdos_renyi_graph(n, 0.3)
-        
-        # Adicionar pesos
-        for (u, v) in G.edges():
-            G[u][v]['weight'] = random.uniform(1, 10)
-        
-        # Medir tempo
-        inicio = time.time()
-        
-        # Executar Dijkstra 10 vezes para média
-        for _ in range(10):
-            if len(G) > 1:
-                origem = random.choice(list(G.nodes()))
-                destino = random.choice(list(G.nodes()))
-                try:
-                    nx.shortest_path(G, origem, destino, weight='weight')
-                except:
-                    pass
-        
-        tempo = (time.time() - inicio) / 10
-        resultados['tempos'].append(tempo)
-        
-        # Complexidade teórica O((V + E) log V)
-        E = G.number_of_edges()
-        V = G.number_of_nodes()
-        teorico = (V + E) * np.log2(V) / 1000000  # Normalizar
-        resultados['teorico'].append(teorico)
+        # Rede sintética com a estrutura do Vermelinho (terminais, corredores, integrações)
+        sistema = gerar_rede_sintetica(n, semente=n)
+        resumo = caso_consulta(None, sistema, config)
+        resultados['vertices'].append(sistema.grafo.number_of_nodes())
+        resultados['arestas'].append(sistema.grafo.number_of_edges())
+        for chave in ('p50_ms', 'p90_ms', 'p99_ms'):
+            resultados[chave].append(resumo[chave])
     
     return resultados
 
-def criar_grafico_complexidade():
-    """Cria gráfico de análise de complexidade"""
-    tamanhos = [10, 20, 50, 100, 200, 500]
+def criar_grafico_complexidade(tamanhos: Optional[List[int]] = None):
+    """Cria gráfico com o tempo medido das consultas por tamanho de rede"""
+    tamanhos = tamanhos or [1_000, 5_000, 20_000, 50_000]
     resultados = analisar_complexidade_dijkstra(tamanhos)
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    ax.plot(resultados['vertices'], resultados['tempos'], 
-            'bo-', label='Tempo Real', linewidth=2, markersize=8)
-    ax.plot(resultados['vertices'], resultados['teorico'], 
-            'r--', label='O((V+E)log V)', linewidth=2)
+    ax.fill_between(resultados['vertices'], resultados['p50_ms'], resultados['p99_ms'],
+                    color='blue', alpha=0.15, label='p50–p99')
+    ax.plot(resultados['vertices'], resultados['p50_ms'], 
+            'bo-', label='p50', linewidth=2, markersize=8)
+    ax.plot(resultados['vertices'], resultados['p90_ms'], 
+            'b--', label='p90', linewidth=1.5)
     
+    ax.set_xscale('log')
     ax.set_xlabel('Número de Vértices', fontsize=12)
-    ax.set_ylabel('Tempo (s) / Complexidade Normalizada', fontsize=12)
-    ax.set_title('Análise de Complexidade - Algoritmo de Dijkstra', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Tempo por consulta (ms)', fontsize=12)
+    ax.set_title('Tempo Medido das Consultas de Rota', fontsize=14, fontweight='bold')
     ax.legend()
     ax.grid(True, alpha=0.3)
     
@@ -490,8 +797,6 @@ if __name__ == "__main__":
         print(f"❌ Erro: {e}")
 
 
-import matplotlib.pyplot as plt
-
 def visualizar_grafo(grafo, caminho=None):
     """
     Exibe o grafo usando matplotlib, destacando a rota se fornecida.